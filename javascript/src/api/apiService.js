@@ -1,12 +1,16 @@
 import apiClient from "./apiClient";
 
 export const postApi = {
-  // 모든 포스트 목록 조회 (검색 파라미터 없음)
-  getPosts: () => apiClient.get("/posts"),
+  // 포스트 목록 페이지 조회 (sort: new | trending | top, preview: 본문 미리보기 글자 수, 응답: { items, nextCursor })
+  getPosts: ({ limit, cursor, sort, preview } = {}) =>
+    apiClient.get("/posts", { params: { limit, cursor, sort, preview } }),
 
   // 특정 포스트 조회
   getPost: (postId) => apiClient.get(`/posts/${postId}`),
 
+  // 여러 포스트를 한 번에 조회 (응답: { items, missingIds })
+  getPostsByIds: (ids) => apiClient.post("/posts:batchGet", { ids }),
+
   // 새 포스트 생성
   createPost: (content, username) =>
     apiClient.post("/posts", { username, content }),
@@ -29,9 +33,9 @@ export const postApi = {
 };
 
 export const commentApi = {
-  // 포스트의 댓글 목록 조회
-  getComments: (postId) =>
-    apiClient.get(`/posts/${postId}/comments`),
+  // 포스트의 댓글 목록 페이지 조회 (응답: { items, nextCursor })
+  getComments: (postId, { limit, cursor, preview } = {}) =>
+    apiClient.get(`/posts/${postId}/comments`, { params: { limit, cursor, preview } }),
 
   // 포스트에 댓글 작성
   createComment: (postId, content, username) =>
@@ -49,3 +53,31 @@ export const commentApi = {
   deleteComment: (postId, commentId) =>
     apiClient.delete(`/posts/${postId}/comments/${commentId}`),
 };
+
+export const userApi = {
+  // 사용자가 작성한 포스트 목록 페이지 조회 (응답: { items, nextCursor })
+  getUserPosts: (username, { limit, cursor } = {}) =>
+    apiClient.get(`/users/${encodeURIComponent(username)}/posts`, { params: { limit, cursor } }),
+
+  // 사용자가 작성한 댓글 목록 페이지 조회
+  getUserComments: (username, { limit, cursor } = {}) =>
+    apiClient.get(`/users/${encodeURIComponent(username)}/comments`, { params: { limit, cursor } }),
+
+  // 사용자가 좋아요한 목록 페이지 조회
+  getUserLikes: (username, { limit, cursor } = {}) =>
+    apiClient.get(`/users/${encodeURIComponent(username)}/likes`, { params: { limit, cursor } }),
+};
+
+export const searchApi = {
+  // 포스트 또는 댓글 검색, 관련도 순 (응답: { items, nextCursor }, snippet은 <mark> 포함 HTML)
+  search: (q, { type = "posts", limit, cursor } = {}) =>
+    apiClient.get("/search", { params: { q, type, limit, cursor } }),
+};
+
+export const eventApi = {
+  // 새 포스트, 포스트 수정/삭제 이벤트 구독 (EventSource, 사용 후 close() 필요)
+  subscribeFeed: () => new EventSource("/api/events"),
+
+  // 특정 포스트의 수정, 댓글, 좋아요 이벤트 구독
+  subscribePost: (postId) => new EventSource(`/api/posts/${postId}/events`),
+};
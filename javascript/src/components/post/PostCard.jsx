@@ -51,8 +51,8 @@ const PostCard = ({ post }) => {
 
   const loadComments = async () => {
     try {
-      const response = await commentApi.getComments(post.id);
-      setComments(response.data || []);
+      const response = await commentApi.getComments(post.id, { limit: 2, preview: 140 });
+      setComments(response.data.items || []);
     } catch (error) {
       console.error("Error loading comments:", error);
     }
@@ -99,6 +99,7 @@ const PostCard = ({ post }) => {
       <div className="mb-2" onClick={handlePostClick}>
         <p className="text-base text-gray-900 dark:text-white leading-relaxed break-words">
           {post.content}
+          {post.contentTruncated && "…"}
         </p>
       </div>
       <div className="flex gap-6 mt-2">
@@ -129,9 +130,9 @@ const PostCard = ({ post }) => {
       {comments.length > 0 && (
         <div className="mt-3 pt-3 border-t border-gray-200 dark:border-gray-700">
           <div className="text-xs text-gray-500 dark:text-gray-400 mb-2">
-            Comments ({comments.length})
+            Comments ({post.commentsCount})
           </div>
-          {comments.slice(0, 2).map((comment) => (
+          {comments.map((comment) => (
             <div key={comment.id} className="mb-2 pl-2">
               <div className="flex items-start gap-2">
                 <div className="w-6 h-6 rounded-full bg-gray-200 dark:bg-gray-700 flex-shrink-0" />
@@ -141,12 +142,13 @@ const PostCard = ({ post }) => {
                   </div>
                   <div className="text-xs text-gray-700 dark:text-gray-300 mt-0.5">
                     {comment.content}
+                    {comment.contentTruncated && "…"}
                   </div>
                 </div>
               </div>
             </div>
           ))}
-          {comments.length > 2 && (
+          {post.commentsCount > 2 && (
             <button
               onClick={(e) => {
                 e.stopPropagation();
@@ -154,7 +156,7 @@ const PostCard = ({ post }) => {
               }}
               className="text-xs text-blue-500 hover:underline mt-1"
             >
-              View all {comments.length} comments
+              View all {post.commentsCount} comments
             </button>
           )}
         </div>
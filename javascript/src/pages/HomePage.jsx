@@ -1,5 +1,5 @@
 import { useState, useEffect, useCallback } from "react";
-import { postApi } from "../api/apiService";
+import { postApi, eventApi } from "../api/apiService";
 import { useAuth } from "../context/AuthContext";
 import Layout from "../components/common/Layout";
 import PostCard from "../components/post/PostCard";
@@ -7,12 +7,24 @@ import FloatingActionButton from "../components/common/FloatingActionButton";
 import PostingModal from "../components/modal/PostingModal";
 import NameInputModal from "../components/modal/NameInputModal";
 
+// 피드 카드에는 본문 미리보기만 표시 (전체 본문은 상세 페이지에서 조회)
+const FEED_PREVIEW_LENGTH = 280;
+
+const toPreview = (post) =>
+  post.content.length > FEED_PREVIEW_LENGTH
+    ? { ...post, content: post.content.slice(0, FEED_PREVIEW_LENGTH), contentTruncated: true }
+    : post;
+
 const HomePage = () => {
   const [posts, setPosts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState("");
   const [isPostModalOpen, setIsPostModalOpen] = useState(false);
   const [isNameModalOpen, setIsNameModalOpen] = useState(false);
+  const [newPostsCount, setNewPostsCount] = useState(0);
+  const [sort, setSort] = useState("new");
   const { isAuthenticated, isLoading: authLoading } = useAuth();
 
   const fetchPosts = useCallback(async () => {
@@ -21,14 +33,31 @@ const HomePage = () => {
     try {
       setIsLoading(true);
       setError("");
-      const response = await postApi.getPosts();
-      setPosts(response.data);
+      const response = await postApi.getPosts({ sort, preview: FEED_PREVIEW_LENGTH });
+      setPosts(response.data.items);
+      setNextCursor(response.data.nextCursor);
+      setNewPostsCount(0);
     } catch (error) {
       setError("An error occurred while loading posts.");
     } finally {
       setIsLoading(false);
     }
-  }, [isAuthenticated]);
+  }, [isAuthenticated, sort]);
+
+  const fetchMorePosts = async () => {
+    if (!nextCursor) return;
+
+    try {
+      setIsLoadingMore(true);
+      const response = await postApi.getPosts({ cursor: nextCursor, sort, preview: FEED_PREVIEW_LENGTH });
+      setPosts((prev) => [...prev, ...response.data.items]);
+      setNextCursor(response.data.nextCursor);
+    } catch (error) {
+      setError("An error occurred while loading posts.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     if (!authLoading && !isAuthenticated) {
@@ -38,6 +67,24 @@ const HomePage = () => {
     }
   }, [authLoading, isAuthenticated, fetchPosts]);
 
+  useEffect(() => {
+    if (!isAuthenticated) return;
+
+    const events = eventApi.subscribeFeed();
+    events.addEventListener("post.created", () => {
+      setNewPostsCount((count) => count + 1);
+    });
+    events.addEventListener("post.updated", (event) => {
+      const updated = JSON.parse(event.data);
+      setPosts((prev) => prev.map((post) => (post.id === updated.id ? toPreview(updated) : post)));
+    });
+    events.addEventListener("post.deleted", (event) => {
+      const { id } = JSON.parse(event.data);
+      setPosts((prev) => prev.filter((post) => post.id !== id));
+    });
+    return () => events.close();
+  }, [isAuthenticated]);
+
   const handleOpenPostModal = () => setIsPostModalOpen(true);
   const handleClosePostModal = () => setIsPostModalOpen(false);
   const handlePostCreated = () => {
@@ -49,6 +96,21 @@ const HomePage = () => {
     <Layout>
       <div className="w-full max-w-2xl mx-auto">
         <h1 className="text-2xl font-bold mb-6 text-gray-900 dark:text-white">Contoso Outdoor Social</h1>
+        <div className="flex gap-2 mb-4">
+          {["new", "trending", "top"].map((mode) => (
+            <button
+              key={mode}
+              onClick={() => setSort(mode)}
+              className={`px-3 py-1 text-sm rounded-full capitalize ${
+                sort === mode
+                  ? "bg-gray-900 text-white dark:bg-white dark:text-gray-900"
+                  : "text-gray-500 hover:text-gray-900 dark:hover:text-white"
+              }`}
+            >
+              {mode}
+            </button>
+          ))}
+        </div>
         {isLoading ? (
           <div className="text-center py-10 text-gray-500">Loading posts...</div>
         ) : error ? (
@@ -57,9 +119,26 @@ const HomePage = () => {
           <div className="text-center py-10 text-gray-400">No posts yet.</div>
         ) : (
           <div className="flex flex-col gap-4">
+            {newPostsCount > 0 && (
+              <button
+                onClick={fetchPosts}
+                className="py-2 text-sm text-blue-500 hover:text-blue-700"
+              >
+                Show {newPostsCount} new {newPostsCount === 1 ? "post" : "posts"}
+              </button>
+            )}
             {posts.map((post) => (
               <PostCard key={post.id} post={post} />
             ))}
+            {nextCursor && (
+              <button
+                onClick={fetchMorePosts}
+                disabled={isLoadingMore}
+                className="py-2 text-sm text-gray-500 hover:text-gray-900 dark:hover:text-white disabled:opacity-50"
+              >
+                {isLoadingMore ? "Loading..." : "Load more"}
+              </button>
+            )}
           </div>
         )}
         <FloatingActionButton onClick={handleOpenPostModal} />
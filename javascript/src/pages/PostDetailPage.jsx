@@ -1,6 +1,6 @@
 import { useState, useEffect, useCallback } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import { postApi, commentApi } from "../api/apiService";
+import { postApi, commentApi, eventApi } from "../api/apiService";
 import { useAuth } from "../context/AuthContext";
 import Layout from "../components/common/Layout";
 import CommentItem from "../components/comment/CommentItem";
@@ -44,6 +44,7 @@ const PostDetailPage = () => {
   const { user } = useAuth();
   const [post, setPost] = useState(null);
   const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [isCommentsLoading, setIsCommentsLoading] = useState(true);
   const [error, setError] = useState("");
@@ -74,8 +75,8 @@ const PostDetailPage = () => {
     try {
       setIsCommentsLoading(true);
       const response = await commentApi.getComments(postId);
-      const items = response.data; // 응답이 배열임
-      setComments(items);
+      setComments(response.data.items);
+      setCommentsCursor(response.data.nextCursor);
     } catch (error) {
       console.error("Error loading comments:", error);
     } finally {
@@ -83,6 +84,21 @@ const PostDetailPage = () => {
     }
   }, [postId]);
 
+  const fetchMoreComments = async () => {
+    if (!commentsCursor) return;
+
+    try {
+      setIsCommentsLoading(true);
+      const response = await commentApi.getComments(postId, { cursor: commentsCursor });
+      setComments((prevComments) => [...prevComments, ...response.data.items]);
+      setCommentsCursor(response.data.nextCursor);
+    } catch (error) {
+      console.error("Error loading comments:", error);
+    } finally {
+      setIsCommentsLoading(false);
+    }
+  };
+
   useEffect(() => {
     fetchPostDetail();
   }, [fetchPostDetail]);
@@ -93,6 +109,45 @@ const PostDetailPage = () => {
     }
   }, [fetchComments, postId]);
 
+  useEffect(() => {
+    if (!postId) return;
+
+    // 다른 사용자의 변경만 반영 (내 변경은 응답으로 이미 반영됨)
+    const isOthers = (data) => !user || data.username !== user.username;
+    const events = eventApi.subscribePost(postId);
+    events.addEventListener("post.updated", (event) => {
+      const updated = JSON.parse(event.data);
+      setPost((prev) => (prev ? { ...prev, content: updated.content, updatedAt: updated.updatedAt } : prev));
+    });
+    events.addEventListener("like.created", (event) => {
+      if (isOthers(JSON.parse(event.data))) {
+        setLikesCount((count) => count + 1);
+      }
+    });
+    events.addEventListener("like.deleted", (event) => {
+      if (isOthers(JSON.parse(event.data))) {
+        setLikesCount((count) => Math.max(count - 1, 0));
+      }
+    });
+    events.addEventListener("comment.created", (event) => {
+      const comment = JSON.parse(event.data);
+      if (isOthers(comment)) {
+        setComments((prev) =>
+          prev.some((item) => item.id === comment.id) ? prev : [comment, ...prev]
+        );
+      }
+    });
+    events.addEventListener("comment.updated", (event) => {
+      const comment = JSON.parse(event.data);
+      setComments((prev) => prev.map((item) => (item.id === comment.id ? comment : item)));
+    });
+    events.addEventListener("comment.deleted", (event) => {
+      const { id } = JSON.parse(event.data);
+      setComments((prev) => prev.filter((item) => item.id !== id));
+    });
+    return () => events.close();
+  }, [postId, user]);
+
   const handleLikeToggle = async () => {
     if (!user) return;
     try {
@@ -334,6 +389,14 @@ const PostDetailPage = () => {
           {isCommentsLoading && (
             <p className="text-center py-4 text-gray-400">Loading comments...</p>
           )}
+          {!isCommentsLoading && commentsCursor && (
+            <button
+              onClick={fetchMoreComments}
+              className="w-full py-2 text-sm text-gray-500 hover:text-gray-900 dark:hover:text-white"
+            >
+              Load more comments
+            </button>
+          )}
         </section>
       </div>
     </Layout>
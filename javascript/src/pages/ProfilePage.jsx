@@ -1,6 +1,6 @@
 import { useState, useEffect } from "react";
 import { useNavigate, useParams } from "react-router-dom";
-import { postApi } from "../api/apiService";
+import { userApi } from "../api/apiService";
 import { useAuth } from "../context/AuthContext";
 import Layout from "../components/common/Layout";
 import PostCard from "../components/post/PostCard";
@@ -16,6 +16,8 @@ const ProfilePage = () => {
   const isMyProfile = user && username === user.username;
 
   const [userPosts, setUserPosts] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState("");
   const [isPostModalOpen, setIsPostModalOpen] = useState(false);
@@ -29,14 +31,10 @@ const ProfilePage = () => {
       try {
         setIsLoading(true);
         setError("");
-        const response = await postApi.getPosts();
-        // username이 일치하는 포스트만 필터링
-        const posts = (response.data || []).filter(
-          (post) => post.username === username
-        );
-        // 최신순 정렬
-        posts.sort((a, b) => new Date(b.createdAt) - new Date(a.createdAt));
-        setUserPosts(posts);
+        // 사용자 타임라인 첫 페이지 조회 (최신순)
+        const response = await userApi.getUserPosts(username);
+        setUserPosts(response.data.items);
+        setNextCursor(response.data.nextCursor);
       } catch (err) {
         setError("Failed to load profile information.");
       } finally {
@@ -46,6 +44,21 @@ const ProfilePage = () => {
     fetchPosts();
   }, [username]);
 
+  const fetchMorePosts = async () => {
+    if (!nextCursor) return;
+
+    try {
+      setIsLoadingMore(true);
+      const response = await userApi.getUserPosts(username, { cursor: nextCursor });
+      setUserPosts((prev) => [...prev, ...response.data.items]);
+      setNextCursor(response.data.nextCursor);
+    } catch (err) {
+      setError("Failed to load profile information.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleLogout = () => {
     if (window.confirm("Are you sure you want to logout?")) {
       logout();
@@ -113,6 +126,15 @@ const ProfilePage = () => {
           ) : (
             <div className="text-center py-10 text-gray-500">No posts yet.</div>
           )}
+          {nextCursor && (
+            <button
+              onClick={fetchMorePosts}
+              disabled={isLoadingMore}
+              className="py-2 text-sm text-gray-500 hover:text-gray-900 dark:hover:text-white disabled:opacity-50"
+            >
+              {isLoadingMore ? "Loading..." : "Load more"}
+            </button>
+          )}
         </div>
         <FloatingActionButton onClick={togglePostModal} />
         <PostingModal
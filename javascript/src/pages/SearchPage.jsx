@@ -1,5 +1,6 @@
 import { useState } from "react";
-import { postApi } from "../api/apiService";
+import { useNavigate } from "react-router-dom";
+import { searchApi } from "../api/apiService";
 import { useAuth } from "../context/AuthContext";
 import Layout from "../components/common/Layout";
 import FloatingActionButton from "../components/common/FloatingActionButton";
@@ -23,10 +24,13 @@ const SearchIcon = () => (
 const SearchPage = () => {
   const [searchTerm, setSearchTerm] = useState("");
   const [searchResults, setSearchResults] = useState([]);
+  const [searchedTerm, setSearchedTerm] = useState("");
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState("");
   const [isPostModalOpen, setIsPostModalOpen] = useState(false);
   const { isAuthenticated } = useAuth();
+  const navigate = useNavigate();
 
   const handleSearchChange = (e) => {
     setSearchTerm(e.target.value);
@@ -34,21 +38,34 @@ const SearchPage = () => {
 
   const handleSearch = async (e) => {
     e?.preventDefault();
-    if (!searchTerm.trim()) return;
+    const query = searchTerm.trim();
+    if (!query) return;
     try {
       setIsLoading(true);
       setError("");
-      // 전체 포스트를 불러와서 username 기준으로 프론트에서 필터링
-      const response = await postApi.getPosts();
-      const filtered = (response.data || []).filter(
-        (post) =>
-          post.username &&
-          post.username.toLowerCase().includes(searchTerm.trim().toLowerCase())
-      );
-      setSearchResults(filtered);
+      // 서버 전문 검색 첫 페이지 조회 (관련도 순)
+      const response = await searchApi.search(query);
+      setSearchResults(response.data.items);
+      setNextCursor(response.data.nextCursor);
+      setSearchedTerm(query);
     } catch (error) {
       setError("An error occurred during search.");
       setSearchResults([]);
+      setNextCursor(null);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setIsLoading(true);
+      const response = await searchApi.search(searchedTerm, { cursor: nextCursor });
+      setSearchResults((prev) => [...prev, ...response.data.items]);
+      setNextCursor(response.data.nextCursor);
+    } catch (error) {
+      setError("An error occurred during search.");
     } finally {
       setIsLoading(false);
     }
@@ -70,7 +87,7 @@ const SearchPage = () => {
             type="text"
             value={searchTerm}
             onChange={handleSearchChange}
-            placeholder="Search users..."
+            placeholder="Search posts..."
             className="flex-1 px-4 py-2 rounded-md border border-gray-300 focus:outline-none focus:ring-2 focus:ring-blue-500"
             disabled={isLoading}
           />
@@ -87,24 +104,40 @@ const SearchPage = () => {
           {searchResults.length > 0 ? (
             <>
               <div className="text-gray-700">
-                Search results for &apos;{searchTerm}&apos;: {searchResults.length}
+                Search results for &apos;{searchedTerm}&apos;
               </div>
               <ul className="flex flex-col gap-4">
-                {searchResults.map((post) => (
-                  <li key={post.id} className="p-4 bg-white rounded shadow flex items-center gap-4">
+                {searchResults.map((result) => (
+                  <li
+                    key={result.id}
+                    onClick={() => navigate(`/post/${result.postId}`)}
+                    className="p-4 bg-white rounded shadow flex items-center gap-4 cursor-pointer"
+                  >
                     <div className="w-10 h-10 rounded-full bg-gray-200" />
                     <div>
-                      <div className="font-bold text-gray-900">{post.username}</div>
-                      <div className="text-gray-500 text-sm">{post.content}</div>
+                      <div className="font-bold text-gray-900">{result.username}</div>
+                      {/* snippet은 서버에서 이스케이프되며 <mark> 태그만 포함 */}
+                      <div
+                        className="text-gray-500 text-sm"
+                        dangerouslySetInnerHTML={{ __html: result.snippet }}
+                      />
                     </div>
                   </li>
                 ))}
               </ul>
               {isLoading && <div className="text-center py-10 text-gray-500">Loading...</div>}
+              {nextCursor && !isLoading && (
+                <button
+                  onClick={handleLoadMore}
+                  className="py-2 text-sm text-gray-500 hover:text-gray-900"
+                >
+                  Load more
+                </button>
+              )}
             </>
           ) : (
             !isLoading &&
-            searchTerm && (
+            searchedTerm && (
               <div className="text-center py-10 text-gray-400">
                 No search results found.
               </div>
@@ -112,7 +145,7 @@ const SearchPage = () => {
           )}
           {!searchTerm && !isLoading && (
             <div className="text-center py-10 text-gray-400">
-              Try searching for a user.
+              Try searching for a word in a post.
             </div>
           )}
         </div>
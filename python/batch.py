@@ -0,0 +1,73 @@
+"""Helpers shared by the batch endpoints
+
+Batch requests carry a list of raw items that are validated one by one
+against the single-item request models, so a malformed item is reported in
+its own result instead of failing the whole batch.
+"""
+
+import os
+from datetime import datetime, timedelta
+from typing import Iterator, Sequence, Type, TypeVar, Union
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+# Bound parameters per IN (...) lookup, well below SQLite's variable limit
+LOOKUP_CHUNK_SIZE = 500
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def check_batch_size(items: Sequence):
+    if len(items) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"Too many items in batch (maximum {MAX_BATCH_SIZE})")
+
+
+def validate_items(model: Type[Model], items: Sequence[dict]) -> list[Union[Model, str]]:
+    """Validate each item, returning the parsed model or an error message per item"""
+    results = []
+    for item in items:
+        try:
+            results.append(model.model_validate(item))
+        except ValidationError as exc:
+            error = exc.errors()[0]
+            field = ".".join(str(part) for part in error["loc"])
+            results.append(f"Invalid field '{field}': {error['msg']}" if field else error["msg"])
+    return results
+
+
+def item_error(status: int, error: str) -> dict:
+    return {"status": status, "error": error}
+
+
+def creation_times(count: int) -> list[datetime]:
+    """Distinct, increasing timestamps so a batch keeps its input order in the feed"""
+    now = datetime.utcnow()
+    return [now + timedelta(microseconds=offset) for offset in range(count)]
+
+
+def chunks(values: Sequence, size: int = LOOKUP_CHUNK_SIZE) -> Iterator[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def lookup_statements(count: int) -> int:
+    """Statements a lookup of count values runs, one per chunk"""
+    return -(-count // LOOKUP_CHUNK_SIZE)
+
+
+async def batch_length(request: Request, field: str) -> int:
+    """Length of the request body's list field, for statement budgets
+
+    Budgets are declared before the body is validated, so a missing body or
+    anything but a list counts as empty and is left to FastAPI to reject.
+    FastAPI has already parsed a JSON body by then and request.json()
+    returns its cached result.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        return 0
+    items = body.get(field) if isinstance(body, dict) else None
+    return len(items) if isinstance(items, list) else 0
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Compare request throughput of the sync (threadpool) and async (aiosqlite) database modes
+
+Usage: python benchmarks/bench_async.py [concurrency] [requests]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+import httpx
+
+import database
+import models
+from database import engine, init_db
+from main import app
+
+POST_COUNT = 2000
+
+
+def seed():
+    init_db()
+    with engine.begin() as conn:
+        conn.execute(models.Post.__table__.insert(), [
+            {"id": f"post-{i:05d}", "username": f"user-{i % 100}", "content": f"Post {i}"}
+            for i in range(POST_COUNT)
+        ])
+
+
+async def run_load(concurrency, total_requests):
+    """Fire a read-mostly mix of requests and return requests per second"""
+    transport = httpx.ASGITransport(app=app)
+    rng = random.Random(42)
+    remaining = iter(range(total_requests))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for i in remaining:
+                post_id = f"post-{rng.randrange(POST_COUNT):05d}"
+                if i % 10 == 0:
+                    response = await client.post(f"/api/posts/{post_id}/likes", json={"username": f"fan-{i}"})
+                elif i % 3 == 0:
+                    response = await client.get("/api/posts")
+                else:
+                    response = await client.get(f"/api/posts/{post_id}")
+                assert response.status_code < 400, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total_requests / (time.perf_counter() - started)
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    total_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    print(f"concurrency={concurrency} requests={total_requests}")
+    for mode in ("sync", "async"):
+        seed()
+        database.DATABASE_MODE = mode
+        throughput = asyncio.run(run_load(concurrency, total_requests))
+        print(f"  {mode:>5}: {throughput:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
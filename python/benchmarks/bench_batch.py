@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Measure bulk loading through the batch endpoints against one request per item
+
+Usage: python benchmarks/bench_batch.py [items] [batch_size]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+SINGLE_SAMPLE = 1000
+
+
+def load_single(client, items):
+    started = time.perf_counter()
+    for item in items:
+        assert client.post("/api/posts", json=item).status_code == 201
+    return len(items) / (time.perf_counter() - started)
+
+
+def load_batched(client, items, batch_size):
+    started = time.perf_counter()
+    for start in range(0, len(items), batch_size):
+        response = client.post("/api/posts:batch", json={"items": items[start:start + batch_size]})
+        assert response.status_code == 200
+    return len(items) / (time.perf_counter() - started)
+
+
+def main():
+    total_items = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    items = [{"username": f"user-{i % 100}", "content": f"Imported post {i}"} for i in range(total_items)]
+
+    with TestClient(app) as client:
+        single = load_single(client, items[:SINGLE_SAMPLE])
+        batched = load_batched(client, items, batch_size)
+
+    print(f"items={total_items} batch_size={batch_size}")
+    print(f"  one per request: {single:9.1f} posts/s (sampled over {SINGLE_SAMPLE}, {total_items / single:6.1f}s projected)")
+    print(f"          batched: {batched:9.1f} posts/s ({total_items / batched:6.1f}s, speedup {batched / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
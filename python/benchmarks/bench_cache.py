@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Measure the response cache speedup on a Zipfian post/comment read workload
+
+Usage: python benchmarks/bench_cache.py [requests] [zipf_exponent]
+"""
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+from fastapi.testclient import TestClient
+
+import models
+from cache import response_cache
+from database import engine
+from main import app
+
+POST_COUNT = 5000
+COMMENTS_PER_POST = 5
+
+
+def seed():
+    with engine.begin() as conn:
+        conn.execute(models.Post.__table__.insert(), [
+            {"id": f"post-{i:05d}", "username": f"user-{i % 100}", "content": f"Post {i}",
+             "comments_count": COMMENTS_PER_POST}
+            for i in range(POST_COUNT)
+        ])
+        conn.execute(models.Comment.__table__.insert(), [
+            {"id": f"comment-{i:05d}-{j}", "post_id": f"post-{i:05d}", "username": "fan", "content": f"Comment {j}"}
+            for i in range(POST_COUNT) for j in range(COMMENTS_PER_POST)
+        ])
+
+
+def zipf_urls(total_requests, exponent, seed_value=7):
+    """Requests skewed towards a few hot posts, alternating post and comments reads"""
+    weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, POST_COUNT + 1)))
+    rng = random.Random(seed_value)
+    ranks = rng.choices(range(POST_COUNT), cum_weights=weights, k=total_requests)
+    return [
+        f"/api/posts/post-{rank:05d}" if i % 2 else f"/api/posts/post-{rank:05d}/comments"
+        for i, rank in enumerate(ranks)
+    ]
+
+
+def run(client, urls):
+    started = time.perf_counter()
+    for url in urls:
+        assert client.get(url).status_code == 200
+    return len(urls) / (time.perf_counter() - started)
+
+
+def main():
+    total_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    exponent = float(sys.argv[2]) if len(sys.argv) > 2 else 1.1
+    urls = zipf_urls(total_requests, exponent)
+
+    with TestClient(app) as client:
+        seed()
+        configured_size = response_cache.max_entries
+
+        response_cache.max_entries = 0
+        uncached = run(client, urls)
+
+        response_cache.max_entries = configured_size
+        response_cache.clear()
+        hits_before, misses_before = response_cache.hits, response_cache.misses
+        cached = run(client, urls)
+        hits = response_cache.hits - hits_before
+        misses = response_cache.misses - misses_before
+
+    print(f"requests={total_requests} zipf_exponent={exponent} posts={POST_COUNT}")
+    print(f"  uncached: {uncached:8.1f} req/s")
+    print(f"    cached: {cached:8.1f} req/s (hit rate {hits / (hits + misses):.1%}, speedup {cached / uncached:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark comment listing latency as the comments table grows
+
+Usage: python benchmarks/bench_comments.py [sizes]
+  sizes: comma separated comment table sizes (default: 10000,100000,1000000)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+from fastapi.testclient import TestClient
+
+import models
+from database import engine
+from main import app
+
+POST_COUNT = 1000
+HOT_POST_SHARE = 0.1
+INSERT_CHUNK = 50000
+REQUESTS_PER_CASE = 200
+
+
+def grow_comments(start, stop, base_time):
+    """Insert comments [start, stop), sending a fixed share of them to the hot post"""
+    hot_every = int(1 / HOT_POST_SHARE)
+    with engine.begin() as conn:
+        for chunk_start in range(start, stop, INSERT_CHUNK):
+            rows = []
+            for i in range(chunk_start, min(chunk_start + INSERT_CHUNK, stop)):
+                created_at = base_time + timedelta(milliseconds=i)
+                rows.append({
+                    "id": f"comment-{i:08d}",
+                    "post_id": "post-hot" if i % hot_every == 0 else f"post-{i % POST_COUNT:05d}",
+                    "username": f"user-{i % 5000}",
+                    "content": f"Benchmark comment number {i}",
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            conn.execute(models.Comment.__table__.insert(), rows)
+
+
+def measure(client, url, params=None):
+    """Return the median latency in milliseconds of a GET request"""
+    timings = []
+    for _ in range(REQUESTS_PER_CASE):
+        started = time.perf_counter()
+        response = client.get(url, params=params)
+        timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.text
+    return statistics.median(timings)
+
+
+def deep_cursor(client, url, pages):
+    """Follow nextCursor a number of pages into a listing"""
+    cursor = None
+    for _ in range(pages):
+        params = {"cursor": cursor} if cursor else {}
+        cursor = client.get(url, params=params).json()["nextCursor"]
+    return cursor
+
+
+def main():
+    sizes = [int(size) for size in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000").split(",")]
+    base_time = datetime(2025, 1, 1)
+
+    with TestClient(app) as client:
+        with engine.begin() as conn:
+            posts = [{"id": "post-hot", "username": "contoso", "content": "Viral post",
+                      "created_at": base_time, "updated_at": base_time}]
+            posts += [{"id": f"post-{i:05d}", "username": f"user-{i}", "content": f"Post {i}",
+                       "created_at": base_time, "updated_at": base_time} for i in range(POST_COUNT)]
+            conn.execute(models.Post.__table__.insert(), posts)
+
+        print(f"{'comments':>10} {'hot first page':>16} {'hot page 25':>12} {'cold first page':>16}")
+        inserted = 0
+        for size in sizes:
+            grow_comments(inserted, size, base_time)
+            inserted = size
+
+            hot_url = "/api/posts/post-hot/comments"
+            cursor = deep_cursor(client, hot_url, 25)
+            hot_first = measure(client, hot_url)
+            hot_deep = measure(client, hot_url, {"cursor": cursor}) if cursor else float("nan")
+            cold_first = measure(client, "/api/posts/post-00042/comments")
+            print(f"{size:>10} {hot_first:>14.2f}ms {hot_deep:>10.2f}ms {cold_first:>14.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Measure like/unlike throughput when many clients hit one hot post at once
+
+Usage: python benchmarks/bench_likes.py [users] [rounds]
+
+Set LIKE_WRITE_BEHIND=1 to measure the write-behind like buffer instead.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+import httpx
+from fastapi.testclient import TestClient
+
+from main import app
+
+
+async def hammer(url, users, rounds):
+    """Every user double-taps like, then half of them unlike; returns status counts"""
+    statuses = Counter()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(rounds):
+            responses = await asyncio.gather(*(
+                client.post(url, json={"username": username}) for username in users for _ in range(2)
+            ))
+            responses += await asyncio.gather(*(
+                client.delete(url, params={"username": username}) for username in users[::2]
+            ))
+            statuses.update(response.status_code for response in responses)
+    return statuses
+
+
+def main():
+    user_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    users = [f"user-{i}" for i in range(user_count)]
+
+    with TestClient(app) as client:
+        post_id = client.post("/api/posts", json={"username": "contoso", "content": "Hot post"}).json()["id"]
+        started = time.perf_counter()
+        statuses = asyncio.run(hammer(f"/api/posts/{post_id}/likes", users, rounds))
+        elapsed = time.perf_counter() - started
+        likes_count = client.get(f"/api/posts/{post_id}").json()["likesCount"]
+
+    total = sum(statuses.values())
+    print(f"users={user_count} rounds={rounds} requests={total}")
+    print(f"  throughput: {total / elapsed:8.1f} req/s")
+    print(f"  statuses:   {dict(sorted(statuses.items()))}")
+    print(f"  likesCount: {likes_count} (expected {user_count - len(users[::2])})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Measure feed payload size and latency with sparse fieldsets and content previews
+
+Usage: python benchmarks/bench_projection.py [posts] [content_chars] [requests]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+VARIANTS = {
+    "full records": {},
+    "preview=280": {"preview": 280},
+    "fields=username,content,likesCount,commentsCount&preview=280": {
+        "fields": "username,content,likesCount,commentsCount", "preview": 280
+    },
+    "fields=username": {"fields": "username"},
+}
+
+
+def measure(client, params, requests):
+    durations = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get("/api/posts", params={"limit": 100, **params})
+        durations.append(time.perf_counter() - started)
+        size = len(response.content)
+    return statistics.median(durations) * 1000, size
+
+
+def main():
+    total_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    content_chars = int(sys.argv[2]) if len(sys.argv) > 2 else 8000
+    requests = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    sentence = "Day three on the ridge trail, the Contoso tent held up through the storm. "
+    content = (sentence * (content_chars // len(sentence) + 1))[:content_chars]
+
+    with TestClient(app) as client:
+        items = [{"username": f"user-{i % 100}", "content": content} for i in range(total_posts)]
+        for start in range(0, total_posts, 1000):
+            client.post("/api/posts:batch", json={"items": items[start:start + 1000]})
+
+        print(f"posts={total_posts} content={content_chars} chars, page of 100")
+        baseline_ms, baseline_size = measure(client, {}, requests)
+        for name, params in VARIANTS.items():
+            elapsed, size = measure(client, params, requests)
+            print(
+                f"  {name:62} {size / 1024:8.1f} KiB ({size / baseline_size:6.1%})  "
+                f"p50 {elapsed:6.2f} ms ({elapsed / baseline_ms:6.1%})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Measure GET /api/search over a large post corpus against a LIKE scan
+
+Posts are made of random outdoor vocabulary plus Contoso product names at
+different frequencies, loaded straight into the database so the FTS index is
+filled by its triggers.
+
+Usage: python benchmarks/bench_search.py [posts] [requests_per_query]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import models
+from database import engine
+from main import app
+
+LOAD_CHUNK = 20000
+VOCABULARY = (
+    "trail hike summit camp lake river forest ridge valley sunrise sunset tent stove boots rain wind snow "
+    "map compass bridge meadow canyon cliff cabin fire coffee dog friends weekend morning evening trip"
+).split()
+# Product name -> share of posts mentioning it
+PRODUCTS = {"Contoso": 0.05, "Alpine": 0.01, "Trailblazer": 0.001, "Featherlite": 0.0001}
+QUERIES = ["featherlite", "trailblazer tent", "alpine", "contoso", "trail"]
+
+
+def post_content(rng):
+    words = rng.choices(VOCABULARY, k=rng.randint(8, 40))
+    for product, share in PRODUCTS.items():
+        if rng.random() < share:
+            words.insert(rng.randrange(len(words)), product)
+    return " ".join(words)
+
+
+def load_posts(total):
+    rng = random.Random(17)
+    posts = models.Post.__table__
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for start in range(0, total, LOAD_CHUNK):
+            connection.execute(posts.insert(), [
+                {
+                    "id": f"post-{i:016x}",
+                    "username": f"user-{i % 1000}",
+                    "content": post_content(rng),
+                    "created_at": now - timedelta(seconds=i),
+                    "updated_at": now - timedelta(seconds=i),
+                    "likes_count": 0,
+                    "comments_count": 0
+                }
+                for i in range(start, min(start + LOAD_CHUNK, total))
+            ])
+    return time.perf_counter() - started
+
+
+def time_requests(client, query, count):
+    durations = []
+    matches = None
+    for _ in range(count):
+        started = time.perf_counter()
+        response = client.get("/api/search", params={"q": query})
+        durations.append(time.perf_counter() - started)
+        assert response.status_code == 200
+        matches = len(response.json()["items"])
+    return statistics.median(durations), sorted(durations)[int(len(durations) * 0.95) - 1], matches
+
+
+def time_like_scan(query):
+    conditions = " AND ".join(f"content LIKE :term{i}" for i in range(len(query.split())))
+    params = {f"term{i}": f"%{term}%" for i, term in enumerate(query.split())}
+    with engine.connect() as connection:
+        # Unranked, and it can stop early; ranking would need the full scan every time
+        started = time.perf_counter()
+        connection.execute(text(f"SELECT id FROM posts WHERE {conditions} LIMIT 20"), params).all()
+        elapsed = time.perf_counter() - started
+        total = connection.execute(text(f"SELECT count(*) FROM posts WHERE {conditions}"), params).scalar()
+    return elapsed, total
+
+
+def main():
+    total_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    requests_per_query = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with TestClient(app) as client:
+        load_seconds = load_posts(total_posts)
+        print(f"posts={total_posts} loaded and indexed in {load_seconds:.1f}s ({total_posts / load_seconds:,.0f} posts/s)")
+        for query in QUERIES:
+            p50, p95, page = time_requests(client, query, requests_per_query)
+            like_seconds, like_total = time_like_scan(query)
+            print(
+                f"  q={query!r:20} matches={like_total:7d}  search p50={p50 * 1000:7.2f}ms p95={p95 * 1000:7.2f}ms "
+                f"(page of {page})  LIKE scan={like_seconds * 1000:8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of list serialization cost per 10k rows
+
+Compares the previous path (row -> dict -> schemas.Post, then FastAPI's
+response_model validation and JSON encoding) with the record + orjson path.
+
+Usage: python benchmarks/bench_serialization.py [rows] [repeats]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import schemas
+from serialization import dumps, orjson, post_record
+
+
+def make_rows(count):
+    base = datetime(2025, 1, 1)
+    return [
+        (f"post-{i:08x}", f"user-{i % 500}", f"Post body number {i} " * 8,
+         base + timedelta(seconds=i), base + timedelta(seconds=i, microseconds=i % 1000), i % 97, i % 13)
+        for i in range(count)
+    ]
+
+
+def pydantic_path(rows):
+    items = []
+    for row in rows:
+        post_id, username, content, created_at, updated_at, likes_count, comments_count = row
+        items.append(schemas.Post(**{
+            "id": post_id, "username": username, "content": content, "createdAt": created_at,
+            "updatedAt": updated_at, "likesCount": likes_count, "commentsCount": comments_count
+        }))
+    page = schemas.PostPage(items=items, nextCursor=None)
+    validated = TypeAdapter(schemas.PostPage).validate_python(page, from_attributes=True)
+    return JSONResponse(jsonable_encoder(validated, by_alias=True)).body
+
+
+def fast_path(rows):
+    return dumps({"items": [post_record(*row) for row in rows], "nextCursor": None})
+
+
+def best_of(fn, rows, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(rows)
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rows = make_rows(count)
+
+    slow = best_of(pydantic_path, rows, repeats)
+    fast = best_of(fast_path, rows, repeats)
+    print(f"rows={count} encoder={'orjson' if orjson else 'json'}")
+    print(f"  pydantic + response_model: {slow:8.2f} ms")
+    print(f"  records + fast encoder:    {fast:8.2f} ms ({slow / fast:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
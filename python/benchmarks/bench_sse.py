@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Hold many idle Server-Sent Events subscribers on one uvicorn worker
+
+Starts the app under uvicorn, opens N concurrent /api/events streams, reports
+the server's resident memory per connection, then publishes one post and
+measures how long the fan-out to every subscriber takes.
+
+Usage: python benchmarks/bench_sse.py [subscribers] [port]
+"""
+
+import asyncio
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+APP_DIR = Path(__file__).resolve().parent.parent
+CONNECT_BATCH = 500
+
+
+def rss_kb(pid):
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError("VmRSS not found")
+
+
+def start_server(port):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning", "--no-access-log",
+         "--backlog", "4096"],
+        cwd=APP_DIR, env=env
+    )
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/events/stats").raise_for_status()
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+async def subscribe(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /api/events HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n")
+    await writer.drain()
+    await reader.readuntil(b"retry:")
+    return reader, writer
+
+
+async def wait_for_event(reader, event_type):
+    await reader.readuntil(b"event: " + event_type)
+
+
+async def run(port, subscribers, server_pid):
+    idle_rss = rss_kb(server_pid)
+    connections = []
+    started = time.perf_counter()
+    for start in range(0, subscribers, CONNECT_BATCH):
+        connections += await asyncio.gather(*(subscribe(port) for _ in range(min(CONNECT_BATCH, subscribers - start))))
+    connect_seconds = time.perf_counter() - started
+
+    await asyncio.sleep(1)
+    loaded_rss = rss_kb(server_pid)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+        stats = (await client.get("/events/stats")).json()
+        waiters = [asyncio.ensure_future(wait_for_event(reader, b"post.created")) for reader, _ in connections]
+        started = time.perf_counter()
+        await client.post("/api/posts", json={"username": "contoso", "content": "Breaking news"})
+        await asyncio.gather(*waiters)
+        fanout_seconds = time.perf_counter() - started
+
+    for _, writer in connections:
+        writer.close()
+
+    print(f"subscribers={subscribers} (server reports {stats['subscribers']})")
+    print(f"  connect:  {connect_seconds:6.2f}s")
+    print(f"  memory:   {idle_rss / 1024:6.1f} MiB idle -> {loaded_rss / 1024:6.1f} MiB "
+          f"({(loaded_rss - idle_rss) / subscribers:.1f} KiB per subscriber)")
+    print(f"  fan-out:  {fanout_seconds * 1000:6.1f} ms to deliver one event to every subscriber")
+
+
+def main():
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8765
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    server = start_server(port)
+    try:
+        asyncio.run(run(port, subscribers, server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
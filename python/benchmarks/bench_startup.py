@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Profile cold start: importing the app, the lifespan startup and the first requests
+
+Usage: python benchmarks/bench_startup.py [runs] [--imports]
+
+Every run is a fresh interpreter on a fresh database, like a new container.
+Runs alternate between generating the OpenAPI document on its first request
+and serving one prebuilt by build_openapi.py (OPENAPI_PREBUILT). Medians
+are reported per phase. --imports also prints the modules that took longest
+to import, from python -X importtime.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from main import app
+imported = time.perf_counter()
+import httpx
+
+async def probe():
+    phases = {"import": imported - started}
+    begin = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        phases["lifespan"] = time.perf_counter() - begin
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://probe") as client:
+            for name, url in (("first /api/posts", "/api/posts"), ("first /openapi.json", "/openapi.json")):
+                begin = time.perf_counter()
+                (await client.get(url, headers={"Accept-Encoding": "gzip"})).raise_for_status()
+                phases[name] = time.perf_counter() - begin
+    phases["to first request"] = phases["import"] + phases["lifespan"] + phases["first /api/posts"]
+    print(json.dumps(phases))
+
+asyncio.run(probe())
+"""
+
+
+def run_probe(extra_env: dict, *flags: str) -> subprocess.CompletedProcess:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}",
+        **extra_env,
+    }
+    return subprocess.run(
+        [sys.executable, *flags, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def slowest_imports(count: int = 15) -> list[tuple[float, str]]:
+    """Modules by cumulative import time, in ms, from python -X importtime"""
+    stderr = run_probe({}, "-X", "importtime").stderr
+    timings = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            timings.append((int(cumulative) / 1000, name.rstrip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else 10
+    prebuilt = os.path.join(tempfile.mkdtemp(prefix="sns_bench_"), "openapi.json")
+    subprocess.run([sys.executable, "build_openapi.py", prebuilt], cwd=ROOT, check=True, capture_output=True)
+
+    variants = {"generated OpenAPI": {}, "prebuilt OpenAPI": {"OPENAPI_PREBUILT": prebuilt}}
+    samples = {name: [] for name in variants}
+    for _ in range(runs):
+        for name, extra_env in variants.items():
+            samples[name].append(json.loads(run_probe(extra_env).stdout))
+
+    print(f"{runs} cold starts per variant, medians in ms")
+    for name, phases in samples.items():
+        print(f"  {name}")
+        for phase in phases[0]:
+            print(f"    {phase:22} {statistics.median(sample[phase] for sample in phases) * 1000:8.1f}")
+
+    if "--imports" in sys.argv:
+        print("slowest imports (cumulative ms)")
+        for elapsed, name in slowest_imports():
+            print(f"  {elapsed:8.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Measure top-K reads of the ranked feeds over a large post table
+
+Posts are loaded straight into the database with skewed like and comment
+counts spread over the last 30 days. The indexed, precomputed trending score
+is compared with ranking by the same formula computed per request.
+
+Usage: python benchmarks/bench_trending.py [posts] [requests]
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import models
+from database import engine
+from main import app
+from ranking import TRENDING_SCORE_SQL
+
+LOAD_CHUNK = 50000
+TOP_K = 20
+
+
+def load_posts(total):
+    rng = random.Random(19)
+    now = datetime.utcnow()
+    with engine.begin() as connection:
+        for start in range(0, total, LOAD_CHUNK):
+            rows = []
+            for i in range(start, min(start + LOAD_CHUNK, total)):
+                created_at = now - timedelta(seconds=rng.randrange(30 * 24 * 3600))
+                rows.append({
+                    "id": f"post-{i:016x}",
+                    "username": f"user-{i % 1000}",
+                    "content": "Benchmark post",
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "likes_count": int(rng.paretovariate(1.2)) - 1,
+                    "comments_count": int(rng.paretovariate(1.5)) - 1
+                })
+            connection.execute(models.Post.__table__.insert(), rows)
+
+
+def median_ms(run, count):
+    durations = []
+    for _ in range(count):
+        started = time.perf_counter()
+        run()
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations) * 1000
+
+
+def main():
+    total_posts = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with TestClient(app) as client:
+        started = time.perf_counter()
+        load_posts(total_posts)
+        print(f"posts={total_posts} loaded in {time.perf_counter() - started:.1f}s")
+
+        with engine.connect() as connection:
+            def query(sql):
+                return lambda: connection.execute(text(sql), {"k": TOP_K}).all()
+
+            indexed = median_ms(query("SELECT id FROM posts ORDER BY trending_score DESC, id DESC LIMIT :k"), requests)
+            top = median_ms(query("SELECT id FROM posts ORDER BY likes_count DESC, id DESC LIMIT :k"), requests)
+            computed = median_ms(query(f"SELECT id FROM posts ORDER BY {TRENDING_SCORE_SQL} DESC, id DESC LIMIT :k"), 5)
+        print(f"  top-{TOP_K} SQL, trending (indexed score): {indexed:8.3f} ms")
+        print(f"  top-{TOP_K} SQL, top (indexed likes):      {top:8.3f} ms")
+        print(f"  top-{TOP_K} SQL, score computed per query: {computed:8.1f} ms")
+
+        for sort in ("trending", "top", "new"):
+            elapsed = median_ms(lambda: client.get("/api/posts", params={"sort": sort, "limit": TOP_K}), requests)
+            print(f"  GET /api/posts?sort={sort:8} (end to end):  {elapsed:8.3f} ms")
+
+        post_id = client.get("/api/posts", params={"sort": "trending", "limit": 1}).json()["items"][0]["id"]
+        likes = iter(range(requests))
+        like = median_ms(lambda: client.post(f"/api/posts/{post_id}/likes", json={"username": f"fan-{next(likes)}"}), requests)
+        print(f"  POST like on the hottest post (rescored in place): {like:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Measure read/write throughput under write contention with default vs tuned SQLite settings
+
+Usage: python benchmarks/bench_write_contention.py [writers] [readers] [seconds]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import SQLITE_PRAGMAS, Base, configure_engine, engine_options
+
+POST_COUNT = 100
+SQLITE_DEFAULTS = {"busy_timeout": SQLITE_PRAGMAS["busy_timeout"]}
+
+
+def make_session_factory(pragmas):
+    url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+    bench_engine = configure_engine(
+        create_engine(url, connect_args={"check_same_thread": False}, **engine_options(url)),
+        pragmas
+    )
+    Base.metadata.create_all(bind=bench_engine)
+    with bench_engine.begin() as conn:
+        conn.execute(models.Post.__table__.insert(), [
+            {"id": f"post-{i:03d}", "username": "contoso", "content": f"Post {i}"} for i in range(POST_COUNT)
+        ])
+    return sessionmaker(autocommit=False, autoflush=False, bind=bench_engine)
+
+
+def run(session_factory, writers, readers, seconds):
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def record(key):
+        with lock:
+            counts[key] += 1
+
+    def writer(writer_id):
+        i = 0
+        while time.perf_counter() < deadline:
+            post_id = f"post-{i % POST_COUNT:03d}"
+            with session_factory() as db:
+                try:
+                    # The likes count trigger updates posts.likes_count in the same transaction
+                    db.add(models.Like(post_id=post_id, username=f"writer-{writer_id}-{i}"))
+                    db.commit()
+                    record("writes")
+                except OperationalError:
+                    db.rollback()
+                    record("errors")
+            i += 1
+
+    def reader():
+        i = 0
+        while time.perf_counter() < deadline:
+            with session_factory() as db:
+                db.query(models.Post).filter(models.Post.id == f"post-{i % POST_COUNT:03d}").first()
+            record("reads")
+            i += 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {key: value / seconds for key, value in counts.items()}
+
+
+def main():
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    print(f"writers={writers} readers={readers} duration={seconds}s")
+    for name, pragmas in (("default", SQLITE_DEFAULTS), ("tuned", SQLITE_PRAGMAS)):
+        result = run(make_session_factory(pragmas), writers, readers, seconds)
+        print(f"  {name:>7}: {result['writes']:8.1f} writes/s {result['reads']:9.1f} reads/s {result['errors']:6.1f} errors/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Reproducible throughput and latency benchmarks for the whole API
+
+    cd python && python -m benchmarks.suite --scale small --workload mixed --output baseline.json
+
+datagen builds a seeded synthetic dataset whose posts per user and comments
+and likes per post follow power laws, and bulk-loads it into the database.
+workload defines request mixes that cover every operationId in
+openapi.yaml (plus a few extensions), and runner drives them concurrently
+through main.app in process and reports p50/p95/p99 latency and requests
+per second per operation as JSON. Runs with the same seed, scale and
+workload issue the same request sequence per worker, so results of two
+commits can be compared directly.
+"""
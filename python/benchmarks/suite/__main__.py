@@ -0,0 +1,83 @@
+"""Command line of the benchmark suite
+
+Usage: python -m benchmarks.suite [--scale tiny|small|medium|large] [--workload NAME|all]
+                                  [--concurrency N] [--duration SECONDS] [--requests N]
+                                  [--seed N] [--output FILE]
+
+Run from the python directory. The dataset is generated into a fresh
+temporary database unless DATABASE_URL is set, in which case its tables are
+wiped first; the report is printed as JSON, or written to --output.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='sns_bench_'), 'bench.db')}"
+)
+
+import orjson
+
+from .datagen import SCALES
+from .workload import OPERATIONS, WORKLOADS, contract_operation_ids
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--workload", choices=[*WORKLOADS, "all"], default="mixed")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per workload")
+    parser.add_argument("--warmup", type=float, default=1.0, help="unmeasured seconds before each workload")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests instead of a duration")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> dict:
+    args = parse_args(argv)
+    missing = sorted(set(contract_operation_ids()) - set(OPERATIONS))
+    if missing:
+        raise SystemExit(f"No workload operation for: {', '.join(missing)}")
+
+    import repositories
+    if repositories.STORAGE_BACKEND != "sqlite":
+        raise SystemExit("The benchmark suite loads its dataset with SQL and needs STORAGE_BACKEND=sqlite")
+
+    from database import init_db
+    from main import app
+
+    from .datagen import generate
+    from .runner import report, run_workload
+
+    workloads = list(WORKLOADS) if args.workload == "all" else [args.workload]
+    async with app.router.lifespan_context(app):
+        # The generated ids are fixed by the seed, so the tables have to start empty
+        init_db(reset=True)
+        print(f"generating the {args.scale} dataset (seed {args.seed})...", file=sys.stderr)
+        dataset = generate(args.scale, args.seed)
+        runs = []
+        for workload in workloads:
+            print(f"running {workload}...", file=sys.stderr)
+            runs.append(await run_workload(
+                app, dataset, workload, concurrency=args.concurrency, duration=args.duration,
+                requests=args.requests, warmup=args.warmup, seed=args.seed
+            ))
+
+    settings = {key: value for key, value in vars(args).items() if key != "output"}
+    result = report(dataset, runs, settings)
+    payload = orjson.dumps(result, option=orjson.OPT_INDENT_2)
+    if args.output:
+        with open(args.output, "wb") as output:
+            output.write(payload)
+    else:
+        sys.stdout.buffer.write(payload + b"\n")
+    return result
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""Seeded synthetic social data with power-law activity
+
+Users are ranked by activity with a Zipf distribution, so a few users write
+most posts, comments and likes. Comments and likes per post follow Pareto
+tails: most posts get little engagement and a few get a lot. Posts are
+spread over the last Scale.days days, and their comments and likes come
+after them.
+
+Rows are inserted in chunks straight into the database (likes_count is
+filled by the likes triggers), which is much faster than going through the
+API. Only the ids the workloads need are kept in memory.
+"""
+
+import random
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+import models
+from database import engine
+
+INSERT_CHUNK = 20000
+# Comment ids kept for the comment lookups of the workloads
+COMMENT_SAMPLE_SIZE = 100000
+VOCABULARY = (
+    "trail hike summit camp lake river forest ridge valley sunrise sunset tent stove boots rain wind snow map "
+    "compass bridge meadow canyon cliff cabin fire coffee dog friends weekend morning evening trip gear pack "
+    "Contoso jacket paddle kayak climb rope harness bike route photo view storm trailhead"
+).split()
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    posts: int
+    # Pareto shape and scale of comments and likes per post
+    comments_alpha: float = 1.6
+    comments_scale: float = 1.5
+    likes_alpha: float = 1.3
+    likes_scale: float = 3.0
+    # Zipf exponent of per-user activity
+    user_skew: float = 1.1
+    days: int = 30
+
+
+SCALES = {
+    "tiny": Scale(users=100, posts=1000),
+    "small": Scale(users=1000, posts=10000),
+    "medium": Scale(users=10000, posts=100000),
+    "large": Scale(users=100000, posts=1000000),
+}
+
+
+class ZipfSampler:
+    """Draws indexes 0..n-1 with probability proportional to 1 / (index + 1) ** skew"""
+
+    def __init__(self, n: int, skew: float):
+        self._cumulative = list(accumulate(1 / (rank + 1) ** skew for rank in range(n)))
+        self._total = self._cumulative[-1]
+
+    def __call__(self, rng: random.Random) -> int:
+        return bisect_right(self._cumulative, rng.random() * self._total)
+
+    def distinct(self, rng: random.Random, count: int) -> list[int]:
+        """Up to count distinct indexes, still favouring the popular ones"""
+        chosen = {}
+        for _ in range(count * 3):
+            chosen.setdefault(self(rng), None)
+            if len(chosen) == count:
+                break
+        return list(chosen)
+
+
+@dataclass
+class Dataset:
+    seed: int
+    scale_name: str
+    usernames: list[str]
+    post_ids: list[str]
+    # (post_id, comment_id) sample of the generated comments
+    comments: list[tuple[str, str]]
+    counts: dict = field(default_factory=dict)
+    load_seconds: float = 0.0
+
+    def summary(self) -> dict:
+        return {
+            "scale": self.scale_name,
+            "seed": self.seed,
+            "users": len(self.usernames),
+            **self.counts,
+            "loadSeconds": round(self.load_seconds, 2),
+        }
+
+
+def _pareto_count(rng: random.Random, alpha: float, scale: float, cap: int) -> int:
+    return min(int(scale * (rng.paretovariate(alpha) - 1)), cap)
+
+
+def _content(rng: random.Random) -> str:
+    # Mostly short posts with a long tail of trip reports
+    length = min(int(rng.lognormvariate(3.0, 0.8)), 1500)
+    return " ".join(rng.choices(VOCABULARY, k=max(length, 3)))
+
+
+def generate(scale_name: str, seed: int = 42) -> Dataset:
+    """Generate a dataset and load it into the (freshly initialized) database"""
+    scale = SCALES[scale_name]
+    rng = random.Random(seed)
+    users = ZipfSampler(scale.users, scale.user_skew)
+    usernames = [f"user-{index:06d}" for index in range(scale.users)]
+    now = datetime.utcnow().replace(microsecond=0)
+    span = scale.days * 24 * 3600
+
+    post_ids = []
+    comment_sample = []
+    comments_seen = 0
+    likes_total = 0
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        for chunk_start in range(0, scale.posts, INSERT_CHUNK):
+            posts, comments, likes = [], [], []
+            for index in range(chunk_start, min(chunk_start + INSERT_CHUNK, scale.posts)):
+                post_id = f"post-{seed:04x}{index:012x}"
+                created_at = now - timedelta(seconds=rng.randrange(span), microseconds=index % 1000000)
+                age = max(int((now - created_at).total_seconds()), 1)
+                comment_count = _pareto_count(rng, scale.comments_alpha, scale.comments_scale, 10000)
+                for comment_index in range(comment_count):
+                    comment_id = f"comment-{seed:04x}{index:012x}{comment_index:05x}"
+                    comment_at = created_at + timedelta(seconds=rng.randrange(age))
+                    comments.append({
+                        "id": comment_id,
+                        "post_id": post_id,
+                        "username": usernames[users(rng)],
+                        "content": _content(rng),
+                        "created_at": comment_at,
+                        "updated_at": comment_at,
+                    })
+                    # Reservoir sample, so every comment is equally likely to be looked up
+                    comments_seen += 1
+                    if len(comment_sample) < COMMENT_SAMPLE_SIZE:
+                        comment_sample.append((post_id, comment_id))
+                    else:
+                        slot = rng.randrange(comments_seen)
+                        if slot < COMMENT_SAMPLE_SIZE:
+                            comment_sample[slot] = (post_id, comment_id)
+
+                like_count = _pareto_count(rng, scale.likes_alpha, scale.likes_scale, scale.users)
+                for liker in users.distinct(rng, like_count):
+                    likes.append({
+                        "post_id": post_id,
+                        "username": usernames[liker],
+                        "created_at": created_at + timedelta(seconds=rng.randrange(age)),
+                    })
+
+                posts.append({
+                    "id": post_id,
+                    "username": usernames[users(rng)],
+                    "content": _content(rng),
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                    "likes_count": 0,
+                    "comments_count": comment_count,
+                })
+                post_ids.append(post_id)
+
+            connection.execute(models.Post.__table__.insert(), posts)
+            if comments:
+                connection.execute(models.Comment.__table__.insert(), comments)
+            if likes:
+                connection.execute(models.Like.__table__.insert(), likes)
+            likes_total += len(likes)
+
+    return Dataset(
+        seed=seed,
+        scale_name=scale_name,
+        usernames=usernames,
+        post_ids=post_ids,
+        comments=comment_sample,
+        counts={"posts": len(post_ids), "comments": comments_seen, "likes": likes_total},
+        load_seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,141 @@
+"""Drive a workload through main.app and summarize the latencies
+
+Requests go through httpx's ASGI transport, so they exercise routing,
+validation, the repositories and serialization without a network stack in
+between. Workers run concurrently on one event loop, the way uvicorn runs
+a single process. Only the request an operation produces is timed; the
+untimed setup requests of deletes and unlikes are not reported.
+"""
+
+import asyncio
+import math
+import platform
+import random
+import sqlite3
+import subprocess
+import time
+from collections import defaultdict
+from itertools import accumulate
+from pathlib import Path
+
+import httpx
+
+from .datagen import Dataset
+from .workload import OPERATIONS, WORKLOADS, Request, Targets, WorkloadState, record_created, record_read
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered: list[float], pct: int) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    summary = {"requests": len(ordered), "errors": errors, "rps": round(len(ordered) / elapsed, 1)}
+    if ordered:
+        for pct in PERCENTILES:
+            summary[f"p{pct}Ms"] = round(percentile(ordered, pct) * 1000, 3)
+        summary["maxMs"] = round(ordered[-1] * 1000, 3)
+    return summary
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "commit": commit,
+    }
+
+
+async def run_workload(
+    app, dataset: Dataset, workload: str, *, concurrency: int = 8, duration: float = 10.0,
+    requests: int = 0, warmup: float = 1.0, seed: int = 42
+) -> dict:
+    """Run one workload for a duration (or a total number of requests) and report per operation.
+
+    Requests made during the warmup are not recorded.
+    """
+    weights = WORKLOADS[workload]
+    names = list(weights)
+    cumulative = list(accumulate(weights.values()))
+    targets = Targets(dataset, seed)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    failures = {}
+    budget = {"left": requests}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def send(request: Request, state: WorkloadState) -> httpx.Response:
+            response = await client.request(request.method, request.url, params=request.params, json=request.json)
+            if response.status_code == request.expected and response.content:
+                body = response.json()
+                record_created(state, request, body)
+                record_read(state, request, body)
+            return response
+
+        async def worker(number: int, measure_from: float, deadline: float):
+            state = WorkloadState(targets, number, random.Random(seed * 1000 + number))
+
+            async def setup(request: Request):
+                response = await send(request, state)
+                if response.status_code != request.expected:
+                    raise RuntimeError(f"setup {request.method} {request.url} failed: {response.status_code}")
+
+            while time.perf_counter() < deadline:
+                if requests:
+                    if budget["left"] <= 0:
+                        return
+                    budget["left"] -= 1
+                name = state.rng.choices(names, cum_weights=cumulative)[0]
+                request = await OPERATIONS[name](state, setup)
+                started = time.perf_counter()
+                response = await send(request, state)
+                finished = time.perf_counter()
+                if started < measure_from:
+                    continue
+                latencies[name].append(finished - started)
+                if response.status_code != request.expected:
+                    errors[name] += 1
+                    failures.setdefault(f"{name} {response.status_code}", response.text[:200])
+
+        async def run_phase(seconds: float, measured: bool):
+            begin = time.perf_counter()
+            deadline = begin + seconds if seconds else float("inf")
+            measure_from = begin if measured else float("inf")
+            await asyncio.gather(*(worker(number, measure_from, deadline) for number in range(concurrency)))
+            return time.perf_counter() - begin
+
+        if warmup and not requests:
+            await run_phase(warmup, measured=False)
+        elapsed = await run_phase(0 if requests else duration, measured=True)
+
+    every = [latency for values in latencies.values() for latency in values]
+    return {
+        "workload": workload,
+        "concurrency": concurrency,
+        "durationSeconds": round(elapsed, 3),
+        "total": summarize(every, sum(errors.values()), elapsed),
+        "operations": {
+            name: summarize(latencies[name], errors[name], elapsed) for name in names if latencies[name]
+        },
+        "failures": failures,
+    }
+
+
+def report(dataset: Dataset, runs: list[dict], settings: dict) -> dict:
+    return {
+        "environment": environment(),
+        "settings": settings,
+        "dataset": dataset.summary(),
+        "runs": runs,
+    }
@@ -0,0 +1,217 @@
+"""Request mixes over every operation of the API contract
+
+Each operation builds one request from the shared WorkloadState. Reads and
+writes target posts chosen with a Zipf distribution, so a few hot posts get
+most of the traffic, like on a real feed. Deletes and unlikes only touch
+rows that the workload created itself (creating one first, untimed, when
+there is none), so the generated dataset stays intact for the reads.
+"""
+
+import random
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from .datagen import Dataset, ZipfSampler, _content
+
+CONTRACT_PATH = Path(__file__).resolve().parents[3] / "openapi.yaml"
+SEARCH_WORDS = ("trail", "summit", "kayak", "storm", "coffee", "trailhead", "harness")
+
+
+@dataclass
+class Request:
+    method: str
+    url: str
+    expected: int
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+
+
+class Targets:
+    """Hot spots of a dataset, shared by all the workers of a run"""
+
+    def __init__(self, dataset: Dataset, seed: int):
+        # Popularity is unrelated to generation order
+        self.dataset = dataset
+        self.popular = dataset.post_ids[:]
+        random.Random(seed).shuffle(self.popular)
+        self.hot_posts = ZipfSampler(len(self.popular), 1.0)
+        self.active_users = ZipfSampler(len(dataset.usernames), 1.1)
+
+
+@dataclass
+class WorkloadState:
+    """What the operations of one worker share: its random stream and the rows it created"""
+
+    targets: Targets
+    worker: int
+    rng: random.Random
+    own_posts: list[str] = field(default_factory=list)
+    own_comments: list[tuple[str, str]] = field(default_factory=list)
+    own_likes: list[tuple[str, str]] = field(default_factory=list)
+    feed_cursor: Optional[str] = None
+    sequence: int = 0
+
+    def post(self) -> str:
+        return self.targets.popular[self.targets.hot_posts(self.rng)]
+
+    def user(self) -> str:
+        return self.targets.dataset.usernames[self.targets.active_users(self.rng)]
+
+    def comment(self) -> tuple[str, str]:
+        return self.rng.choice(self.targets.dataset.comments)
+
+    def new_username(self) -> str:
+        # Liking users who never liked anything, so every like is a new row
+        self.sequence += 1
+        return f"bench-{self.worker:03d}-{self.sequence:08d}"
+
+    def body(self) -> dict:
+        return {"username": self.user(), "content": _content(self.rng)}
+
+
+Setup = Callable[[Request], Awaitable[Any]]
+Operation = Callable[[WorkloadState, Setup], Awaitable[Request]]
+
+
+async def get_posts(state, setup):
+    # Every fourth read of the feed follows the cursor of the previous one
+    params = {"limit": 20}
+    if state.feed_cursor and state.rng.random() < 0.25:
+        params["cursor"] = state.feed_cursor
+    return Request("GET", "/api/posts", 200, params=params)
+
+
+async def create_post(state, setup):
+    return Request("POST", "/api/posts", 201, json=state.body())
+
+
+async def get_post_by_id(state, setup):
+    return Request("GET", f"/api/posts/{state.post()}", 200)
+
+
+async def update_post(state, setup):
+    return Request("PATCH", f"/api/posts/{state.post()}", 200, json=state.body())
+
+
+async def delete_post(state, setup):
+    if not state.own_posts:
+        await setup(Request("POST", "/api/posts", 201, json=state.body()))
+    return Request("DELETE", f"/api/posts/{state.own_posts.pop()}", 204)
+
+
+async def get_comments(state, setup):
+    return Request("GET", f"/api/posts/{state.post()}/comments", 200, params={"limit": 20})
+
+
+async def create_comment(state, setup):
+    return Request("POST", f"/api/posts/{state.post()}/comments", 201, json=state.body())
+
+
+async def get_comment_by_id(state, setup):
+    post_id, comment_id = state.comment()
+    return Request("GET", f"/api/posts/{post_id}/comments/{comment_id}", 200)
+
+
+async def update_comment(state, setup):
+    post_id, comment_id = state.comment()
+    return Request("PATCH", f"/api/posts/{post_id}/comments/{comment_id}", 200, json=state.body())
+
+
+async def delete_comment(state, setup):
+    if not state.own_comments:
+        post_id = state.post()
+        await setup(Request("POST", f"/api/posts/{post_id}/comments", 201, json=state.body()))
+    post_id, comment_id = state.own_comments.pop()
+    return Request("DELETE", f"/api/posts/{post_id}/comments/{comment_id}", 204)
+
+
+async def like_post(state, setup):
+    return Request("POST", f"/api/posts/{state.post()}/likes", 201, json={"username": state.new_username()})
+
+
+async def unlike_post(state, setup):
+    if not state.own_likes:
+        await setup(Request("POST", f"/api/posts/{state.post()}/likes", 201, json={"username": state.new_username()}))
+    post_id, username = state.own_likes.pop()
+    return Request("DELETE", f"/api/posts/{post_id}/likes", 204, params={"username": username})
+
+
+# Operations beyond the contract, keyed by the app's own operation ids
+async def list_posts_trending(state, setup):
+    return Request("GET", "/api/posts", 200, params={"limit": 20, "sort": "trending"})
+
+
+async def search(state, setup):
+    return Request("GET", "/api/search", 200, params={"q": state.rng.choice(SEARCH_WORDS), "limit": 20})
+
+
+async def list_user_posts(state, setup):
+    return Request("GET", f"/api/users/{state.user()}/posts", 200, params={"limit": 20})
+
+
+OPERATIONS: dict[str, Operation] = {
+    "getPosts": get_posts,
+    "createPost": create_post,
+    "getPostById": get_post_by_id,
+    "updatePost": update_post,
+    "deletePost": delete_post,
+    "getCommentsByPostId": get_comments,
+    "createComment": create_comment,
+    "getCommentById": get_comment_by_id,
+    "updateComment": update_comment,
+    "deleteComment": delete_comment,
+    "likePost": like_post,
+    "unlikePost": unlike_post,
+    "listPostsTrending": list_posts_trending,
+    "search": search,
+    "listUserPosts": list_user_posts,
+}
+
+# Relative weights of each operation per workload
+WORKLOADS: dict[str, dict[str, int]] = {
+    "read-heavy": {
+        "getPosts": 30, "getPostById": 25, "getCommentsByPostId": 20, "getCommentById": 8,
+        "likePost": 6, "unlikePost": 2, "createComment": 3, "createPost": 2,
+        "updatePost": 1, "updateComment": 1, "deleteComment": 1, "deletePost": 1,
+    },
+    "mixed": {
+        "getPosts": 20, "getPostById": 15, "getCommentsByPostId": 15, "getCommentById": 5,
+        "likePost": 15, "unlikePost": 5, "createComment": 10, "createPost": 5,
+        "updatePost": 3, "updateComment": 3, "deleteComment": 2, "deletePost": 2,
+    },
+    "write-heavy": {
+        "getPosts": 10, "getPostById": 10, "getCommentsByPostId": 8, "getCommentById": 2,
+        "likePost": 25, "unlikePost": 10, "createComment": 15, "createPost": 10,
+        "updatePost": 4, "updateComment": 3, "deleteComment": 2, "deletePost": 1,
+    },
+    "extended": {
+        "getPosts": 15, "listPostsTrending": 10, "getPostById": 15, "getCommentsByPostId": 12,
+        "getCommentById": 3, "search": 8, "listUserPosts": 7, "likePost": 12, "unlikePost": 3,
+        "createComment": 7, "createPost": 3, "updatePost": 2, "updateComment": 1,
+        "deleteComment": 1, "deletePost": 1,
+    },
+}
+
+
+def contract_operation_ids(path: Path = CONTRACT_PATH) -> list[str]:
+    return re.findall(r"^\s*operationId:\s*(\S+)", path.read_text(), flags=re.MULTILINE)
+
+
+def record_created(state: WorkloadState, request: Request, body: Any) -> None:
+    """Remember the rows a successful write created, for the deletes and unlikes"""
+    if request.method != "POST":
+        return
+    if request.url == "/api/posts":
+        state.own_posts.append(body["id"])
+    elif request.url.endswith("/comments"):
+        state.own_comments.append((body["postId"], body["id"]))
+    elif request.url.endswith("/likes"):
+        state.own_likes.append((body["postId"], body["username"]))
+
+
+def record_read(state: WorkloadState, request: Request, body: Any) -> None:
+    # Only the newest-first feed hands out cursors for get_posts
+    if request.url == "/api/posts" and request.method == "GET" and "sort" not in request.params:
+        state.feed_cursor = body.get("nextCursor")
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""Write the OpenAPI document and its gzipped copy for OPENAPI_PREBUILT
+
+Usage: python build_openapi.py [output]    (default: build/openapi.json)
+
+Run it when building the image, then start the app with
+OPENAPI_PREBUILT=<output> so it serves those bytes instead of generating
+the document.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# Generate from the routes, never from an earlier build
+os.environ.pop("OPENAPI_PREBUILT", None)
+
+from main import app
+from openapi_document import OpenApiDocument
+
+DEFAULT_OUTPUT = Path(__file__).resolve().parent / "build" / "openapi.json"
+
+
+def main():
+    output = sys.argv[1] if len(sys.argv) > 1 else str(DEFAULT_OUTPUT)
+    document = OpenApiDocument.from_schema(app.openapi())
+    document.write(output)
+    print(f"{output}: {len(document.body)} bytes, {len(document.gzipped)} gzipped, ETag {document.etag}")
+
+
+if __name__ == "__main__":
+    main()
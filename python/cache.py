@@ -0,0 +1,140 @@
+"""Read-through cache of serialized GET responses
+
+Entries hold a response's ETag and JSON bytes and are grouped by the resource
+they were built from (a post, or the comments of a post). Mutating handlers
+invalidate whole groups, so every cached variant of a resource (e.g. each
+comments page) is dropped at once. Entries also expire after a TTL and the
+least recently used ones are evicted once the cache is full.
+
+The cache is only touched from handlers running on the event loop, so it
+needs no locking.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from itertools import count
+from time import perf_counter
+from typing import Any, Hashable, Optional
+
+from fastapi import Response
+from pydantic import BaseModel
+
+from metrics import record_serialization
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+
+def post_group(post_id: str) -> str:
+    return f"post:{post_id}"
+
+
+def comments_group(post_id: str) -> str:
+    return f"comments:{post_id}"
+
+
+def serialize(value: BaseModel) -> bytes:
+    """Serialize a response model with its camelCase aliases"""
+    started = perf_counter()
+    body = value.model_dump_json(by_alias=True).encode()
+    record_serialization(perf_counter() - started)
+    return body
+
+
+def json_response(body: bytes, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self._group_keys: dict[str, set[tuple]] = {}
+        # Last invalidation tick per group, to reject fills that raced a write
+        self._invalidated_at: OrderedDict[str, int] = OrderedDict()
+        self._ticks = count(1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, group: str, variant: Hashable = None) -> Optional[Any]:
+        key = (group, variant)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def begin_fill(self) -> int:
+        """Take a ticket before loading a value that will be passed to put()"""
+        return next(self._ticks)
+
+    def put(self, group: str, variant: Hashable, value: Any, ticket: int) -> Any:
+        """Store a value unless its group was invalidated after the ticket was taken"""
+        if not self.enabled or self._invalidated_at.get(group, 0) > ticket:
+            return value
+
+        key = (group, variant)
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        self._group_keys.setdefault(group, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return value
+
+    def invalidate(self, *groups: str):
+        for group in groups:
+            self._invalidated_at[group] = next(self._ticks)
+            self._invalidated_at.move_to_end(group)
+            for key in self._group_keys.pop(group, ()):
+                del self._entries[key]
+                self.invalidations += 1
+        while len(self._invalidated_at) > max(self.max_entries, 1):
+            self._invalidated_at.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self._group_keys.clear()
+        self._invalidated_at.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, key: tuple):
+        del self._entries[key]
+        group_keys = self._group_keys.get(key[0])
+        if group_keys is not None:
+            group_keys.discard(key)
+            if not group_keys:
+                del self._group_keys[key[0]]
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,69 @@
+"""Shared pytest fixtures for the API tests
+
+The suite also passes run again with DATABASE_MODE=async, and with
+LIKE_WRITE_BEHIND=1, where likes are buffered; tests asserting persisted
+like state or statement counts pin likes written straight through with the
+write_through fixture.
+"""
+
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports database.py
+_db_dir = tempfile.mkdtemp(prefix="sns_api_test_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+# Every test client starts from an empty database
+os.environ["RESET_DATABASE"] = "1"
+# Requests running more SQL statements than their route's query_budget() fail the test
+os.environ.setdefault("QUERY_BUDGET_STRICT", "1")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from like_buffer import like_buffer
+from main import app
+
+
+@pytest.fixture
+def client():
+    """Test client with a freshly initialized database"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def write_through(monkeypatch):
+    """Write likes straight to the database even when LIKE_WRITE_BEHIND is set"""
+    monkeypatch.setattr(like_buffer, "enabled", False)
+
+
+@pytest.fixture
+def statement_counter():
+    """Collect every SQL statement sent to the database while the test runs
+
+    Listens on every Engine, so statements of the aiosqlite engine (created
+    on first use when DATABASE_MODE=async) are counted as well.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+def executed_queries():
+    """Collect (statement, parameters) of every SQL statement sent to the database, e.g. to explain them"""
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append((statement, parameters))
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    yield queries
+    event.remove(Engine, "before_cursor_execute", before_cursor_execute)
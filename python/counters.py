@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Denormalized like/comment counters stored on the posts table
+
+posts.comments_count is kept in step with the comments table by the write
+handlers inside their own transaction; posts.likes_count is maintained by
+triggers on the likes table (see models.LIKES_COUNT_TRIGGERS). If either
+ever drifts (manual edits, a crash between releases), run this module to
+rebuild every counter from the base tables:
+
+    python counters.py
+"""
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+import models
+
+
+def adjust_post_counters(db: Session, post_id: str, comments: int) -> bool:
+    """Add a delta to a post's comments count in the caller's transaction.
+
+    The increment happens in SQL so concurrent writers never lose updates, and
+    updated_at is pinned so that a comment doesn't count as an edit. Returns
+    False when the post does not exist, so callers can use the update as
+    their existence check. likes_count is left to the likes count triggers.
+    """
+    result = db.execute(
+        update(models.Post)
+        .where(models.Post.id == post_id)
+        .values(
+            comments_count=models.Post.comments_count + comments,
+            updated_at=models.Post.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount > 0
+
+
+def reconcile_counters(db: Session) -> int:
+    """Recompute every post's counters from the likes and comments tables"""
+    likes_count = (
+        select(func.count())
+        .where(models.Like.post_id == models.Post.id)
+        .scalar_subquery()
+    )
+    comments_count = (
+        select(func.count())
+        .where(models.Comment.post_id == models.Post.id)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(models.Post)
+        .values(
+            likes_count=likes_count,
+            comments_count=comments_count,
+            updated_at=models.Post.updated_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from database import SessionLocal
+
+    with SessionLocal() as session:
+        updated = reconcile_counters(session)
+    print(f"Reconciled counters for {updated} posts")
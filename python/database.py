@@ -1,16 +1,174 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import logging
+import math
+import os
+import sqlite3
+from contextlib import asynccontextmanager
+from functools import partial
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import declarative_base, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sns_api.db"
+from metrics import record_statement, timed_db_runner
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sns_api.db")
+
+# "sync" runs queries on the threadpool, "async" runs them on an aiosqlite engine
+DATABASE_MODE = os.getenv("DATABASE_MODE", "sync")
+
+# Applied to every new SQLite connection; set a variable to "" to skip that pragma
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+}
+
+# Drop every table on startup and migrate from scratch (tests and throwaway dev databases)
+RESET_DATABASE = os.getenv("RESET_DATABASE", "0").lower() in ("1", "true", "yes")
+
+# Statements slower than this are logged with their query plan; 0 disables the log
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+EXPLAINABLE_STATEMENTS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# pysqlite opens a transaction right before the first INSERT/UPDATE/DELETE. With
+# BEGIN IMMEDIATE that transaction takes the write lock up front, waiting for
+# it under busy_timeout; a deferred BEGIN could fail with "database is locked"
+# straight away when another connection committed a write in the meantime.
+# Reads still run outside of transactions.
+CONNECT_ARGS = {"check_same_thread": False, "isolation_level": "IMMEDIATE"}
+
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value:
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def ensure_math_functions(dbapi_connection):
+    """Provide log2() where SQLite was built without its math functions (used by posts.trending_score)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT log2(1)")
+    except sqlite3.OperationalError:
+        dbapi_connection.create_function("log2", 1, math.log2, deterministic=True)
+    finally:
+        cursor.close()
+
+
+def explain_query_plan(dbapi_connection, statement, parameters) -> list[str]:
+    """EXPLAIN QUERY PLAN of a statement as indented lines, one per plan step"""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        depths = {0: -1}
+        lines = []
+        for step_id, parent_id, _, detail in cursor.fetchall():
+            depths[step_id] = depths.get(parent_id, -1) + 1
+            lines.append("  " * depths[step_id] + detail)
+        return lines
+    finally:
+        cursor.close()
+
+
+def instrument_engine(sync_engine):
+    """Count statements and their execution time per request, and log the slow ones with their plan"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_statement(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def finish_statement(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["statement_started"].pop()
+        record_statement(elapsed)
+        if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+            log_slow_statement(conn, statement, parameters[0] if executemany else parameters, elapsed)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def abandon_statement(exception_context):
+        started = exception_context.connection.info.get("statement_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+
+def log_slow_statement(conn, statement, parameters, elapsed):
+    plan = []
+    if statement.lstrip().upper().startswith(EXPLAINABLE_STATEMENTS):
+        try:
+            plan = explain_query_plan(conn.connection.dbapi_connection, statement, parameters)
+        except Exception as error:  # the plan is best effort, the statement itself already ran
+            plan = [f"(no query plan: {error})"]
+    logger.warning(
+        "Slow SQL statement (%.1f ms): %s\nParameters: %r\nQuery plan:\n%s",
+        elapsed * 1000, statement, parameters, "\n".join(plan) or "(none)"
+    )
+
+
+def configure_engine(sync_engine, pragmas=None):
+    """Register the connect-time pragma hook and the statement instrumentation on a (sync or async.sync_engine) engine"""
+    pragmas = SQLITE_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+        ensure_math_functions(dbapi_connection)
+
+    instrument_engine(sync_engine)
+    return sync_engine
+
+
+def engine_options(url):
+    """Pool sizing only applies to file databases; in-memory ones use a single static connection"""
+    if ":memory:" in url or url.rstrip("/").endswith(":"):
+        return {}
+    return dict(POOL_OPTIONS)
+
+
+engine = configure_engine(create_engine(
+    SQLALCHEMY_DATABASE_URL, connect_args=CONNECT_ARGS,
+    **engine_options(SQLALCHEMY_DATABASE_URL)
+))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Runs fn(session, *args) against the database and returns its result
+DbRunner = Callable[..., Awaitable[Any]]
+
+_async_sessionmaker = None
+
+
+def get_async_sessionmaker():
+    """Create the aiosqlite engine on first use so sync deployments never import it"""
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        async_engine = create_async_engine(
+            SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1),
+            connect_args={"isolation_level": CONNECT_ARGS["isolation_level"]},
+            **engine_options(SQLALCHEMY_DATABASE_URL)
+        )
+        configure_engine(async_engine.sync_engine)
+        _async_sessionmaker = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=True)
+    return _async_sessionmaker
+
 
 def get_db():
     db = SessionLocal()
@@ -20,7 +178,43 @@ def get_db():
         db.close()
 
 
-def init_db():
-    """Initialize database by dropping all tables and creating them fresh"""
-    Base.metadata.drop_all(bind=engine)
-    Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def open_db_runner():
+    """Open a session and provide a coroutine function running fn(session, *args) in the configured mode.
+
+    Query logic stays in plain functions that take a sync Session. In sync mode
+    those run on the threadpool; in async mode they run through
+    AsyncSession.run_sync so the event loop never waits on SQLite.
+    """
+    if DATABASE_MODE == "async":
+        async with get_async_sessionmaker()() as session:
+            yield timed_db_runner(partial(session.run_sync, _run_with_session))
+        return
+
+    db = SessionLocal()
+    try:
+        yield timed_db_runner(partial(run_in_threadpool, _run_with_session, db))
+    finally:
+        db.close()
+
+
+def _run_with_session(db, fn, *args, **kwargs):
+    """Run fn, then end any transaction it left open so its connection goes back to the pool.
+
+    A request may await other work between two queries (e.g. the like buffer
+    retrying a lookup); holding a pooled connection across those awaits can
+    starve the pool.
+    """
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.rollback()
+
+
+def init_db(reset: Optional[bool] = None):
+    """Bring the schema up to date (see migrations.py), wiping the database first when reset (default RESET_DATABASE)"""
+    from migrations import migrate, reset_schema
+
+    if RESET_DATABASE if reset is None else reset:
+        reset_schema(engine)
+    migrate(engine)
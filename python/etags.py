@@ -0,0 +1,67 @@
+"""Strong ETags and If-None-Match handling for the GET endpoints
+
+ETags are derived from what makes a representation change: a post's
+updated_at plus its like/comment counters, a comment's updated_at, and for
+list pages the version of every item on the page plus the next cursor.
+List handlers can therefore compare an If-None-Match header against a
+narrow version query and answer 304 without loading any content.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import Response
+
+import schemas
+
+
+def _etag(*parts) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def post_version(post: schemas.Post) -> tuple:
+    return (post.id, post.updated_at, post.likes_count, post.comments_count)
+
+
+def comment_version(comment: schemas.Comment) -> tuple:
+    return (comment.id, comment.updated_at)
+
+
+def post_record_version(record: dict) -> tuple:
+    return (record["id"], record["updatedAt"], record["likesCount"], record["commentsCount"])
+
+
+def comment_record_version(record: dict) -> tuple:
+    return (record["id"], record["updatedAt"])
+
+
+def _normalize(version: tuple) -> tuple:
+    return tuple(part.isoformat() if isinstance(part, datetime) else part for part in version)
+
+
+def resource_etag(kind: str, version: tuple) -> str:
+    return _etag(kind, _normalize(version))
+
+
+def page_etag(kind: str, versions: Iterable[tuple], next_cursor: Optional[str]) -> str:
+    return _etag(kind, [_normalize(version) for version in versions], next_cursor)
+
+
+def content_etag(body: bytes) -> str:
+    """ETag of a static representation, from its bytes"""
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison as required for If-None-Match (RFC 9110 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
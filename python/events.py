@@ -0,0 +1,143 @@
+"""In-process pub/sub broker behind the Server-Sent Events streams
+
+Mutating handlers publish change events to topics: FEED_TOPIC carries the
+lifecycle of posts (created, updated, deleted) and post_topic(post_id)
+carries everything that happens to one post (edits, comments, likes). Each
+event is encoded once and the same bytes are queued for every subscriber.
+
+A subscriber owns a bounded queue, so an idle connection costs one queue
+and one suspended generator; keepalive comments are queued for everyone by
+a single broker task instead of a timer per connection. A subscriber that
+falls EVENT_QUEUE_SIZE events behind is disconnected rather than buffered
+without limit; EventSource clients reconnect on their own and should
+refetch what they display.
+
+Publishing happens on the event loop, so the broker needs no locking.
+"""
+
+import asyncio
+import os
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel
+
+from serialization import dumps
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "64"))
+EVENT_KEEPALIVE_SECONDS = float(os.getenv("EVENT_KEEPALIVE_SECONDS", "15"))
+# Reconnect delay suggested to EventSource clients
+EVENT_RETRY_MS = int(os.getenv("EVENT_RETRY_MS", "3000"))
+
+FEED_TOPIC = "posts"
+KEEPALIVE_MESSAGE = b": keepalive\n\n"
+
+
+def post_topic(post_id: str) -> str:
+    return f"post:{post_id}"
+
+
+class Subscription:
+    __slots__ = ("topic", "queue")
+
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        # None is the end-of-stream marker
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(queue_size)
+
+
+class EventBroker:
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._topics: dict[str, set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+        self.disconnected = 0
+
+    def subscribe(self, topic: str) -> Subscription:
+        subscription = Subscription(topic, self.queue_size)
+        self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._topics.get(subscription.topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[subscription.topic]
+
+    def publish(self, event_type: str, payload, *topics: str):
+        """Queue an event for every subscriber of the given topics"""
+        subscribers = [subscription for topic in topics for subscription in self._topics.get(topic, ())]
+        self.published += 1
+        if not subscribers:
+            return
+
+        if isinstance(payload, BaseModel):
+            payload = payload.model_dump(by_alias=True)
+        message = b"event: " + event_type.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self._disconnect(subscription)
+
+    async def send_keepalives(self, interval: float = EVENT_KEEPALIVE_SECONDS):
+        """Periodically queue an SSE comment on every stream so idle proxies don't cut it"""
+        while True:
+            await asyncio.sleep(interval)
+            for subscribers in list(self._topics.values()):
+                for subscription in list(subscribers):
+                    try:
+                        subscription.queue.put_nowait(KEEPALIVE_MESSAGE)
+                    except asyncio.QueueFull:
+                        self._disconnect(subscription)
+
+    def subscriber_count(self, topic: Optional[str] = None) -> int:
+        if topic is not None:
+            return len(self._topics.get(topic, ()))
+        return sum(len(subscribers) for subscribers in self._topics.values())
+
+    def close_all(self):
+        """End every open stream, e.g. on shutdown"""
+        for subscribers in list(self._topics.values()):
+            for subscription in list(subscribers):
+                self._disconnect(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscriber_count(),
+            "topics": len(self._topics),
+            "queueSize": self.queue_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "disconnected": self.disconnected,
+        }
+
+    def _disconnect(self, subscription: Subscription):
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        self.disconnected += 1
+
+
+async def event_stream(broker: EventBroker, topic: str) -> AsyncIterator[bytes]:
+    """Server-Sent Events body for one subscriber of a topic.
+
+    The subscription is taken when the body starts streaming and released when
+    the client goes away (the generator is cancelled) or is disconnected.
+    """
+    subscription = broker.subscribe(topic)
+    try:
+        yield f"retry: {EVENT_RETRY_MS}\n\n".encode()
+        while True:
+            message = await subscription.queue.get()
+            if message is None:
+                return
+            yield message
+    finally:
+        broker.unsubscribe(subscription)
+
+
+event_broker = EventBroker()
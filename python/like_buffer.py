@@ -0,0 +1,281 @@
+"""Opt-in write-behind buffer for likes on hot posts
+
+With LIKE_WRITE_BEHIND=1, like and unlike requests only record the desired
+state of each (post_id, username) pair in process; later requests for the
+same pair overwrite it. A background task started by the app lifespan
+flushes the pending pairs every LIKE_FLUSH_INTERVAL_MS in one transaction,
+and the lifespan flushes once more on shutdown.
+
+The buffer keeps, per post, how far the pending pairs move likes_count from
+what is persisted, and get_post adds that delta so a client reads its own
+likes straight away. Feed listings show persisted counts and catch up after
+the next flush. Batch likes are written straight away too, after flushing
+whatever is pending for their pairs, while single likes of those pairs wait.
+
+Like the response cache, the buffer is only touched from the event loop, so
+it needs no locking.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import schemas
+from repositories import Repository, open_repository
+
+LIKE_WRITE_BEHIND = os.getenv("LIKE_WRITE_BEHIND", "0").lower() in ("1", "true", "yes")
+LIKE_FLUSH_INTERVAL_MS = float(os.getenv("LIKE_FLUSH_INTERVAL_MS", "50"))
+
+logger = logging.getLogger(__name__)
+
+Result = TypeVar("Result")
+
+
+@dataclass
+class _PendingLike:
+    persisted: Optional[schemas.Like]
+    desired: Optional[schemas.Like]
+
+    @property
+    def delta(self) -> int:
+        return (self.desired is not None) - (self.persisted is not None)
+
+
+class LikeBuffer:
+    def __init__(self, enabled: bool = LIKE_WRITE_BEHIND, interval_ms: float = LIKE_FLUSH_INTERVAL_MS):
+        self.enabled = enabled
+        self.interval = interval_ms / 1000
+        self._pending: dict[tuple[str, str], _PendingLike] = {}
+        self._in_flight: dict[tuple[str, str], _PendingLike] = {}
+        self._in_flight_posts: set[str] = set()
+        # Pairs a batch is writing straight to the database
+        self._writing: set[tuple[str, str]] = set()
+        self._deltas: dict[str, int] = {}
+        self._lookups: dict[tuple[str, str], asyncio.Future] = {}
+        # Bumped after every flush so reads that overlapped one can retry
+        self._generation = 0
+        self._flushing: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_likes = 0
+        self.flushed_unlikes = 0
+
+    async def like(self, repo: Repository, post_id: str, username: str) -> Optional[tuple[schemas.Like, bool]]:
+        """Buffer a like, returning the like and whether it is new, or None when the post does not exist"""
+        entry = await self._entry(repo, post_id, username)
+        if entry is None:
+            return None
+        if entry.desired is not None:
+            return entry.desired, False
+        self._set_desired(post_id, entry, schemas.Like(postId=post_id, username=username, createdAt=datetime.utcnow()))
+        return entry.desired, True
+
+    async def like_many(self, repo: Repository, items: list[tuple[str, str]]) -> list[Optional[tuple[schemas.Like, bool]]]:
+        """Like many pairs at once, like Repository.like_posts, without double counting pending likes
+
+        The batch is written straight to the database once nothing is pending
+        or in flight for its pairs. Like a flush, the write holds off other
+        flushes, and reads of its posts wait for it.
+        """
+        keys = set(items)
+        while True:
+            while self._flushing is not None:
+                await asyncio.shield(self._flushing)
+            if keys.isdisjoint(self._pending):
+                break
+            await self.flush()
+
+        self._writing = keys
+        self._in_flight_posts = {post_id for post_id, _ in keys}
+        self._flushing = asyncio.get_running_loop().create_future()
+        try:
+            return await repo.like_posts(items)
+        finally:
+            self._writing = set()
+            self._in_flight_posts = set()
+            self._generation += 1
+            self._flushing.set_result(None)
+            self._flushing = None
+
+    async def unlike(self, repo: Repository, post_id: str, username: str) -> bool:
+        """Buffer an unlike, returning False when there is no like to remove"""
+        entry = await self._entry(repo, post_id, username)
+        if entry is None or entry.desired is None:
+            return False
+        self._set_desired(post_id, entry, None)
+        return True
+
+    def likes_delta(self, post_id: str) -> int:
+        return self._deltas.get(post_id, 0)
+
+    async def consistent_read(self, post_id: str, read: Callable[[], Awaitable[Result]]) -> tuple[Result, int]:
+        """Run a read of a post's persisted state and return it with the pending likes delta.
+
+        A flush commits in a worker thread while the delta still counts its
+        likes, so a read overlapping a flush could count them twice; such
+        reads wait for the flush and run again.
+        """
+        while True:
+            if self._flushing is not None and post_id in self._in_flight_posts:
+                await asyncio.shield(self._flushing)
+                continue
+
+            generation = self._generation
+            result = await read()
+            if generation == self._generation and post_id not in self._in_flight_posts:
+                return result, self.likes_delta(post_id)
+
+    def forget_post(self, post_id: str):
+        """Drop pending likes of a deleted post"""
+        for key in [key for key in self._pending if key[0] == post_id]:
+            self._add_delta(post_id, -self._pending.pop(key).delta)
+
+    async def flush(self):
+        """Write every pending pair in one transaction"""
+        while self._flushing is not None:
+            await asyncio.shield(self._flushing)
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, {}
+        self._in_flight = batch
+        self._in_flight_posts = {post_id for post_id, _ in batch}
+        self._flushing = asyncio.get_running_loop().create_future()
+        try:
+            likes = [entry.desired for entry in batch.values() if entry.desired and not entry.persisted]
+            unlikes = [key for key, entry in batch.items() if entry.persisted and not entry.desired]
+            if likes or unlikes:
+                async with open_repository() as repo:
+                    await repo.apply_like_changes(likes, unlikes)
+        except Exception:
+            self._requeue(batch)
+            raise
+        else:
+            for (post_id, _), entry in batch.items():
+                self._add_delta(post_id, -entry.delta)
+            self.flushed_likes += len(likes)
+            self.flushed_unlikes += len(unlikes)
+        finally:
+            self._in_flight = {}
+            self._in_flight_posts = set()
+            self._generation += 1
+            self._flushing.set_result(None)
+            self._flushing = None
+
+    def start(self):
+        """Start the background flushes on the running loop"""
+        loop = asyncio.get_running_loop()
+        self._forget_other_loops(loop)
+        if self.enabled and self._task is None:
+            self._task = loop.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and flush whatever is still pending"""
+        self._forget_other_loops(asyncio.get_running_loop())
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def clear(self):
+        self._pending.clear()
+        self._deltas.clear()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._pending),
+            "flushedLikes": self.flushed_likes,
+            "flushedUnlikes": self.flushed_unlikes,
+        }
+
+    def _forget_other_loops(self, loop: asyncio.AbstractEventLoop):
+        """Drop the task and futures of an earlier app lifespan's event loop
+
+        The buffer is shared by every lifespan in the process (a restart, or a
+        second TestClient), but a task can only be awaited on its own loop, so
+        another loop's task is cancelled through that loop and forgotten. A
+        flush it left unfinished is requeued; writing a batch twice is harmless.
+        """
+        if self._task is not None and self._task.get_loop() is not loop:
+            if not self._task.get_loop().is_closed():
+                self._task.get_loop().call_soon_threadsafe(self._task.cancel)
+            self._task = None
+        if self._flushing is not None and self._flushing.get_loop() is not loop:
+            self._requeue(self._in_flight)
+            self._in_flight = {}
+            self._in_flight_posts = set()
+            self._flushing = None
+        self._lookups = {key: lookup for key, lookup in self._lookups.items() if lookup.get_loop() is loop}
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                # Shielded so that stop() never abandons a transaction midway
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Flushing buffered likes failed; retrying on the next tick")
+
+    async def _entry(self, repo: Repository, post_id: str, username: str) -> Optional[_PendingLike]:
+        key = (post_id, username)
+        while True:
+            if key in self._writing:
+                await asyncio.shield(self._flushing)
+                continue
+
+            entry = self._pending.get(key)
+            if entry is not None:
+                return entry
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                # Once the flush lands, the in-flight state is what is persisted
+                return self._pending.setdefault(key, _PendingLike(in_flight.desired, in_flight.desired))
+
+            # Concurrent requests for a pair share one lookup, so nobody can
+            # buffer and flush the pair while that lookup is running
+            generation = self._generation
+            lookup = self._lookups.get(key)
+            if lookup is None:
+                lookup = self._lookups[key] = asyncio.ensure_future(repo.find_like(post_id, username))
+                lookup.add_done_callback(lambda _: self._lookups.pop(key, None))
+            post_exists, like = await asyncio.shield(lookup)
+            # A batch that wrote the pair meanwhile may have made the lookup stale
+            if key in self._in_flight or key in self._writing or generation != self._generation:
+                continue
+            if not post_exists:
+                return None
+            return self._pending.setdefault(key, _PendingLike(like, like))
+
+    def _set_desired(self, post_id: str, entry: _PendingLike, desired: Optional[schemas.Like]):
+        before = entry.delta
+        entry.desired = desired
+        self._add_delta(post_id, entry.delta - before)
+
+    def _add_delta(self, post_id: str, change: int):
+        delta = self._deltas.get(post_id, 0) + change
+        if delta:
+            self._deltas[post_id] = delta
+        else:
+            self._deltas.pop(post_id, None)
+
+    def _requeue(self, batch: dict[tuple[str, str], _PendingLike]):
+        """Put a failed batch back; newer pending entries keep their desired state"""
+        for key, entry in batch.items():
+            newer = self._pending.get(key)
+            if newer is None:
+                self._pending[key] = entry
+            else:
+                newer.persisted = entry.persisted
+
+
+like_buffer = LikeBuffer()
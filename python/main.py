@@ -1,15 +1,33 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import RedirectResponse
+from starlette.routing import Route
+from cache import response_cache
 from database import init_db
-from routers import posts, comments, likes
+from events import event_broker
+from like_buffer import like_buffer
+from metrics import CONTENT_TYPE, METRICS_ENABLED, MetricsMiddleware, metrics
+from openapi_document import openapi_document
+import repositories
+from routers import posts, comments, likes, events, search, users
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialize database on application startup"""
-    init_db()
+    """Migrate the database on application startup and flush buffered likes on shutdown"""
+    if repositories.STORAGE_BACKEND == "sqlite":
+        init_db()
+    response_cache.clear()
+    metrics.clear()
+    like_buffer.clear()
+    like_buffer.start()
+    keepalives = asyncio.create_task(event_broker.send_keepalives())
     yield
+    keepalives.cancel()
+    event_broker.close_all()
+    await like_buffer.stop()
 
 
 # Initialize FastAPI with metadata matching openapi.yaml
@@ -38,6 +56,18 @@ app = FastAPI(
         {
             "name": "Likes",
             "description": "Operations related to likes management"
+        },
+        {
+            "name": "Events",
+            "description": "Real-time change notifications over Server-Sent Events"
+        },
+        {
+            "name": "Search",
+            "description": "Full-text search over posts and comments"
+        },
+        {
+            "name": "Users",
+            "description": "Posts, comments and likes of one user"
         }
     ],
     servers=[
@@ -52,6 +82,23 @@ app = FastAPI(
     openapi_url="/openapi.json"
 )
 
+
+def openapi_json(request: Request):
+    """The OpenAPI document, encoded and gzipped once or prebuilt (see openapi_document.py)"""
+    return openapi_document(app.openapi).response(
+        request.headers.get("if-none-match"), request.headers.get("accept-encoding")
+    )
+
+
+# Takes the place of the route FastAPI registers at openapi_url, which encodes app.openapi() again
+# on every request. Swapped in before any router is included, so it keeps that route's place ahead
+# of the API routes and matching it never builds their state.
+app.router.routes[:] = [
+    Route(app.openapi_url, openapi_json, include_in_schema=False) if getattr(route, "path", None) == app.openapi_url
+    else route
+    for route in app.router.routes
+]
+
 # Configure CORS to allow all origins
 app.add_middleware(
     CORSMiddleware,
@@ -61,10 +108,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so the recorded latency covers every other middleware
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers WITH /api prefix for frontend compatibility
 app.include_router(posts.router, prefix="/api")
 app.include_router(comments.router, prefix="/api")
 app.include_router(likes.router, prefix="/api")
+app.include_router(likes.batch_router, prefix="/api")
+app.include_router(events.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
+app.include_router(users.router, prefix="/api")
 
 
 def custom_openapi():
@@ -84,7 +139,10 @@ def custom_openapi():
         tags=[
             {"name": "Posts", "description": "Operations related to posts management"},
             {"name": "Comments", "description": "Operations related to comments on posts"},
-            {"name": "Likes", "description": "Operations related to liking posts"}
+            {"name": "Likes", "description": "Operations related to liking posts"},
+            {"name": "Events", "description": "Real-time change notifications over Server-Sent Events"},
+            {"name": "Search", "description": "Full-text search over posts and comments"},
+            {"name": "Users", "description": "Posts, comments and likes of one user"}
         ]
     )
     
@@ -290,10 +348,34 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 
+
+@app.get("/cache/stats", include_in_schema=False)
+def cache_stats():
+    """Hit, miss and eviction counters of the response cache"""
+    return response_cache.stats()
+
+
+@app.get("/events/stats", include_in_schema=False)
+def event_stats():
+    """Subscriber and delivery counters of the event broker"""
+    return event_broker.stats()
+
+
+@app.get("/likes/buffer/stats", include_in_schema=False)
+def like_buffer_stats():
+    """Pending and flushed counts of the write-behind like buffer"""
+    return like_buffer.stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Per-route request metrics in the Prometheus text format"""
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
+
+
 @app.get("/")
 def root():
     """Root endpoint redirects to Swagger UI"""
-    from fastapi.responses import RedirectResponse
     return RedirectResponse(url="/docs")
 
 
@@ -0,0 +1,292 @@
+"""Per-route request metrics in the Prometheus text format
+
+MetricsMiddleware records, per method, route template (e.g.
+/api/posts/{postId}) and status code: a request count, a latency
+histogram, the response size, and how much of the latency went to the
+database and to JSON serialization, and the number of SQL statements. A
+single gauge tracks requests in flight. GET /metrics renders everything in
+the Prometheus text format.
+
+Requests carry a RequestTimings object in a context variable: the database
+runner adds the time spent running repository functions (see
+database.open_db_runner), the engine hooks in database.py count statements
+and their execution time, and serialization.dumps and cache.serialize add
+their encoding time. Responses a route returns as models are encoded by
+FastAPI and count as neither. The totals are also sent to the client in a
+Server-Timing header, and checked against the statement budget a route
+declares with query_budget().
+
+A request's database work runs one step at a time, so its timings and the
+registry (only updated on the event loop) need no locking. Set
+METRICS_ENABLED=0 to leave the middleware out, which disables all of the
+above, or SERVER_TIMING_ENABLED=0 to only drop the header.
+"""
+
+import logging
+import os
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Awaitable, Callable, Optional, Union
+
+from fastapi import Depends, Request
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+SERVER_TIMING_ENABLED = os.getenv("SERVER_TIMING_ENABLED", "1").lower() in ("1", "true", "yes")
+QUERY_BUDGET_STRICT = os.getenv("QUERY_BUDGET_STRICT", "0").lower() in ("1", "true", "yes")
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RequestTimings:
+    __slots__ = ("db", "serialization", "statements", "sql", "budget")
+
+    def __init__(self):
+        self.db = 0.0
+        self.serialization = 0.0
+        # SQL statements executed and the time spent in them (see database.instrument_engine)
+        self.statements = 0
+        self.sql = 0.0
+        # Statement budget the route declared with query_budget()
+        self.budget: Optional[int] = None
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db * 1000:.3f}, sql;dur={self.sql * 1000:.3f};desc="{self.statements} SQL", '
+            f"serialize;dur={self.serialization * 1000:.3f}"
+        )
+
+
+_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_serialization(seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.serialization += seconds
+
+
+def record_statement(seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings.statements += 1
+        timings.sql += seconds
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(statements: Union[int, Callable[[Request], Awaitable[int]]]):
+    """Route dependency declaring how many SQL statements one request may run.
+
+    statements is a number, or for routes whose work grows with the request
+    (the batch endpoints) a coroutine function computing it from the request.
+    Requests over budget are logged, or fail with QueryBudgetExceeded when
+    QUERY_BUDGET_STRICT is set (as the test suite does).
+    """
+    async def declare_budget(request: Request):
+        timings = _timings.get()
+        if timings is not None:
+            timings.budget = statements if isinstance(statements, int) else await statements(request)
+
+    return Depends(declare_budget)
+
+
+def timed_db_runner(run: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+    """Wrap a DbRunner so the time spent in it counts as database time of the current request"""
+    async def run_timed(fn, *args, **kwargs):
+        timings = _timings.get()
+        if timings is None:
+            return await run(fn, *args, **kwargs)
+        started = perf_counter()
+        try:
+            return await run(fn, *args, **kwargs)
+        finally:
+            timings.db += perf_counter() - started
+
+    return run_timed
+
+
+class RouteSeries:
+    """Everything recorded for one (method, route, status)"""
+
+    __slots__ = (
+        "count", "seconds", "buckets", "response_bytes", "db_seconds", "serialization_seconds", "statements"
+    )
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # Per bucket, not cumulative; the last slot is +Inf
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.response_bytes = 0
+        self.db_seconds = 0.0
+        self.serialization_seconds = 0.0
+        self.statements = 0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.series: dict[tuple[str, str, int], RouteSeries] = {}
+        self.in_flight = 0
+
+    def clear(self) -> None:
+        self.series.clear()
+
+    def observe(
+        self, method: str, route: str, status: int, seconds: float, response_bytes: int, timings: RequestTimings
+    ) -> None:
+        key = (method, route, status)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = RouteSeries()
+        series.count += 1
+        series.seconds += seconds
+        series.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        series.response_bytes += response_bytes
+        series.db_seconds += timings.db
+        series.serialization_seconds += timings.serialization
+        series.statements += timings.statements
+
+    def render(self) -> str:
+        """The registry in the Prometheus text exposition format"""
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being handled",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+        ]
+        ordered = sorted(self.series.items())
+        labelled = [(_labels(*key), series) for key, series in ordered]
+
+        lines += [
+            "# HELP http_requests_total Requests handled, by method, route template and status",
+            "# TYPE http_requests_total counter",
+        ]
+        lines += [f"http_requests_total{{{labels}}} {series.count}" for labels, series in labelled]
+
+        lines += [
+            "# HELP http_request_duration_seconds Time from receiving a request to sending the end of its response",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for labels, series in labelled:
+            cumulative = 0
+            for bound, observed in zip(LATENCY_BUCKETS, series.buckets):
+                cumulative += observed
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series.count}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {series.seconds!r}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {series.count}")
+
+        lines += [
+            "# HELP http_response_size_bytes Size of the response bodies",
+            "# TYPE http_response_size_bytes summary",
+        ]
+        for labels, series in labelled:
+            lines.append(f"http_response_size_bytes_sum{{{labels}}} {series.response_bytes}")
+            lines.append(f"http_response_size_bytes_count{{{labels}}} {series.count}")
+
+        for name, attribute, help_text in (
+            ("http_request_db_seconds_total", "db_seconds", "Time requests spent running database work"),
+            (
+                "http_request_serialization_seconds_total", "serialization_seconds",
+                "Time requests spent encoding JSON responses"
+            ),
+            ("http_request_db_statements_total", "statements", "SQL statements executed by requests"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            lines += [f"{name}{{{labels}}} {getattr(series, attribute)!r}" for labels, series in labelled]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(method: str, route: str, status: int) -> str:
+    route = route.replace("\\", "\\\\").replace('"', '\\"')
+    return f'method="{method}",route="{route}",status="{status}"'
+
+
+def route_template(scope) -> str:
+    """Path template of the route that handled a request, e.g. /api/posts/{postId}
+
+    The router stores the matched API route in the scope. Routes of included
+    routers may only know their path relative to the include prefix, so the
+    prefix is taken from the request path: everything before the segments
+    the route's own path accounts for. Plain routes (the docs pages) are not
+    stored, but have no parameters, so their paths are their templates.
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is None:
+        if scope["path"] in _static_paths(scope["app"]):
+            return scope["path"]
+        return UNMATCHED_ROUTE
+    segments = path.count("/")
+    if not segments:
+        return path
+    return scope["path"].rsplit("/", segments)[0] + path
+
+
+def _static_paths(app) -> frozenset:
+    paths = getattr(app.state, "static_route_paths", None)
+    if paths is None:
+        paths = app.state.static_route_paths = frozenset(
+            route.path for route in app.routes if "{" not in getattr(route, "path", "{")
+        )
+    return paths
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so the response is streamed through untouched"""
+
+    def __init__(self, app, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        timings = RequestTimings()
+        token = _timings.set(timings)
+        status = 500
+        response_bytes = 0
+
+        async def send_counted(message):
+            nonlocal status, response_bytes
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING_ENABLED:
+                    message["headers"] = [
+                        *message.get("headers", ()), (b"server-timing", timings.server_timing().encode())
+                    ]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        registry.in_flight += 1
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_counted)
+        finally:
+            elapsed = perf_counter() - started
+            registry.in_flight -= 1
+            _timings.reset(token)
+            route = route_template(scope)
+            registry.observe(scope["method"], route, status, elapsed, response_bytes, timings)
+        if timings.budget is not None and timings.statements > timings.budget:
+            message = (
+                f"{scope['method']} {route} ran {timings.statements} SQL statements, "
+                f"over its budget of {timings.budget}"
+            )
+            if QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
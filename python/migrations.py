@@ -0,0 +1,188 @@
+"""Versioned schema migrations, applied in place on startup
+
+The schema version is kept in SQLite's user_version header field. Startup
+reads it and returns straight away when the database is current, so a
+restart costs one PRAGMA however large the database is. Otherwise the
+pending migrations run in a single BEGIN IMMEDIATE transaction: the first
+worker to boot takes the write lock and migrates, the others wait for it,
+find the version already current and carry on.
+
+Each migration only adds what is missing (tables, columns, indexes,
+triggers), so it is safe on a fresh database and on databases created by
+earlier versions of the app, including ones that predate this module
+(version 0). A fresh database goes through every migration, starting from
+the tables as the first release created them, so each change to the schema
+lives in exactly one migration. Migrations never rebuild a table; add new
+ones at the end of MIGRATIONS and never edit or reorder the released ones,
+which is why they spell out their DDL rather than read it off the models.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy.engine import Connection, Engine
+
+import models
+from database import Base
+
+logger = logging.getLogger(__name__)
+
+# How long a worker waits for another one to finish migrating, in milliseconds
+MIGRATION_LOCK_TIMEOUT_MS = 10 * 60 * 1000
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _columns(connection: Connection, table: str) -> set[str]:
+    # table_xinfo, unlike table_info, also lists generated columns
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_xinfo({table})")}
+
+
+def _exists(connection: Connection, kind: str, name: str) -> bool:
+    return connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?", (kind, name)
+    ).first() is not None
+
+
+def _create_indexes(connection: Connection, *names: str) -> None:
+    indexes = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        indexes[name].create(connection, checkfirst=True)
+
+
+# The tables as the first release of the app created them
+_BASELINE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS posts (id VARCHAR NOT NULL, username VARCHAR NOT NULL, content VARCHAR NOT NULL, "
+    "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, PRIMARY KEY (id))",
+    "CREATE INDEX IF NOT EXISTS ix_posts_id ON posts (id)",
+    "CREATE TABLE IF NOT EXISTS comments (id VARCHAR NOT NULL, post_id VARCHAR NOT NULL, username VARCHAR NOT NULL, "
+    "content VARCHAR NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(post_id) REFERENCES posts (id))",
+    "CREATE INDEX IF NOT EXISTS ix_comments_id ON comments (id)",
+    "CREATE TABLE IF NOT EXISTS likes (post_id VARCHAR NOT NULL, username VARCHAR NOT NULL, "
+    "created_at DATETIME NOT NULL, PRIMARY KEY (post_id, username), FOREIGN KEY(post_id) REFERENCES posts (id))",
+)
+
+
+def _create_tables(connection: Connection) -> None:
+    for statement in _BASELINE_SCHEMA:
+        connection.exec_driver_sql(statement)
+
+
+def _add_post_counters(connection: Connection) -> None:
+    columns = _columns(connection, "posts")
+    for column in ("likes_count", "comments_count"):
+        if column not in columns:
+            connection.exec_driver_sql(f"ALTER TABLE posts ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+    if columns >= {"likes_count", "comments_count"}:
+        return
+    connection.exec_driver_sql(
+        "UPDATE posts SET "
+        "likes_count = (SELECT count(*) FROM likes WHERE likes.post_id = posts.id), "
+        "comments_count = (SELECT count(*) FROM comments WHERE comments.post_id = posts.id)"
+    )
+
+
+def _add_likes_count_triggers(connection: Connection) -> None:
+    for trigger in models.LIKES_COUNT_TRIGGERS:
+        connection.execute(trigger)
+
+
+def _add_pagination_indexes(connection: Connection) -> None:
+    _create_indexes(
+        connection,
+        "ix_posts_created_at_id",
+        "ix_posts_username_created_at_id",
+        "ix_posts_likes_count_id",
+        "ix_comments_post_id_created_at_id",
+        "ix_comments_username_created_at_id",
+        "ix_likes_username_created_at_post_id",
+    )
+
+
+def _add_search_indexes(connection: Connection) -> None:
+    missing = False
+    for searched_table, statements in models.SEARCH_INDEXES.items():
+        missing = missing or not _exists(connection, "table", f"{searched_table.name}_fts")
+        for statement in statements:
+            connection.execute(statement)
+    if missing:
+        # Index the rows written before the triggers existed
+        models.rebuild_search_indexes(connection)
+
+
+def _add_trending_score(connection: Connection) -> None:
+    """Add posts.trending_score and its index.
+
+    SQLite can only add VIRTUAL generated columns to an existing table, so a
+    migrated database computes the score on read where a fresh one stores it.
+    Both are indexed, and the feed's top-K reads go through the index either
+    way; turning the column into a stored one would take a table rebuild.
+    """
+    if "trending_score" not in _columns(connection, "posts"):
+        expression = models.Post.__table__.c.trending_score.computed.sqltext
+        connection.exec_driver_sql(
+            f"ALTER TABLE posts ADD COLUMN trending_score FLOAT GENERATED ALWAYS AS ({expression}) VIRTUAL"
+        )
+    _create_indexes(connection, "ix_posts_trending_score_id")
+
+
+MIGRATIONS = (
+    Migration(1, "posts, comments and likes tables", _create_tables),
+    Migration(2, "likes and comments counters on posts", _add_post_counters),
+    Migration(3, "triggers keeping likes_count in step with likes", _add_likes_count_triggers),
+    Migration(4, "keyset pagination indexes", _add_pagination_indexes),
+    Migration(5, "full-text search indexes on posts and comments", _add_search_indexes),
+    Migration(6, "trending score of posts", _add_trending_score),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(connection: Connection) -> int:
+    return connection.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def migrate(engine: Engine) -> list[int]:
+    """Apply the pending migrations and return their versions"""
+    with engine.connect() as connection:
+        version = schema_version(connection)
+        if version >= LATEST_VERSION:
+            if version > LATEST_VERSION:
+                logger.warning(
+                    "Database schema version %d is newer than this app knows (%d)", version, LATEST_VERSION
+                )
+            return []
+
+        busy_timeout = connection.exec_driver_sql("PRAGMA busy_timeout").scalar()
+        connection.exec_driver_sql(f"PRAGMA busy_timeout = {MIGRATION_LOCK_TIMEOUT_MS}")
+        try:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+            # Another worker may have migrated while this one waited for the lock
+            version = schema_version(connection)
+            pending = [migration for migration in MIGRATIONS if migration.version > version]
+            for migration in pending:
+                migration.apply(connection)
+                logger.info("Applied schema migration %d: %s", migration.version, migration.description)
+            if pending:
+                connection.exec_driver_sql(f"PRAGMA user_version = {pending[-1].version}")
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            connection.exec_driver_sql(f"PRAGMA busy_timeout = {busy_timeout}")
+        return [migration.version for migration in pending]
+
+
+def reset_schema(engine: Engine) -> None:
+    """Drop every table, so the next migrate() starts from an empty database"""
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("PRAGMA user_version = 0")
@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy import DDL, Column, Computed, Float, String, Integer, DateTime, ForeignKey, Index, event
 from sqlalchemy.orm import relationship
 from database import Base
+from ranking import TRENDING_SCORE_SQL
 
 
 class Post(Base):
@@ -12,10 +13,24 @@ class Post(Base):
     content = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    likes_count = Column(Integer, default=0, server_default="0", nullable=False)
+    comments_count = Column(Integer, default=0, server_default="0", nullable=False)
+    # Recomputed by SQLite whenever the counters change (see ranking.py)
+    trending_score = Column(Float, Computed(TRENDING_SCORE_SQL, persisted=True))
     
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     likes = relationship("Like", back_populates="post", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves the newest-first keyset pagination of the feed
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # Serves the same pagination of one user's posts
+        Index("ix_posts_username_created_at_id", "username", "created_at", "id"),
+        # Serve the trending and top orderings of the feed
+        Index("ix_posts_trending_score_id", "trending_score", "id"),
+        Index("ix_posts_likes_count_id", "likes_count", "id"),
+    )
+
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -29,6 +44,13 @@ class Comment(Base):
     
     post = relationship("Post", back_populates="comments")
 
+    __table_args__ = (
+        # Serves the per-post keyset pagination of comments
+        Index("ix_comments_post_id_created_at_id", "post_id", "created_at", "id"),
+        # Serves the keyset pagination of one user's comments
+        Index("ix_comments_username_created_at_id", "username", "created_at", "id"),
+    )
+
 
 class Like(Base):
     __tablename__ = "likes"
@@ -38,3 +60,66 @@ class Like(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     post = relationship("Post", back_populates="likes")
+
+    __table_args__ = (
+        # Serves the keyset pagination of one user's likes
+        Index("ix_likes_username_created_at_post_id", "username", "created_at", "post_id"),
+    )
+
+
+# posts.likes_count follows the likes table inside the same statement, so a
+# like or unlike is a single INSERT or DELETE however many run concurrently
+LIKES_COUNT_TRIGGERS = (
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS trg_likes_count_insert AFTER INSERT ON likes BEGIN "
+        "UPDATE posts SET likes_count = likes_count + 1 WHERE id = NEW.post_id; END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS trg_likes_count_delete AFTER DELETE ON likes BEGIN "
+        "UPDATE posts SET likes_count = likes_count - 1 WHERE id = OLD.post_id; END"
+    ),
+)
+
+for trigger in LIKES_COUNT_TRIGGERS:
+    event.listen(Like.__table__, "after_create", trigger)
+
+
+def _search_index_ddl(table: str) -> tuple[DDL, ...]:
+    """External-content FTS5 index over table.content, kept in step by triggers.
+
+    The index stores only the tokens and points back at the table's rowid. The
+    update trigger is limited to the content column, so counter updates on
+    posts never touch the index. Rowids of tables without an INTEGER PRIMARY
+    KEY may change on VACUUM; run rebuild_search_indexes() after one.
+    """
+    index = f"{table}_fts"
+    remove = f"INSERT INTO {index}({index}, rowid, content) VALUES ('delete', OLD.rowid, OLD.content);"
+    add = f"INSERT INTO {index}(rowid, content) VALUES (NEW.rowid, NEW.content);"
+    return (
+        DDL(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"content, content='{table}', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')"
+        ),
+        DDL(f"CREATE TRIGGER IF NOT EXISTS trg_{index}_insert AFTER INSERT ON {table} BEGIN {add} END"),
+        DDL(f"CREATE TRIGGER IF NOT EXISTS trg_{index}_delete AFTER DELETE ON {table} BEGIN {remove} END"),
+        DDL(f"CREATE TRIGGER IF NOT EXISTS trg_{index}_update AFTER UPDATE OF content ON {table} BEGIN {remove} {add} END"),
+    )
+
+
+SEARCH_INDEXES = {
+    Post.__table__: _search_index_ddl("posts"),
+    Comment.__table__: _search_index_ddl("comments"),
+}
+
+for searched_table, statements in SEARCH_INDEXES.items():
+    for statement in statements:
+        event.listen(searched_table, "after_create", statement)
+    # The triggers go with the table, the virtual table has to be dropped explicitly
+    event.listen(searched_table, "before_drop", DDL(f"DROP TABLE IF EXISTS {searched_table.name}_fts"))
+
+
+def rebuild_search_indexes(connection):
+    """Re-index every post and comment from scratch (e.g. after a VACUUM or a bulk import)"""
+    for searched_table in SEARCH_INDEXES:
+        index = f"{searched_table.name}_fts"
+        connection.exec_driver_sql(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
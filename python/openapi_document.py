@@ -0,0 +1,89 @@
+"""The OpenAPI document as ready-to-send bytes
+
+FastAPI's own /openapi.json route re-encodes the schema on every request,
+and its first request also generates it: main.custom_openapi walks and
+rewrites every route. Here the document is encoded and gzipped once and
+then served as bytes, with an ETag.
+
+By default that happens on the first request. With OPENAPI_PREBUILT set to
+a file written at build time by build_openapi.py, the bytes (and the .gz
+file next to them) are read from disk instead, so a short-lived container
+never generates the schema. A prebuilt document is only as current as the
+build that wrote it; rebuild it whenever routes or schemas change.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import Response
+
+from etags import content_etag, etag_matches
+from serialization import dumps
+
+OPENAPI_PREBUILT = os.getenv("OPENAPI_PREBUILT", "")
+
+
+@dataclass(frozen=True)
+class OpenApiDocument:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+    @classmethod
+    def from_body(cls, body: bytes, gzipped: Optional[bytes] = None) -> "OpenApiDocument":
+        if gzipped is None:
+            # Only needed when nothing was prebuilt, so serving a prebuilt document never imports it
+            import gzip
+
+            # mtime=0 keeps the gzipped bytes reproducible from build to build
+            gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        return cls(body, gzipped, content_etag(body))
+
+    @classmethod
+    def from_schema(cls, schema: dict) -> "OpenApiDocument":
+        return cls.from_body(dumps(schema))
+
+    @classmethod
+    def load(cls, path: str) -> "OpenApiDocument":
+        """Read a document written by write(); the .gz file is optional"""
+        body = Path(path).read_bytes()
+        gzipped_path = Path(f"{path}.gz")
+        return cls.from_body(body, gzipped_path.read_bytes() if gzipped_path.exists() else None)
+
+    def write(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_bytes(self.body)
+        Path(f"{path}.gz").write_bytes(self.gzipped)
+
+    def response(self, if_none_match: Optional[str], accept_encoding: Optional[str]) -> Response:
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding"}
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        if accepts_gzip(accept_encoding):
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=self.gzipped, media_type="application/json", headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for coding in (accept_encoding or "").lower().split(","):
+        name, _, params = coding.partition(";")
+        if name.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+_document: Optional[OpenApiDocument] = None
+
+
+def openapi_document(generate: Callable[[], dict]) -> OpenApiDocument:
+    """The prebuilt document when OPENAPI_PREBUILT is set, otherwise generate()'s, encoded once"""
+    global _document
+    if _document is None:
+        if OPENAPI_PREBUILT:
+            _document = OpenApiDocument.load(OPENAPI_PREBUILT)
+        else:
+            _document = OpenApiDocument.from_schema(generate())
+    return _document
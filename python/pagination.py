@@ -0,0 +1,76 @@
+"""Keyset (cursor) pagination helpers shared by the list endpoints"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """Encode the sort key of the last item on a page into an opaque cursor"""
+    payload = json.dumps([created_at.isoformat(), item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor, rejecting anything malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_score_cursor(score: float, item_id: str) -> str:
+    """Cursor for orderings by a numeric score (feed rankings, search relevance)"""
+    payload = json.dumps([score, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_score_cursor(cursor: str) -> tuple[float, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            raise TypeError(score)
+        return score, str(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query, created_at_column, id_column, cursor: Optional[str], limit: int, sort_key: Callable):
+    """Apply newest-first keyset ordering to a query and fetch one page.
+
+    Returns the rows of the page and the cursor for the next page (None on the
+    last page). sort_key maps a row to its (created_at, id) pair. One extra row
+    is fetched to detect whether a next page exists.
+    """
+    if cursor:
+        query = query.filter(tuple_(created_at_column, id_column) < decode_cursor(cursor))
+
+    rows = query.order_by(created_at_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_cursor(*sort_key(rows[-1]))
+
+
+def paginate_by_score(query, score_column, id_column, cursor: Optional[str], limit: int, sort_key: Callable):
+    """Same as paginate, ordered by a numeric score, highest first; sort_key maps a row to (score, id)"""
+    if cursor:
+        query = query.filter(tuple_(score_column, id_column) < decode_score_cursor(cursor))
+
+    rows = query.order_by(score_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    return rows, encode_score_cursor(*sort_key(rows[-1]))
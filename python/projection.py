@@ -0,0 +1,79 @@
+"""Sparse fieldsets (fields=) and content previews (preview=) for list endpoints
+
+A projection names the API fields a client wants and optionally truncates
+content to its first N characters. Repositories load only the projected
+fields plus the few small ones the endpoint needs for its ETag and cursor,
+and the SQLite backend truncates with substr() so long content never leaves
+the database. With a preview, records also carry contentTruncated.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException
+
+POST_FIELDS = ("id", "username", "content", "createdAt", "updatedAt", "likesCount", "commentsCount")
+COMMENT_FIELDS = ("id", "postId", "username", "content", "createdAt", "updatedAt")
+# What the list endpoints derive their ETags from (see etags.py)
+POST_VERSION_FIELDS = ("id", "updatedAt", "likesCount", "commentsCount")
+COMMENT_VERSION_FIELDS = ("id", "updatedAt")
+
+TRUNCATED_FIELD = "contentTruncated"
+
+
+@dataclass(frozen=True)
+class Projection:
+    # Fields in the response, in schema order
+    fields: tuple[str, ...]
+    # Fields the repository has to load: the response fields plus the version fields
+    loaded: tuple[str, ...]
+    preview: Optional[int]
+
+    @property
+    def truncates(self) -> bool:
+        return self.preview is not None and "content" in self.loaded
+
+    @property
+    def tag(self) -> str:
+        """Distinguishes the ETags of different projections of the same page"""
+        return f"fields={','.join(self.fields)};preview={self.preview}"
+
+    def project(self, record: dict) -> dict:
+        """Apply the projection to a full record (for backends that cannot push it down)"""
+        projected = {name: record[name] for name in self.loaded}
+        if self.truncates:
+            content = record["content"]
+            projected["content"] = content[:self.preview]
+            projected[TRUNCATED_FIELD] = len(content) > self.preview
+        return projected
+
+    def select(self, record: dict) -> dict:
+        """Drop the fields that were only loaded for the ETag"""
+        selected = {name: record[name] for name in self.fields}
+        if self.truncates and "content" in selected:
+            selected[TRUNCATED_FIELD] = record[TRUNCATED_FIELD]
+        return selected
+
+
+def parse_projection(
+    fields: Optional[str], preview: Optional[int], allowed: tuple[str, ...], version_fields: tuple[str, ...]
+) -> Optional[Projection]:
+    """Build a projection from the query parameters, or None when the full records are wanted.
+
+    The id is always included. Unknown field names are rejected.
+    """
+    if fields is None and preview is None:
+        return None
+
+    if fields is None:
+        requested = set(allowed)
+    else:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - set(allowed))
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(unknown)}")
+        requested.add("id")
+
+    selected = tuple(name for name in allowed if name in requested)
+    loaded = tuple(name for name in allowed if name in requested or name in version_fields)
+    return Projection(selected, loaded, preview)
@@ -0,0 +1,35 @@
+"""Feed orderings and the precomputed trending score
+
+new:      newest first (the default).
+top:      most liked first.
+trending: a hot score in the style of Reddit's ranking,
+
+    log2(1 + likes + 2 * comments) + hours since TRENDING_EPOCH / TRENDING_HALF_LIFE_HOURS
+
+Every doubling of engagement is worth one half-life of recency, which orders
+posts the same way as engagement decaying with age would, but the score of
+a post only changes when its own counters do. SQLite keeps it in a stored
+generated column on posts (indexed for top-K reads), so likes and comments
+update it as part of the counter change and reads never recompute it.
+"""
+
+import math
+from datetime import datetime
+
+SORT_MODES = ("new", "trending", "top")
+
+TRENDING_HALF_LIFE_HOURS = 12
+TRENDING_EPOCH = datetime(2025, 1, 1)
+# julianday() of TRENDING_EPOCH
+_EPOCH_JULIAN_DAY = 2460676.5
+
+TRENDING_SCORE_SQL = (
+    f"log2(1 + likes_count + 2 * comments_count) + "
+    f"(julianday(created_at) - {_EPOCH_JULIAN_DAY}) * 24.0 / {TRENDING_HALF_LIFE_HOURS}"
+)
+
+
+def trending_score(likes_count: int, comments_count: int, created_at: datetime) -> float:
+    """Python twin of TRENDING_SCORE_SQL, for the memory backend"""
+    hours = (created_at - TRENDING_EPOCH).total_seconds() / 3600
+    return math.log2(1 + likes_count + 2 * comments_count) + hours / TRENDING_HALF_LIFE_HOURS
@@ -0,0 +1,40 @@
+"""Storage backends behind a common repository interface
+
+STORAGE_BACKEND selects the implementation used by the routers:
+"sqlite" (default) persists through SQLAlchemy, "memory" keeps everything
+in process and never touches the database.
+"""
+
+import os
+from contextlib import asynccontextmanager
+
+from database import open_db_runner
+from repositories.base import Repository
+from repositories.memory import MemoryRepository
+from repositories.sqlite import SqliteRepository
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+
+memory_repository = MemoryRepository()
+
+
+@asynccontextmanager
+async def open_repository():
+    """Open the configured repository outside of a request (e.g. for background jobs)"""
+    if STORAGE_BACKEND == "memory":
+        yield memory_repository
+        return
+
+    async with open_db_runner() as run_db:
+        yield SqliteRepository(run_db)
+
+
+async def get_repository():
+    """FastAPI dependency yielding the configured repository for one request"""
+    async with open_repository() as repo:
+        yield repo
+
+
+__all__ = [
+    "Repository", "MemoryRepository", "SqliteRepository", "get_repository", "memory_repository", "open_repository"
+]
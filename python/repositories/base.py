@@ -0,0 +1,143 @@
+"""Storage interface the routers talk to"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import schemas
+from projection import Projection
+
+
+class Repository(ABC):
+    """Posts, comments and likes storage.
+
+    Lookups return None (or False for deletes) when the post or child
+    resource does not exist, leaving the HTTP mapping to the routers.
+    Listing methods return a page of items, newest first unless a sort
+    mode (see ranking.SORT_MODES) says otherwise, plus the cursor of the next
+    page; a limit of None returns every item without a cursor. Listed
+    items are plain records (see serialization.post_record/comment_record)
+    rather than schema models, so pages can be encoded without Pydantic.
+    """
+
+    @abstractmethod
+    async def list_posts(
+        self, limit: Optional[int], cursor: Optional[str], sort: str = "new", projection: Optional[Projection] = None
+    ) -> tuple[list[dict], Optional[str]]:
+        """A page of post records, or with a projection only its loaded fields (see projection.py)"""
+
+    @abstractmethod
+    async def list_post_versions(
+        self, limit: Optional[int], cursor: Optional[str], sort: str = "new"
+    ) -> tuple[list[tuple], Optional[str]]:
+        """Same page as list_posts, as (id, updated_at, likes_count, comments_count) without content"""
+
+    @abstractmethod
+    async def create_post(self, username: str, content: str) -> schemas.Post:
+        ...
+
+    @abstractmethod
+    async def create_posts(self, items: list[tuple[str, str]]) -> list[dict]:
+        """Create (username, content) posts in one transaction, returning their records in order"""
+
+    @abstractmethod
+    async def get_post(self, post_id: str) -> Optional[schemas.Post]:
+        ...
+
+    @abstractmethod
+    async def get_posts(self, post_ids: list[str]) -> list[dict]:
+        """Records of the posts that exist among post_ids, in no particular order"""
+
+    @abstractmethod
+    async def update_post(self, post_id: str, content: str) -> Optional[schemas.Post]:
+        ...
+
+    @abstractmethod
+    async def delete_post(self, post_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def list_user_posts(self, username: str, limit: int, cursor: Optional[str]) -> tuple[list[dict], Optional[str]]:
+        ...
+
+    @abstractmethod
+    async def list_user_comments(self, username: str, limit: int, cursor: Optional[str]) -> tuple[list[dict], Optional[str]]:
+        ...
+
+    @abstractmethod
+    async def list_user_likes(self, username: str, limit: int, cursor: Optional[str]) -> tuple[list[dict], Optional[str]]:
+        """A page of username's likes (see serialization.like_record), newest first"""
+
+    @abstractmethod
+    async def search(
+        self, search_type: str, terms: list[str], limit: int, cursor: Optional[str]
+    ) -> tuple[list[dict], Optional[str]]:
+        """Posts or comments containing every term, most relevant first, as search records"""
+
+    @abstractmethod
+    async def list_comments(
+        self, post_id: str, limit: Optional[int], cursor: Optional[str], projection: Optional[Projection] = None,
+        post_exists: bool = False
+    ) -> Optional[tuple[list[dict], Optional[str]]]:
+        """A page of a post's comments, or None when the post does not exist.
+
+        post_exists=True skips checking for the post when the page is empty,
+        for callers that already know it exists.
+        """
+
+    @abstractmethod
+    async def list_comment_versions(
+        self, post_id: str, limit: Optional[int], cursor: Optional[str]
+    ) -> Optional[tuple[list[tuple], Optional[str]]]:
+        """Same page as list_comments, as (id, updated_at) without content"""
+
+    @abstractmethod
+    async def create_comment(self, post_id: str, username: str, content: str) -> Optional[schemas.Comment]:
+        ...
+
+    @abstractmethod
+    async def create_comments(self, post_id: str, items: list[tuple[str, str]]) -> Optional[list[dict]]:
+        """Create (username, content) comments on one post in one transaction"""
+
+    @abstractmethod
+    async def get_comment(self, post_id: str, comment_id: str) -> Optional[schemas.Comment]:
+        ...
+
+    @abstractmethod
+    async def update_comment(self, post_id: str, comment_id: str, content: str) -> Optional[schemas.Comment]:
+        ...
+
+    @abstractmethod
+    async def delete_comment(self, post_id: str, comment_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def like_post(self, post_id: str, username: str) -> Optional[tuple[schemas.Like, bool]]:
+        """Like a post; liking it again returns the existing like.
+
+        None when the post does not exist, otherwise the like and whether this
+        call created it.
+        """
+
+    @abstractmethod
+    async def like_posts(self, items: list[tuple[str, str]]) -> list[Optional[tuple[dict, bool]]]:
+        """Apply (post_id, username) likes in one transaction.
+
+        Each result is None when the post does not exist, otherwise the like
+        record and whether this call created it.
+        """
+
+    @abstractmethod
+    async def find_like(self, post_id: str, username: str) -> tuple[bool, Optional[schemas.Like]]:
+        """Whether the post exists, and username's like of it if there is one"""
+
+    @abstractmethod
+    async def apply_like_changes(self, likes: list[schemas.Like], unlikes: list[tuple[str, str]]):
+        """Insert likes and delete (post_id, username) likes in one transaction.
+
+        Likes that already exist or whose post is gone are skipped, as are
+        unlikes of likes that don't exist.
+        """
+
+    @abstractmethod
+    async def unlike_post(self, post_id: str, username: str) -> bool:
+        ...
@@ -0,0 +1,373 @@
+"""Pure in-memory repository for read-heavy replicas and tests
+
+Everything lives in dicts and sorted key lists: posts by id plus a
+(created_at, id) index for the feed, per-post comment indexes, per-post
+like maps, per-user indexes of posts, comments and likes, and (score, id)
+indexes for the ranked feed orderings that are updated with the counters.
+Counters are kept on the post records, so every read is a dict lookup or
+a slice and no SQL is ever issued.
+
+All methods run on the event loop without awaiting, so each operation is
+atomic with respect to other requests and no locking is needed.
+"""
+
+import math
+import re
+import uuid
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+import schemas
+from batch import creation_times
+from pagination import decode_cursor, decode_score_cursor, encode_cursor, encode_score_cursor
+from ranking import trending_score
+from repositories.base import Repository
+from search import ELLIPSIS, MATCH_END, MATCH_START, SNIPPET_TOKENS, highlight
+from serialization import comment_record, like_record, post_record, search_record
+
+_WORD = re.compile(r"\w+")
+
+
+def _page(keys: list, limit: Optional[int], cursor: Optional[str], scored: bool = False) -> tuple[list, Optional[str]]:
+    """Slice newest-first from an ascending list of (created_at, id) keys, or highest first from (score, id) keys"""
+    decode, encode = (decode_score_cursor, encode_score_cursor) if scored else (decode_cursor, encode_cursor)
+    end = bisect_left(keys, decode(cursor)) if cursor else len(keys)
+    start = 0 if limit is None else max(0, end - limit)
+    selected = keys[start:end][::-1]
+    if limit is None or start == 0 or not selected:
+        return selected, None
+    return selected, encode(*selected[-1])
+
+
+def _remove_key(keys: list, key: tuple):
+    index = bisect_left(keys, key)
+    if index < len(keys) and keys[index] == key:
+        del keys[index]
+
+
+def _post_record(post: schemas.Post) -> dict:
+    return post_record(post.id, post.username, post.content, post.created_at, post.updated_at,
+                       post.likes_count, post.comments_count)
+
+
+def _bm25_ranks(documents: list[tuple[str, str]], terms: list[str]) -> dict[str, float]:
+    """FTS5-style bm25 (k1=1.2, b=0.75, negated) of the (id, text) documents containing every term"""
+    counts = {item_id: Counter(word.lower() for word in _WORD.findall(text)) for item_id, text in documents}
+    matching = {item_id: doc for item_id, doc in counts.items() if all(term in doc for term in terms)}
+    if not matching:
+        return {}
+
+    lengths = {item_id: doc.total() for item_id, doc in counts.items()}
+    average_length = sum(lengths.values()) / len(counts)
+    idfs = {}
+    for term in set(terms):
+        containing = sum(1 for doc in counts.values() if term in doc)
+        idfs[term] = max(math.log((len(counts) - containing + 0.5) / (containing + 0.5)), 1e-6)
+
+    ranks = {}
+    for item_id, doc in matching.items():
+        norm = 1.2 * (0.25 + 0.75 * lengths[item_id] / average_length)
+        ranks[item_id] = -sum(idfs[term] * doc[term] * 2.2 / (doc[term] + norm) for term in terms)
+    return ranks
+
+
+def _snippet(text: str, terms: list[str]) -> str:
+    """Marked excerpt of up to SNIPPET_TOKENS words starting near the first match"""
+    words = list(_WORD.finditer(text))
+    first = next(index for index, word in enumerate(words) if word.group().lower() in terms)
+    start = max(0, min(first - SNIPPET_TOKENS // 4, len(words) - SNIPPET_TOKENS))
+    window = words[start:start + SNIPPET_TOKENS]
+    parts = [ELLIPSIS] if start > 0 else []
+    position = window[0].start() if start > 0 else 0
+    for word in window:
+        parts.append(text[position:word.start()])
+        if word.group().lower() in terms:
+            parts.append(MATCH_START + word.group() + MATCH_END)
+        else:
+            parts.append(word.group())
+        position = word.end()
+    end = window[-1].end()
+    parts.append(text[end:] if start + SNIPPET_TOKENS >= len(words) else ELLIPSIS)
+    return "".join(parts)
+
+
+class MemoryRepository(Repository):
+    def __init__(self):
+        self._posts: dict[str, schemas.Post] = {}
+        self._post_keys: list[tuple[datetime, str]] = []
+        self._comments: dict[str, schemas.Comment] = {}
+        self._comment_keys: dict[str, list[tuple[datetime, str]]] = {}
+        self._likes: dict[str, dict[str, schemas.Like]] = {}
+        # Ascending (score, id) keys per ranked sort mode
+        self._ranked_keys: dict[str, list[tuple[float, str]]] = {"trending": [], "top": []}
+        self._user_post_keys: dict[str, list[tuple[datetime, str]]] = {}
+        self._user_comment_keys: dict[str, list[tuple[datetime, str]]] = {}
+        # (created_at, post_id) per user
+        self._user_like_keys: dict[str, list[tuple[datetime, str]]] = {}
+
+    def _feed_page(self, sort, limit, cursor):
+        if sort == "new":
+            return _page(self._post_keys, limit, cursor)
+        return _page(self._ranked_keys[sort], limit, cursor, scored=True)
+
+    def _rank_keys(self, post: schemas.Post) -> dict[str, tuple[float, str]]:
+        return {
+            "trending": (trending_score(post.likes_count, post.comments_count, post.created_at), post.id),
+            "top": (post.likes_count, post.id),
+        }
+
+    def _adjust_counters(self, post: schemas.Post, likes: int = 0, comments: int = 0):
+        """Change a post's counters and move it in the ranked orderings"""
+        for sort, key in self._rank_keys(post).items():
+            _remove_key(self._ranked_keys[sort], key)
+        post.likes_count += likes
+        post.comments_count += comments
+        for sort, key in self._rank_keys(post).items():
+            insort(self._ranked_keys[sort], key)
+
+    async def list_posts(self, limit, cursor, sort="new", projection=None):
+        keys, next_cursor = self._feed_page(sort, limit, cursor)
+        records = [_post_record(self._posts[post_id]) for _, post_id in keys]
+        if projection is not None:
+            records = [projection.project(record) for record in records]
+        return records, next_cursor
+
+    async def list_post_versions(self, limit, cursor, sort="new"):
+        keys, next_cursor = self._feed_page(sort, limit, cursor)
+        posts = (self._posts[post_id] for _, post_id in keys)
+        return [(post.id, post.updated_at, post.likes_count, post.comments_count) for post in posts], next_cursor
+
+    async def create_post(self, username, content):
+        return self._add_post(username, content, datetime.utcnow())
+
+    async def create_posts(self, items):
+        posts = [
+            self._add_post(username, content, created_at)
+            for (username, content), created_at in zip(items, creation_times(len(items)))
+        ]
+        return [_post_record(post) for post in posts]
+
+    def _add_post(self, username, content, now):
+        post = schemas.Post(
+            id=f"post-{uuid.uuid4().hex[:16]}",
+            username=username,
+            content=content,
+            createdAt=now,
+            updatedAt=now,
+            likesCount=0,
+            commentsCount=0
+        )
+        self._posts[post.id] = post
+        insort(self._post_keys, (post.created_at, post.id))
+        for sort, key in self._rank_keys(post).items():
+            insort(self._ranked_keys[sort], key)
+        insort(self._user_post_keys.setdefault(username, []), (post.created_at, post.id))
+        self._comment_keys[post.id] = []
+        self._likes[post.id] = {}
+        return post
+
+    async def get_post(self, post_id):
+        return self._posts.get(post_id)
+
+    async def get_posts(self, post_ids):
+        return [_post_record(self._posts[post_id]) for post_id in post_ids if post_id in self._posts]
+
+    async def update_post(self, post_id, content):
+        post = self._posts.get(post_id)
+        if not post:
+            return None
+
+        post.content = content
+        post.updated_at = datetime.utcnow()
+        return post
+
+    async def delete_post(self, post_id):
+        post = self._posts.pop(post_id, None)
+        if not post:
+            return False
+
+        _remove_key(self._post_keys, (post.created_at, post.id))
+        for sort, key in self._rank_keys(post).items():
+            _remove_key(self._ranked_keys[sort], key)
+        _remove_key(self._user_post_keys[post.username], (post.created_at, post.id))
+        for _, comment_id in self._comment_keys.pop(post_id):
+            comment = self._comments.pop(comment_id)
+            _remove_key(self._user_comment_keys[comment.username], (comment.created_at, comment.id))
+        for like in self._likes.pop(post_id).values():
+            _remove_key(self._user_like_keys[like.username], (like.created_at, post_id))
+        return True
+
+    async def list_user_posts(self, username, limit, cursor):
+        keys, next_cursor = _page(self._user_post_keys.get(username, []), limit, cursor)
+        return [_post_record(self._posts[post_id]) for _, post_id in keys], next_cursor
+
+    async def list_user_comments(self, username, limit, cursor):
+        keys, next_cursor = _page(self._user_comment_keys.get(username, []), limit, cursor)
+        comments = (self._comments[comment_id] for _, comment_id in keys)
+        return [
+            comment_record(comment.id, comment.post_id, comment.username, comment.content,
+                           comment.created_at, comment.updated_at)
+            for comment in comments
+        ], next_cursor
+
+    async def list_user_likes(self, username, limit, cursor):
+        keys, next_cursor = _page(self._user_like_keys.get(username, []), limit, cursor)
+        return [like_record(post_id, username, created_at) for created_at, post_id in keys], next_cursor
+
+    async def search(self, search_type, terms, limit, cursor):
+        # A full scan: fine for the data sets this backend serves
+        items = self._posts if search_type == "posts" else self._comments
+        ranks = _bm25_ranks([(item.id, item.content) for item in items.values()], terms)
+        keys = sorted((rank, item_id) for item_id, rank in ranks.items())
+        after = decode_score_cursor(cursor) if cursor else None
+        if after:
+            keys = keys[bisect_right(keys, after):]
+
+        page = keys[:limit]
+        next_cursor = encode_score_cursor(*page[-1]) if len(keys) > limit else None
+        records = []
+        for rank, item_id in page:
+            item = items[item_id]
+            post_id = item.id if search_type == "posts" else item.post_id
+            snippet = highlight(_snippet(item.content, terms))
+            records.append(search_record(item.id, post_id, item.username, snippet, -rank, item.created_at))
+        return records, next_cursor
+
+    async def list_comments(self, post_id, limit, cursor, projection=None, post_exists=False):
+        keys = self._comment_keys.get(post_id)
+        if keys is None:
+            return None
+
+        page, next_cursor = _page(keys, limit, cursor)
+        comments = (self._comments[comment_id] for _, comment_id in page)
+        records = [
+            comment_record(comment.id, comment.post_id, comment.username, comment.content,
+                           comment.created_at, comment.updated_at)
+            for comment in comments
+        ]
+        if projection is not None:
+            records = [projection.project(record) for record in records]
+        return records, next_cursor
+
+    async def list_comment_versions(self, post_id, limit, cursor):
+        keys = self._comment_keys.get(post_id)
+        if keys is None:
+            return None
+
+        page, next_cursor = _page(keys, limit, cursor)
+        return [(self._comments[comment_id].id, self._comments[comment_id].updated_at) for _, comment_id in page], next_cursor
+
+    async def create_comment(self, post_id, username, content):
+        if post_id not in self._posts:
+            return None
+        return self._add_comment(post_id, username, content, datetime.utcnow())
+
+    async def create_comments(self, post_id, items):
+        if post_id not in self._posts:
+            return None
+
+        comments = [
+            self._add_comment(post_id, username, content, created_at)
+            for (username, content), created_at in zip(items, creation_times(len(items)))
+        ]
+        return [
+            comment_record(comment.id, comment.post_id, comment.username, comment.content,
+                           comment.created_at, comment.updated_at)
+            for comment in comments
+        ]
+
+    def _add_comment(self, post_id, username, content, now):
+        comment = schemas.Comment(
+            id=f"comment-{uuid.uuid4().hex[:16]}",
+            postId=post_id,
+            username=username,
+            content=content,
+            createdAt=now,
+            updatedAt=now
+        )
+        self._comments[comment.id] = comment
+        insort(self._comment_keys[post_id], (comment.created_at, comment.id))
+        insort(self._user_comment_keys.setdefault(username, []), (comment.created_at, comment.id))
+        self._adjust_counters(self._posts[post_id], comments=1)
+        return comment
+
+    async def get_comment(self, post_id, comment_id):
+        comment = self._comments.get(comment_id)
+        if not comment or comment.post_id != post_id:
+            return None
+        return comment
+
+    async def update_comment(self, post_id, comment_id, content):
+        comment = await self.get_comment(post_id, comment_id)
+        if not comment:
+            return None
+
+        comment.content = content
+        comment.updated_at = datetime.utcnow()
+        return comment
+
+    async def delete_comment(self, post_id, comment_id):
+        comment = await self.get_comment(post_id, comment_id)
+        if not comment:
+            return False
+
+        del self._comments[comment_id]
+        _remove_key(self._comment_keys[post_id], (comment.created_at, comment.id))
+        _remove_key(self._user_comment_keys[comment.username], (comment.created_at, comment.id))
+        self._adjust_counters(self._posts[post_id], comments=-1)
+        return True
+
+    async def like_post(self, post_id, username):
+        post = self._posts.get(post_id)
+        if not post:
+            return None
+
+        likes = self._likes[post_id]
+        if username in likes:
+            return likes[username], False
+
+        like = schemas.Like(postId=post_id, username=username, createdAt=datetime.utcnow())
+        self._add_like(like)
+        return like, True
+
+    def _add_like(self, like: schemas.Like):
+        self._likes[like.post_id][like.username] = like
+        insort(self._user_like_keys.setdefault(like.username, []), (like.created_at, like.post_id))
+        self._adjust_counters(self._posts[like.post_id], likes=1)
+
+    async def like_posts(self, items):
+        results = []
+        for post_id, username in items:
+            outcome = await self.like_post(post_id, username)
+            if outcome is None:
+                results.append(None)
+                continue
+            like, created = outcome
+            results.append((like_record(like.post_id, like.username, like.created_at), created))
+        return results
+
+    async def find_like(self, post_id, username):
+        likes = self._likes.get(post_id)
+        if likes is None:
+            return False, None
+        return True, likes.get(username)
+
+    async def apply_like_changes(self, likes, unlikes):
+        for like in likes:
+            post_likes = self._likes.get(like.post_id)
+            if post_likes is not None and like.username not in post_likes:
+                self._add_like(like)
+        for post_id, username in unlikes:
+            await self.unlike_post(post_id, username)
+
+    async def unlike_post(self, post_id, username):
+        likes = self._likes.get(post_id)
+        like = likes.pop(username, None) if likes is not None else None
+        if like is None:
+            return False
+
+        _remove_key(self._user_like_keys[username], (like.created_at, post_id))
+        self._adjust_counters(self._posts[post_id], likes=-1)
+        return True
@@ -0,0 +1,583 @@
+"""SQLAlchemy-backed repository over the SQLite database"""
+
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    Boolean, bindparam, column, delete, exists, func, insert, literal, literal_column, select, table, tuple_, type_coerce,
+    update
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import models
+import schemas
+from batch import chunks, creation_times
+from counters import adjust_post_counters
+from database import DbRunner
+from pagination import decode_score_cursor, encode_score_cursor, paginate, paginate_by_score
+from projection import TRUNCATED_FIELD, Projection
+from repositories.base import Repository
+from search import ELLIPSIS, MATCH_END, MATCH_START, SNIPPET_TOKENS, highlight, match_expression
+from serialization import comment_record, like_record, post_record, search_record
+
+
+def _post_schema(post: models.Post) -> schemas.Post:
+    return schemas.Post(
+        id=post.id,
+        username=post.username,
+        content=post.content,
+        createdAt=post.created_at,
+        updatedAt=post.updated_at,
+        likesCount=post.likes_count,
+        commentsCount=post.comments_count
+    )
+
+
+def _comment_schema(comment: models.Comment) -> schemas.Comment:
+    return schemas.Comment(
+        id=comment.id,
+        postId=comment.post_id,
+        username=comment.username,
+        content=comment.content,
+        createdAt=comment.created_at,
+        updatedAt=comment.updated_at
+    )
+
+
+def _page(query, created_at_column, id_column, limit: Optional[int], cursor: Optional[str]):
+    if limit is None:
+        return query.order_by(created_at_column.desc(), id_column.desc()).all(), None
+    return paginate(
+        query, created_at_column, id_column, cursor, limit,
+        sort_key=lambda row: (row.created_at, row.id)
+    )
+
+
+# Columns behind the ranked feed orderings, highest first
+_SCORE_COLUMNS = {"trending": models.Post.trending_score, "top": models.Post.likes_count}
+
+
+def _feed_page(query, sort: str, limit: Optional[int], cursor: Optional[str]):
+    """Page a posts query in a feed ordering; the query's last column must be the sort score"""
+    if sort == "new":
+        return _page(query, models.Post.created_at, models.Post.id, limit, cursor)
+
+    score_column = _SCORE_COLUMNS[sort]
+    if limit is None:
+        return query.order_by(score_column.desc(), models.Post.id.desc()).all(), None
+    return paginate_by_score(
+        query, score_column, models.Post.id, cursor, limit,
+        sort_key=lambda row: (row[-1], row.id)
+    )
+
+
+def _find_post(db: Session, post_id: str) -> Optional[models.Post]:
+    return db.query(models.Post).filter(models.Post.id == post_id).first()
+
+
+def _post_exists(db: Session, post_id: str) -> bool:
+    return db.query(exists().where(models.Post.id == post_id)).scalar()
+
+
+def _find_comment(db: Session, post_id: str, comment_id: str) -> Optional[models.Comment]:
+    return db.query(models.Comment).filter(
+        models.Comment.id == comment_id,
+        models.Comment.post_id == post_id
+    ).first()
+
+
+def _post_record_query(db: Session):
+    return db.query(
+        models.Post.id, models.Post.username, models.Post.content, models.Post.created_at,
+        models.Post.updated_at, models.Post.likes_count, models.Post.comments_count
+    )
+
+
+_POST_FIELD_COLUMNS = {
+    "id": models.Post.id,
+    "username": models.Post.username,
+    "content": models.Post.content,
+    "createdAt": models.Post.created_at,
+    "updatedAt": models.Post.updated_at,
+    "likesCount": models.Post.likes_count,
+    "commentsCount": models.Post.comments_count
+}
+
+_COMMENT_FIELD_COLUMNS = {
+    "id": models.Comment.id,
+    "postId": models.Comment.post_id,
+    "username": models.Comment.username,
+    "content": models.Comment.content,
+    "createdAt": models.Comment.created_at,
+    "updatedAt": models.Comment.updated_at
+}
+
+
+def _projected_query(db: Session, field_columns: dict, projection: Projection):
+    """Select only the projected columns, cutting content down to the preview inside SQLite.
+
+    Returns the query and the record keys of its leading columns.
+    """
+    columns = []
+    names = []
+    for name in projection.loaded:
+        column = field_columns[name]
+        if name == "content" and projection.truncates:
+            columns.append(func.substr(column, 1, projection.preview))
+            # Unlike length(), this stops reading right after the preview
+            columns.append(type_coerce(func.substr(column, projection.preview + 1, 1) != "", Boolean))
+            names.extend((name, TRUNCATED_FIELD))
+        else:
+            columns.append(column)
+            names.append(name)
+    # Keyset pagination needs the sort key; it is left out of the records
+    columns.append(field_columns["createdAt"].label("created_at"))
+    return db.query(*columns), names
+
+
+def _list_posts(db: Session, limit: Optional[int], cursor: Optional[str], sort: str, projection: Optional[Projection]):
+    if projection is None:
+        query = _post_record_query(db)
+    else:
+        query, names = _projected_query(db, _POST_FIELD_COLUMNS, projection)
+    if sort != "new":
+        query = query.add_columns(_SCORE_COLUMNS[sort])
+    rows, next_cursor = _feed_page(query, sort, limit, cursor)
+    if projection is not None:
+        return [dict(zip(names, row)) for row in rows], next_cursor
+    return [post_record(*tuple(row)[:7]) for row in rows], next_cursor
+
+
+def _list_post_versions(db: Session, limit: Optional[int], cursor: Optional[str], sort: str):
+    query = db.query(
+        models.Post.id, models.Post.updated_at, models.Post.likes_count, models.Post.comments_count,
+        models.Post.created_at
+    )
+    if sort != "new":
+        query = query.add_columns(_SCORE_COLUMNS[sort])
+    rows, next_cursor = _feed_page(query, sort, limit, cursor)
+    return [tuple(row)[:4] for row in rows], next_cursor
+
+
+def _create_post(db: Session, username: str, content: str):
+    now = datetime.utcnow()
+    new_post = models.Post(
+        id=f"post-{uuid.uuid4().hex[:16]}",
+        username=username,
+        content=content,
+        created_at=now,
+        updated_at=now,
+        likes_count=0,
+        comments_count=0
+    )
+    db.add(new_post)
+    # Built before the commit expires the instance, so no refresh query is needed
+    post = _post_schema(new_post)
+    db.commit()
+    return post
+
+
+def _create_posts(db: Session, items: list[tuple[str, str]]):
+    rows = [
+        {
+            "id": f"post-{uuid.uuid4().hex[:16]}",
+            "username": username,
+            "content": content,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "likes_count": 0,
+            "comments_count": 0
+        }
+        for (username, content), created_at in zip(items, creation_times(len(items)))
+    ]
+    db.execute(models.Post.__table__.insert(), rows)
+    db.commit()
+    return [post_record(*row.values()) for row in rows]
+
+
+def _get_post(db: Session, post_id: str):
+    post = _find_post(db, post_id)
+    return _post_schema(post) if post else None
+
+
+def _get_posts(db: Session, post_ids: list[str]):
+    records = []
+    for chunk in chunks(post_ids):
+        records.extend(post_record(*row) for row in _post_record_query(db).filter(models.Post.id.in_(chunk)))
+    return records
+
+
+def _update_post(db: Session, post_id: str, content: str):
+    posts = models.Post.__table__
+    row = db.execute(
+        update(posts)
+        .where(posts.c.id == post_id)
+        .values(content=content, updated_at=datetime.utcnow())
+        .returning(
+            posts.c.id, posts.c.username, posts.c.content, posts.c.created_at,
+            posts.c.updated_at, posts.c.likes_count, posts.c.comments_count
+        )
+    ).first()
+    if row is None:
+        return None
+
+    db.commit()
+    return schemas.Post(**post_record(*row))
+
+
+def _delete_post(db: Session, post_id: str):
+    # Set-based deletes instead of the ORM cascade, which loads every comment
+    # and like of the post first
+    db.execute(delete(models.Comment.__table__).where(models.Comment.post_id == post_id))
+    db.execute(delete(models.Like.__table__).where(models.Like.post_id == post_id))
+    result = db.execute(delete(models.Post.__table__).where(models.Post.id == post_id))
+    if not result.rowcount:
+        return False
+
+    db.commit()
+    return True
+
+
+def _list_user_posts(db: Session, username: str, limit: int, cursor: Optional[str]):
+    query = _post_record_query(db).filter(models.Post.username == username)
+    rows, next_cursor = _page(query, models.Post.created_at, models.Post.id, limit, cursor)
+    return [post_record(*row) for row in rows], next_cursor
+
+
+def _list_user_comments(db: Session, username: str, limit: int, cursor: Optional[str]):
+    query = db.query(
+        models.Comment.id, models.Comment.post_id, models.Comment.username, models.Comment.content,
+        models.Comment.created_at, models.Comment.updated_at
+    ).filter(models.Comment.username == username)
+    rows, next_cursor = _page(query, models.Comment.created_at, models.Comment.id, limit, cursor)
+    return [comment_record(*row) for row in rows], next_cursor
+
+
+def _list_user_likes(db: Session, username: str, limit: int, cursor: Optional[str]):
+    query = db.query(models.Like.post_id, models.Like.username, models.Like.created_at).filter(
+        models.Like.username == username
+    )
+    rows, next_cursor = paginate(
+        query, models.Like.created_at, models.Like.post_id, cursor, limit,
+        sort_key=lambda row: (row.created_at, row.post_id)
+    )
+    return [like_record(*row) for row in rows], next_cursor
+
+
+def _search(db: Session, search_type: str, terms: list[str], limit: int, cursor: Optional[str]):
+    searched = models.Post.__table__ if search_type == "posts" else models.Comment.__table__
+    index = table(f"{searched.name}_fts", column("rowid"), column("rank"))
+    post_id = searched.c.id if search_type == "posts" else searched.c.post_id
+    query = (
+        select(
+            searched.c.id, post_id, searched.c.username, searched.c.created_at,
+            func.snippet(literal_column(index.name), 0, MATCH_START, MATCH_END, ELLIPSIS, SNIPPET_TOKENS),
+            index.c.rank
+        )
+        .select_from(index.join(searched, literal_column(f"{searched.name}.rowid") == index.c.rowid))
+        .where(literal_column(index.name).match(match_expression(terms)))
+    )
+    after = decode_score_cursor(cursor) if cursor else None
+    if after:
+        query = query.where(tuple_(index.c.rank, searched.c.id) > after)
+
+    rows = db.execute(query.order_by(index.c.rank, searched.c.id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_score_cursor(rows[-1].rank, rows[-1].id)
+    records = [
+        search_record(item_id, row_post_id, username, highlight(snippet), -rank, created_at)
+        for item_id, row_post_id, username, created_at, snippet, rank in rows
+    ]
+    return records, next_cursor
+
+
+# Comment and like operations never load the parent post just to check that
+# it exists: a non-empty page, a matching comment row or an updated counter
+# already proves it, so the existence check only runs when that is ambiguous.
+
+
+def _list_comments(
+    db: Session, post_id: str, limit: Optional[int], cursor: Optional[str], projection: Optional[Projection],
+    post_exists: bool
+):
+    if projection is None:
+        query = db.query(
+            models.Comment.id, models.Comment.post_id, models.Comment.username, models.Comment.content,
+            models.Comment.created_at, models.Comment.updated_at
+        )
+    else:
+        query, names = _projected_query(db, _COMMENT_FIELD_COLUMNS, projection)
+    query = query.filter(models.Comment.post_id == post_id)
+    rows, next_cursor = _page(query, models.Comment.created_at, models.Comment.id, limit, cursor)
+    if not rows and not post_exists and not _post_exists(db, post_id):
+        return None
+    if projection is not None:
+        return [dict(zip(names, row)) for row in rows], next_cursor
+    return [comment_record(*row) for row in rows], next_cursor
+
+
+def _list_comment_versions(db: Session, post_id: str, limit: Optional[int], cursor: Optional[str]):
+    query = db.query(models.Comment.id, models.Comment.updated_at, models.Comment.created_at).filter(
+        models.Comment.post_id == post_id
+    )
+    rows, next_cursor = _page(query, models.Comment.created_at, models.Comment.id, limit, cursor)
+    if not rows and not _post_exists(db, post_id):
+        return None
+    return [tuple(row)[:2] for row in rows], next_cursor
+
+
+def _create_comment(db: Session, post_id: str, username: str, content: str):
+    if not adjust_post_counters(db, post_id, comments=1):
+        return None
+
+    now = datetime.utcnow()
+    new_comment = models.Comment(
+        id=f"comment-{uuid.uuid4().hex[:16]}",
+        post_id=post_id,
+        username=username,
+        content=content,
+        created_at=now,
+        updated_at=now
+    )
+    db.add(new_comment)
+    comment = _comment_schema(new_comment)
+    db.commit()
+    return comment
+
+
+def _create_comments(db: Session, post_id: str, items: list[tuple[str, str]]):
+    if not _find_post(db, post_id):
+        return None
+
+    rows = [
+        {
+            "id": f"comment-{uuid.uuid4().hex[:16]}",
+            "post_id": post_id,
+            "username": username,
+            "content": content,
+            "created_at": created_at,
+            "updated_at": created_at
+        }
+        for (username, content), created_at in zip(items, creation_times(len(items)))
+    ]
+    if rows:
+        db.execute(models.Comment.__table__.insert(), rows)
+        adjust_post_counters(db, post_id, comments=len(rows))
+        db.commit()
+    return [comment_record(*row.values()) for row in rows]
+
+
+def _get_comment(db: Session, post_id: str, comment_id: str):
+    comment = _find_comment(db, post_id, comment_id)
+    return _comment_schema(comment) if comment else None
+
+
+def _update_comment(db: Session, post_id: str, comment_id: str, content: str):
+    comments = models.Comment.__table__
+    row = db.execute(
+        update(comments)
+        .where(comments.c.id == comment_id, comments.c.post_id == post_id)
+        .values(content=content, updated_at=datetime.utcnow())
+        .returning(
+            comments.c.id, comments.c.post_id, comments.c.username, comments.c.content,
+            comments.c.created_at, comments.c.updated_at
+        )
+    ).first()
+    if row is None:
+        return None
+
+    db.commit()
+    return schemas.Comment(**comment_record(*row))
+
+
+def _delete_comment(db: Session, post_id: str, comment_id: str):
+    comments = models.Comment.__table__
+    result = db.execute(delete(comments).where(comments.c.id == comment_id, comments.c.post_id == post_id))
+    if not result.rowcount:
+        return False
+
+    adjust_post_counters(db, post_id, comments=-1)
+    db.commit()
+    return True
+
+
+def _like_post(db: Session, post_id: str, username: str):
+    # One upsert does the existence check, the insert and (through the likes
+    # count trigger) the counter change. On a repeated like the no-op DO UPDATE
+    # hands back the original row, so concurrent double-taps never conflict;
+    # its older created_at tells it apart from a row this call inserted.
+    likes = models.Like.__table__
+    now = datetime.utcnow()
+    values = select(
+        literal(post_id), literal(username), literal(now, likes.c.created_at.type)
+    ).where(exists().where(models.Post.id == post_id))
+    statement = sqlite_insert(likes).from_select(["post_id", "username", "created_at"], values)
+    row = db.execute(
+        statement
+        .on_conflict_do_update(index_elements=[likes.c.post_id, likes.c.username], set_={"created_at": likes.c.created_at})
+        .returning(likes.c.post_id, likes.c.username, likes.c.created_at)
+    ).first()
+    if row is None:
+        return None
+
+    db.commit()
+    return schemas.Like(**like_record(*row)), row.created_at == now
+
+
+def _like_posts(db: Session, items: list[tuple[str, str]]):
+    post_ids = list({post_id for post_id, _ in items})
+    known_posts = set()
+    for chunk in chunks(post_ids):
+        known_posts.update(row.id for row in db.query(models.Post.id).filter(models.Post.id.in_(chunk)))
+
+    pairs = list({item for item in items if item[0] in known_posts})
+    likes = {}
+    for chunk in chunks(pairs):
+        rows = db.query(models.Like.post_id, models.Like.username, models.Like.created_at).filter(
+            tuple_(models.Like.post_id, models.Like.username).in_(chunk)
+        )
+        likes.update(((row.post_id, row.username), like_record(*row)) for row in rows)
+
+    results = []
+    new_likes = []
+    now = datetime.utcnow()
+    for post_id, username in items:
+        if post_id not in known_posts:
+            results.append(None)
+        elif (post_id, username) in likes:
+            results.append((likes[(post_id, username)], False))
+        else:
+            like = likes[(post_id, username)] = like_record(post_id, username, now)
+            new_likes.append({"post_id": post_id, "username": username, "created_at": now})
+            results.append((like, True))
+
+    if new_likes:
+        # OR IGNORE keeps a like that raced in since the lookup from failing the batch
+        db.execute(models.Like.__table__.insert().prefix_with("OR IGNORE"), new_likes)
+        db.commit()
+    return results
+
+
+def _find_like(db: Session, post_id: str, username: str):
+    row = db.query(models.Post.id, models.Like.created_at).outerjoin(
+        models.Like, (models.Like.post_id == models.Post.id) & (models.Like.username == username)
+    ).filter(models.Post.id == post_id).first()
+    if row is None:
+        return False, None
+    if row.created_at is None:
+        return True, None
+    return True, schemas.Like(postId=post_id, username=username, createdAt=row.created_at)
+
+
+def _apply_like_changes(db: Session, likes: list[schemas.Like], unlikes: list[tuple[str, str]]):
+    like_table = models.Like.__table__
+    if likes:
+        # Guarded per row so likes buffered for a post deleted since are dropped
+        values = select(
+            bindparam("new_post_id"), bindparam("new_username"), bindparam("new_created_at", type_=like_table.c.created_at.type)
+        ).where(exists().where(models.Post.id == bindparam("new_post_id")))
+        db.execute(
+            insert(like_table).from_select(["post_id", "username", "created_at"], values).prefix_with("OR IGNORE"),
+            [{"new_post_id": like.post_id, "new_username": like.username, "new_created_at": like.created_at} for like in likes]
+        )
+    if unlikes:
+        db.execute(
+            delete(like_table).where(
+                like_table.c.post_id == bindparam("old_post_id"), like_table.c.username == bindparam("old_username")
+            ),
+            [{"old_post_id": post_id, "old_username": username} for post_id, username in unlikes]
+        )
+    db.commit()
+
+
+def _unlike_post(db: Session, post_id: str, username: str):
+    likes = models.Like.__table__
+    result = db.execute(delete(likes).where(likes.c.post_id == post_id, likes.c.username == username))
+    if not result.rowcount:
+        return False
+
+    db.commit()
+    return True
+
+
+class SqliteRepository(Repository):
+    """Runs each operation as a plain Session function through the request's DbRunner"""
+
+    def __init__(self, run_db: DbRunner):
+        self._run = run_db
+
+    async def list_posts(self, limit, cursor, sort="new", projection=None):
+        return await self._run(_list_posts, limit, cursor, sort, projection)
+
+    async def list_post_versions(self, limit, cursor, sort="new"):
+        return await self._run(_list_post_versions, limit, cursor, sort)
+
+    async def create_post(self, username, content):
+        return await self._run(_create_post, username, content)
+
+    async def create_posts(self, items):
+        return await self._run(_create_posts, items)
+
+    async def get_post(self, post_id):
+        return await self._run(_get_post, post_id)
+
+    async def get_posts(self, post_ids):
+        return await self._run(_get_posts, post_ids)
+
+    async def update_post(self, post_id, content):
+        return await self._run(_update_post, post_id, content)
+
+    async def delete_post(self, post_id):
+        return await self._run(_delete_post, post_id)
+
+    async def list_user_posts(self, username, limit, cursor):
+        return await self._run(_list_user_posts, username, limit, cursor)
+
+    async def list_user_comments(self, username, limit, cursor):
+        return await self._run(_list_user_comments, username, limit, cursor)
+
+    async def list_user_likes(self, username, limit, cursor):
+        return await self._run(_list_user_likes, username, limit, cursor)
+
+    async def search(self, search_type, terms, limit, cursor):
+        return await self._run(_search, search_type, terms, limit, cursor)
+
+    async def list_comments(self, post_id, limit, cursor, projection=None, post_exists=False):
+        return await self._run(_list_comments, post_id, limit, cursor, projection, post_exists)
+
+    async def list_comment_versions(self, post_id, limit, cursor):
+        return await self._run(_list_comment_versions, post_id, limit, cursor)
+
+    async def create_comment(self, post_id, username, content):
+        return await self._run(_create_comment, post_id, username, content)
+
+    async def create_comments(self, post_id, items):
+        return await self._run(_create_comments, post_id, items)
+
+    async def get_comment(self, post_id, comment_id):
+        return await self._run(_get_comment, post_id, comment_id)
+
+    async def update_comment(self, post_id, comment_id, content):
+        return await self._run(_update_comment, post_id, comment_id, content)
+
+    async def delete_comment(self, post_id, comment_id):
+        return await self._run(_delete_comment, post_id, comment_id)
+
+    async def like_post(self, post_id, username):
+        return await self._run(_like_post, post_id, username)
+
+    async def like_posts(self, items):
+        return await self._run(_like_posts, items)
+
+    async def find_like(self, post_id, username):
+        return await self._run(_find_like, post_id, username)
+
+    async def apply_like_changes(self, likes, unlikes):
+        return await self._run(_apply_like_changes, likes, unlikes)
+
+    async def unlike_post(self, post_id, username):
+        return await self._run(_unlike_post, post_id, username)
@@ -1,10 +1,18 @@
 """Common HTTP response models for the API"""
 
+from functools import lru_cache
+
 from fastapi import status
 from fastapi.responses import JSONResponse
 from schemas import Error
 
 
+@lru_cache(maxsize=None)
+def error_schema() -> dict:
+    """JSON schema of Error, built once rather than for every response declaring it"""
+    return Error.model_json_schema()
+
+
 def bad_request_response():
     """Bad request - invalid input or missing required fields"""
     return {
@@ -12,7 +20,7 @@ def bad_request_response():
             "description": "Bad request - invalid input or missing required fields",
             "content": {
                 "application/json": {
-                    "schema": Error.model_json_schema(),
+                    "schema": error_schema(),
                     "example": {
                         "error": "BadRequest",
                         "message": "Invalid input data",
@@ -31,7 +39,7 @@ def not_found_response():
             "description": "Resource not found",
             "content": {
                 "application/json": {
-                    "schema": Error.model_json_schema(),
+                    "schema": error_schema(),
                     "example": {
                         "error": "NotFound",
                         "message": "Resource not found",
@@ -50,7 +58,7 @@ def internal_server_error_response():
             "description": "Internal server error",
             "content": {
                 "application/json": {
-                    "schema": Error.model_json_schema(),
+                    "schema": error_schema(),
                     "example": {
                         "error": "InternalServerError",
                         "message": "An unexpected error occurred",
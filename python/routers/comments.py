@@ -1,20 +1,33 @@
-import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from database import get_db
-import models
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 import schemas
+from batch import check_batch_size, item_error, validate_items
+from cache import comments_group, json_response, post_group, response_cache
+from etags import comment_record_version, comment_version, etag_matches, not_modified, page_etag, resource_etag
+from events import event_broker, post_topic
+from metrics import query_budget
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from projection import COMMENT_FIELDS, COMMENT_VERSION_FIELDS, parse_projection
+from repositories import Repository, get_repository
+from serialization import dumps
 
 router = APIRouter(prefix="/posts/{postId}/comments", tags=["Comments"])
 
 
 @router.get(
     "",
-    response_model=list[schemas.Comment],
+    response_model=Union[schemas.CommentPage, list[schemas.Comment]],
     summary="Get all comments for a post",
-    description="Retrieve all comments associated with a specific post",
+    description="Retrieve the comments of a specific post, newest first, one page at a time",
     operation_id="listComments",
+    # A stale If-None-Match on a post without comments: the versions query, the
+    # post's existence check, then the page itself
+    dependencies=[query_budget(3)],
     responses={
+        400: {
+            "description": "Bad request - invalid input or missing required fields",
+            "model": schemas.Error
+        },
         404: {
             "description": "Resource not found",
             "model": schemas.Error
@@ -25,24 +38,52 @@ router = APIRouter(prefix="/posts/{postId}/comments", tags=["Comments"])
         }
     }
 )
-def list_comments(postId: str, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
+async def list_comments(
+    postId: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of comments to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor by the previous page"),
+    paginate_results: bool = Query(True, alias="paginate", description="Set to false to return every comment as a plain list (legacy clients)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,username,content (id is always included)"),
+    preview: Optional[int] = Query(None, ge=1, description="Truncate content to this many characters and add contentTruncated"),
+    if_none_match: Optional[str] = Header(None, include_in_schema=False),
+    repo: Repository = Depends(get_repository)
+):
+    page_limit = limit if paginate_results else None
+    page_cursor = cursor if paginate_results else None
+    projection = parse_projection(fields, preview, COMMENT_FIELDS, COMMENT_VERSION_FIELDS)
+    kind = "comments" if paginate_results else "comments-all"
+    variant = ((limit, cursor) if paginate_results else "all", projection)
+    if projection is not None:
+        kind = f"{kind}:{projection.tag}"
+    cached = response_cache.get(comments_group(postId), variant)
+    post_exists = False
+    if cached is None and if_none_match:
+        versions = await repo.list_comment_versions(postId, page_limit, page_cursor)
+        if versions is None:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        # Found, so listing an empty page need not look for the post again
+        post_exists = True
+        etag = page_etag(kind, *versions)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    if cached is None:
+        ticket = response_cache.begin_fill()
+        page = await repo.list_comments(postId, page_limit, page_cursor, projection, post_exists=post_exists)
+        if page is None:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        
+        records, next_cursor = page
+        etag = page_etag(kind, map(comment_record_version, records), next_cursor)
+        if projection is not None:
+            records = [projection.select(record) for record in records]
+        body = dumps({"items": records, "nextCursor": next_cursor} if paginate_results else records)
+        cached = response_cache.put(comments_group(postId), variant, (etag, body), ticket)
     
-    comments = db.query(models.Comment).filter(models.Comment.post_id == postId).all()
-    result = []
-    for comment in comments:
-        comment_dict = {
-            "id": comment.id,
-            "postId": comment.post_id,
-            "username": comment.username,
-            "content": comment.content,
-            "createdAt": comment.created_at,
-            "updatedAt": comment.updated_at
-        }
-        result.append(schemas.Comment(**comment_dict))
-    return result
+    etag, body = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(body, headers={"ETag": etag})
 
 
 @router.post(
@@ -52,6 +93,7 @@ def list_comments(postId: str, db: Session = Depends(get_db)):
     summary="Create a comment",
     description="Add a new comment to a specific post",
     operation_id="createComment",
+    dependencies=[query_budget(2)],
     responses={
         400: {
             "description": "Bad request - invalid input or missing required fields",
@@ -67,33 +109,60 @@ def list_comments(postId: str, db: Session = Depends(get_db)):
         }
     }
 )
-def create_comment(postId: str, comment_data: schemas.CreateCommentRequest, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
+async def create_comment(postId: str, comment_data: schemas.CreateCommentRequest, repo: Repository = Depends(get_repository)):
     if not comment_data.username or not comment_data.content:
         raise HTTPException(status_code=400, detail="Missing required field")
     
-    comment_id = f"comment-{uuid.uuid4().hex[:8]}"
-    new_comment = models.Comment(
-        id=comment_id,
-        post_id=postId,
-        username=comment_data.username,
-        content=comment_data.content
-    )
-    db.add(new_comment)
-    db.commit()
-    db.refresh(new_comment)
+    comment = await repo.create_comment(postId, comment_data.username, comment_data.content)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Resource not found")
     
-    return schemas.Comment(
-        id=new_comment.id,
-        postId=new_comment.post_id,
-        username=new_comment.username,
-        content=new_comment.content,
-        createdAt=new_comment.created_at,
-        updatedAt=new_comment.updated_at
-    )
+    response_cache.invalidate(post_group(postId), comments_group(postId))
+    event_broker.publish("comment.created", comment, post_topic(postId))
+    return comment
+
+
+@router.post(
+    ":batch",
+    response_model=schemas.CommentBatchResponse,
+    summary="Create comments in bulk",
+    description="Add many comments to a specific post in one transaction; each item gets its own result",
+    operation_id="createCommentsBatch",
+    dependencies=[query_budget(3)],
+    responses={
+        400: {
+            "description": "Bad request - invalid input or missing required fields",
+            "model": schemas.Error
+        },
+        404: {
+            "description": "Resource not found",
+            "model": schemas.Error
+        },
+        500: {
+            "description": "Internal server error",
+            "model": schemas.Error
+        }
+    }
+)
+async def create_comments_batch(postId: str, batch: schemas.BatchCreateCommentsRequest, repo: Repository = Depends(get_repository)):
+    check_batch_size(batch.items)
+    parsed = validate_items(schemas.CreateCommentRequest, batch.items)
+    valid = [(item.username, item.content) for item in parsed if not isinstance(item, str)]
+    created = await repo.create_comments(postId, valid)
+    if created is None:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    
+    if created:
+        response_cache.invalidate(post_group(postId), comments_group(postId))
+    created = iter(created)
+    results = [
+        item_error(400, item) if isinstance(item, str) else {"status": 201, "comment": next(created)}
+        for item in parsed
+    ]
+    for result in results:
+        if "comment" in result:
+            event_broker.publish("comment.created", result["comment"], post_topic(postId))
+    return json_response(dumps({"results": results}))
 
 
 @router.get(
@@ -102,6 +171,7 @@ def create_comment(postId: str, comment_data: schemas.CreateCommentRequest, db:
     summary="Get a specific comment",
     description="Retrieve details of a specific comment",
     operation_id="getComment",
+    dependencies=[query_budget(1)],
     responses={
         404: {
             "description": "Resource not found",
@@ -113,26 +183,22 @@ def create_comment(postId: str, comment_data: schemas.CreateCommentRequest, db:
         }
     }
 )
-def get_comment(postId: str, commentId: str, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
-    comment = db.query(models.Comment).filter(
-        models.Comment.id == commentId,
-        models.Comment.post_id == postId
-    ).first()
+async def get_comment(
+    postId: str,
+    commentId: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None, include_in_schema=False),
+    repo: Repository = Depends(get_repository)
+):
+    comment = await repo.get_comment(postId, commentId)
     if not comment:
         raise HTTPException(status_code=404, detail="Resource not found")
     
-    return schemas.Comment(
-        id=comment.id,
-        postId=comment.post_id,
-        username=comment.username,
-        content=comment.content,
-        createdAt=comment.created_at,
-        updatedAt=comment.updated_at
-    )
+    etag = resource_etag("comment", comment_version(comment))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    response.headers["ETag"] = etag
+    return comment
 
 
 @router.patch(
@@ -141,6 +207,7 @@ def get_comment(postId: str, commentId: str, db: Session = Depends(get_db)):
     summary="Update a comment",
     description="Modify or revise an existing comment",
     operation_id="updateComment",
+    dependencies=[query_budget(1)],
     responses={
         400: {
             "description": "Bad request - invalid input or missing required fields",
@@ -156,35 +223,17 @@ def get_comment(postId: str, commentId: str, db: Session = Depends(get_db)):
         }
     }
 )
-def update_comment(postId: str, commentId: str, comment_data: schemas.UpdateCommentRequest, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
-    comment = db.query(models.Comment).filter(
-        models.Comment.id == commentId,
-        models.Comment.post_id == postId
-    ).first()
-    if not comment:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
+async def update_comment(postId: str, commentId: str, comment_data: schemas.UpdateCommentRequest, repo: Repository = Depends(get_repository)):
     if not comment_data.username or not comment_data.content:
         raise HTTPException(status_code=400, detail="Missing required field")
     
-    comment.content = comment_data.content
-    from datetime import datetime
-    comment.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(comment)
+    comment = await repo.update_comment(postId, commentId, comment_data.content)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Resource not found")
     
-    return schemas.Comment(
-        id=comment.id,
-        postId=comment.post_id,
-        username=comment.username,
-        content=comment.content,
-        createdAt=comment.created_at,
-        updatedAt=comment.updated_at
-    )
+    response_cache.invalidate(comments_group(postId))
+    event_broker.publish("comment.updated", comment, post_topic(postId))
+    return comment
 
 
 @router.delete(
@@ -193,6 +242,7 @@ def update_comment(postId: str, commentId: str, comment_data: schemas.UpdateComm
     summary="Delete a comment",
     description="Remove a comment from a post",
     operation_id="deleteComment",
+    dependencies=[query_budget(2)],
     responses={
         404: {
             "description": "Resource not found",
@@ -204,18 +254,10 @@ def update_comment(postId: str, commentId: str, comment_data: schemas.UpdateComm
         }
     }
 )
-def delete_comment(postId: str, commentId: str, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
-    comment = db.query(models.Comment).filter(
-        models.Comment.id == commentId,
-        models.Comment.post_id == postId
-    ).first()
-    if not comment:
+async def delete_comment(postId: str, commentId: str, repo: Repository = Depends(get_repository)):
+    if not await repo.delete_comment(postId, commentId):
         raise HTTPException(status_code=404, detail="Resource not found")
     
-    db.delete(comment)
-    db.commit()
+    response_cache.invalidate(post_group(postId), comments_group(postId))
+    event_broker.publish("comment.deleted", {"id": commentId, "postId": postId}, post_topic(postId))
     return None
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+import schemas
+from events import FEED_TOPIC, event_broker, event_stream, post_topic
+from repositories import open_repository
+
+router = APIRouter(tags=["Events"])
+
+EVENT_STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Keep reverse proxies from buffering the stream
+    "X-Accel-Buffering": "no"
+}
+
+
+def event_response(topic: str) -> StreamingResponse:
+    return StreamingResponse(event_stream(event_broker, topic), media_type="text/event-stream", headers=EVENT_STREAM_HEADERS)
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    summary="Stream feed events",
+    description="Server-Sent Events stream of post.created, post.updated and post.deleted events",
+    operation_id="streamFeedEvents",
+    responses={
+        200: {
+            "description": "Event stream",
+            "content": {"text/event-stream": {}}
+        },
+        500: {
+            "description": "Internal server error",
+            "model": schemas.Error
+        }
+    }
+)
+async def stream_feed_events():
+    return event_response(FEED_TOPIC)
+
+
+@router.get(
+    "/posts/{postId}/events",
+    response_class=StreamingResponse,
+    summary="Stream events of a post",
+    description="Server-Sent Events stream of the post's updates and of comment.* and like.* events on it",
+    operation_id="streamPostEvents",
+    responses={
+        200: {
+            "description": "Event stream",
+            "content": {"text/event-stream": {}}
+        },
+        404: {
+            "description": "Resource not found",
+            "model": schemas.Error
+        },
+        500: {
+            "description": "Internal server error",
+            "model": schemas.Error
+        }
+    }
+)
+async def stream_post_events(postId: str):
+    # Not a get_repository dependency: that would hold its session until the
+    # client disconnects, so long-lived subscribers could exhaust the pool
+    async with open_repository() as repo:
+        post = await repo.get_post(postId)
+    if not post:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    
+    return event_response(post_topic(postId))
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
-from database import get_db
-import models
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 import schemas
+from batch import batch_length, check_batch_size, item_error, lookup_statements, validate_items
+from cache import json_response, post_group, response_cache
+from events import event_broker, post_topic
+from like_buffer import like_buffer
+from metrics import query_budget
+from repositories import Repository, get_repository
+from serialization import dumps
 
 router = APIRouter(prefix="/posts/{postId}/likes", tags=["Likes"])
+batch_router = APIRouter(prefix="/likes", tags=["Likes"])
 
 
 @router.post(
@@ -14,6 +19,7 @@ router = APIRouter(prefix="/posts/{postId}/likes", tags=["Likes"])
     summary="Like a post",
     description="Express appreciation by liking a post",
     operation_id="likePost",
+    dependencies=[query_budget(1)],
     responses={
         400: {
             "description": "Bad request - invalid input or missing required fields",
@@ -29,39 +35,23 @@ router = APIRouter(prefix="/posts/{postId}/likes", tags=["Likes"])
         }
     }
 )
-def like_post(postId: str, like_data: schemas.LikeRequest, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
+async def like_post(postId: str, like_data: schemas.LikeRequest, repo: Repository = Depends(get_repository)):
     if not like_data.username:
         raise HTTPException(status_code=400, detail="Missing required field")
     
-    existing_like = db.query(models.Like).filter(
-        models.Like.post_id == postId,
-        models.Like.username == like_data.username
-    ).first()
-    
-    if existing_like:
-        return schemas.Like(
-            postId=existing_like.post_id,
-            username=existing_like.username,
-            createdAt=existing_like.created_at
-        )
-    
-    new_like = models.Like(
-        post_id=postId,
-        username=like_data.username
-    )
-    db.add(new_like)
-    db.commit()
-    db.refresh(new_like)
+    if like_buffer.enabled:
+        outcome = await like_buffer.like(repo, postId, like_data.username)
+    else:
+        outcome = await repo.like_post(postId, like_data.username)
+    if not outcome:
+        raise HTTPException(status_code=404, detail="Resource not found")
     
-    return schemas.Like(
-        postId=new_like.post_id,
-        username=new_like.username,
-        createdAt=new_like.created_at
-    )
+    like, created = outcome
+    if created:
+        # A repeated like changes nothing, so there is nothing to invalidate or announce
+        response_cache.invalidate(post_group(postId))
+        event_broker.publish("like.created", like, post_topic(postId))
+    return like
 
 
 @router.delete(
@@ -70,6 +60,7 @@ def like_post(postId: str, like_data: schemas.LikeRequest, db: Session = Depends
     summary="Unlike a post",
     description="Remove a like from a post",
     operation_id="unlikePost",
+    dependencies=[query_budget(1)],
     responses={
         404: {
             "description": "Resource not found",
@@ -81,23 +72,76 @@ def like_post(postId: str, like_data: schemas.LikeRequest, db: Session = Depends
         }
     }
 )
-def unlike_post(
+async def unlike_post(
     postId: str,
     username: str = Query(..., description="Username of the user who wants to unlike the post"),
-    db: Session = Depends(get_db)
+    repo: Repository = Depends(get_repository)
 ):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
+    if like_buffer.enabled:
+        unliked = await like_buffer.unlike(repo, postId, username)
+    else:
+        unliked = await repo.unlike_post(postId, username)
+    if not unliked:
         raise HTTPException(status_code=404, detail="Resource not found")
     
-    like = db.query(models.Like).filter(
-        models.Like.post_id == postId,
-        models.Like.username == username
-    ).first()
+    response_cache.invalidate(post_group(postId))
+    event_broker.publish("like.deleted", {"postId": postId, "username": username}, post_topic(postId))
+    return None
+
+
+async def like_batch_budget(request: Request) -> int:
+    # The posts, then the likes already there, are looked up a chunk at a
+    # time; one insert adds the rest. With write-behind, pending likes of the
+    # batch's pairs are flushed first: one insert and one delete.
+    return 2 * lookup_statements(await batch_length(request, "items")) + 1 + 2 * like_buffer.enabled
+
+
+@batch_router.post(
+    ":batch",
+    response_model=schemas.LikeBatchResponse,
+    summary="Like posts in bulk",
+    description="Apply many likes, across any posts, in one transaction; each item gets its own result",
+    operation_id="likePostsBatch",
+    dependencies=[query_budget(like_batch_budget)],
+    responses={
+        400: {
+            "description": "Bad request - invalid input or missing required fields",
+            "model": schemas.Error
+        },
+        500: {
+            "description": "Internal server error",
+            "model": schemas.Error
+        }
+    }
+)
+async def like_posts_batch(batch: schemas.BatchLikeRequest, repo: Repository = Depends(get_repository)):
+    check_batch_size(batch.items)
+    parsed = validate_items(schemas.BatchLikeItem, batch.items)
+    valid = [(item.post_id, item.username) for item in parsed if not isinstance(item, str)]
+    if not valid:
+        outcomes = iter(())
+    elif like_buffer.enabled:
+        outcomes = iter(await like_buffer.like_many(repo, valid))
+    else:
+        outcomes = iter(await repo.like_posts(valid))
     
-    if not like:
-        raise HTTPException(status_code=404, detail="Resource not found")
+    results = []
+    liked_posts = set()
+    for item in parsed:
+        if isinstance(item, str):
+            results.append(item_error(400, item))
+            continue
+
+        outcome = next(outcomes)
+        if outcome is None:
+            results.append(item_error(404, "Resource not found"))
+            continue
+
+        like, created = outcome
+        if created:
+            liked_posts.add(item.post_id)
+            event_broker.publish("like.created", like, post_topic(item.post_id))
+        results.append({"status": 201 if created else 200, "like": like})
     
-    db.delete(like)
-    db.commit()
-    return None
+    response_cache.invalidate(*map(post_group, liked_posts))
+    return json_response(dumps({"results": results}))
@@ -1,43 +1,68 @@
-import uuid
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from database import get_db
-import models
+from typing import Optional, Union
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
 import schemas
+from batch import batch_length, check_batch_size, item_error, lookup_statements, validate_items
+from cache import comments_group, json_response, post_group, response_cache, serialize
+from etags import etag_matches, not_modified, page_etag, post_record_version, post_version, resource_etag
+from events import FEED_TOPIC, event_broker, post_topic
+from like_buffer import like_buffer
+from metrics import query_budget
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from projection import POST_FIELDS, POST_VERSION_FIELDS, parse_projection
+from repositories import Repository, get_repository
+from serialization import dumps
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
 
 @router.get(
     "",
-    response_model=list[schemas.Post],
+    response_model=Union[schemas.PostPage, list[schemas.Post]],
     summary="Get all posts",
-    description="Retrieve a list of all recent posts",
+    description="Retrieve posts one page at a time, newest first or ranked by trending score or likes",
     operation_id="listPosts",
+    dependencies=[query_budget(2)],
     responses={
+        400: {
+            "description": "Bad request - invalid input or missing required fields",
+            "model": schemas.Error
+        },
         500: {
             "description": "Internal server error",
             "model": schemas.Error
         }
     }
 )
-def list_posts(db: Session = Depends(get_db)):
-    posts = db.query(models.Post).all()
-    result = []
-    for post in posts:
-        likes_count = db.query(models.Like).filter(models.Like.post_id == post.id).count()
-        comments_count = db.query(models.Comment).filter(models.Comment.post_id == post.id).count()
-        post_dict = {
-            "id": post.id,
-            "username": post.username,
-            "content": post.content,
-            "createdAt": post.created_at,
-            "updatedAt": post.updated_at,
-            "likesCount": likes_count,
-            "commentsCount": comments_count
-        }
-        result.append(schemas.Post(**post_dict))
-    return result
+async def list_posts(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor by the previous page"),
+    paginate_results: bool = Query(True, alias="paginate", description="Set to false to return every post as a plain list (legacy clients)"),
+    sort: str = Query("new", pattern="^(new|trending|top)$", description="Ordering: new (newest first), trending (recent engagement) or top (most liked)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,username,content (id is always included)"),
+    preview: Optional[int] = Query(None, ge=1, description="Truncate content to this many characters and add contentTruncated"),
+    if_none_match: Optional[str] = Header(None, include_in_schema=False),
+    repo: Repository = Depends(get_repository)
+):
+    page_limit = limit if paginate_results else None
+    page_cursor = cursor if paginate_results else None
+    projection = parse_projection(fields, preview, POST_FIELDS, POST_VERSION_FIELDS)
+    kind = "posts" if paginate_results else "posts-all"
+    if sort != "new":
+        kind = f"{kind}:{sort}"
+    if projection is not None:
+        kind = f"{kind}:{projection.tag}"
+    if if_none_match:
+        versions, next_cursor = await repo.list_post_versions(page_limit, page_cursor, sort)
+        etag = page_etag(kind, versions, next_cursor)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    records, next_cursor = await repo.list_posts(page_limit, page_cursor, sort, projection)
+    etag = page_etag(kind, map(post_record_version, records), next_cursor)
+    if projection is not None:
+        records = [projection.select(record) for record in records]
+    body = dumps({"items": records, "nextCursor": next_cursor} if paginate_results else records)
+    return json_response(body, headers={"ETag": etag})
 
 
 @router.post(
@@ -47,6 +72,7 @@ def list_posts(db: Session = Depends(get_db)):
     summary="Create a new post",
     description="Create a new post with username and content",
     operation_id="createPost",
+    dependencies=[query_budget(1)],
     responses={
         400: {
             "description": "Bad request - invalid input or missing required fields",
@@ -58,29 +84,79 @@ def list_posts(db: Session = Depends(get_db)):
         }
     }
 )
-def create_post(post_data: schemas.CreatePostRequest, db: Session = Depends(get_db)):
+async def create_post(post_data: schemas.CreatePostRequest, repo: Repository = Depends(get_repository)):
     if not post_data.username or not post_data.content:
         raise HTTPException(status_code=400, detail="Missing required field")
     
-    post_id = f"post-{uuid.uuid4().hex[:8]}"
-    new_post = models.Post(
-        id=post_id,
-        username=post_data.username,
-        content=post_data.content
-    )
-    db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
-    
-    return schemas.Post(
-        id=new_post.id,
-        username=new_post.username,
-        content=new_post.content,
-        createdAt=new_post.created_at,
-        updatedAt=new_post.updated_at,
-        likesCount=0,
-        commentsCount=0
-    )
+    post = await repo.create_post(post_data.username, post_data.content)
+    event_broker.publish("post.created", post, FEED_TOPIC)
+    return post
+
+
+@router.post(
+    ":batch",
+    response_model=schemas.PostBatchResponse,
+    summary="Create posts in bulk",
+    description="Create many posts in one transaction; each item gets its own result",
+    operation_id="createPostsBatch",
+    dependencies=[query_budget(1)],
+    responses={
+        400: {
+            "description": "Bad request - invalid input or missing required fields",
+            "model": schemas.Error
+        },
+        500: {
+            "description": "Internal server error",
+            "model": schemas.Error
+        }
+    }
+)
+async def create_posts_batch(batch: schemas.BatchCreatePostsRequest, repo: Repository = Depends(get_repository)):
+    check_batch_size(batch.items)
+    parsed = validate_items(schemas.CreatePostRequest, batch.items)
+    valid = [(item.username, item.content) for item in parsed if not isinstance(item, str)]
+    created = iter(await repo.create_posts(valid) if valid else ())
+    results = [
+        item_error(400, item) if isinstance(item, str) else {"status": 201, "post": next(created)}
+        for item in parsed
+    ]
+    for result in results:
+        if "post" in result:
+            event_broker.publish("post.created", result["post"], FEED_TOPIC)
+    return json_response(dumps({"results": results}))
+
+
+async def batch_get_budget(request: Request) -> int:
+    # One lookup per chunk of IDs
+    return lookup_statements(await batch_length(request, "ids"))
+
+
+@router.post(
+    ":batchGet",
+    response_model=schemas.PostBatchGetResponse,
+    summary="Get many posts",
+    description="Retrieve any number of posts with their counts in one request; unknown IDs are reported, not treated as errors",
+    operation_id="batchGetPosts",
+    dependencies=[query_budget(batch_get_budget)],
+    responses={
+        400: {
+            "description": "Bad request - invalid input or missing required fields",
+            "model": schemas.Error
+        },
+        500: {
+            "description": "Internal server error",
+            "model": schemas.Error
+        }
+    }
+)
+async def batch_get_posts(batch: schemas.BatchGetPostsRequest, repo: Repository = Depends(get_repository)):
+    post_ids = list(dict.fromkeys(batch.ids))
+    check_batch_size(post_ids)
+    found = {record["id"]: record for record in await repo.get_posts(post_ids)}
+    return json_response(dumps({
+        "items": [found[post_id] for post_id in post_ids if post_id in found],
+        "missingIds": [post_id for post_id in post_ids if post_id not in found]
+    }))
 
 
 @router.get(
@@ -89,6 +165,7 @@ def create_post(post_data: schemas.CreatePostRequest, db: Session = Depends(get_
     summary="Get a single post",
     description="Retrieve details of a specific post by its ID",
     operation_id="getPost",
+    dependencies=[query_budget(1)],
     responses={
         404: {
             "description": "Resource not found",
@@ -100,22 +177,26 @@ def create_post(post_data: schemas.CreatePostRequest, db: Session = Depends(get_
         }
     }
 )
-def get_post(postId: str, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
+async def get_post(
+    postId: str,
+    if_none_match: Optional[str] = Header(None, include_in_schema=False),
+    repo: Repository = Depends(get_repository)
+):
+    cached = response_cache.get(post_group(postId))
+    if cached is None:
+        ticket = response_cache.begin_fill()
+        post, pending_likes = await like_buffer.consistent_read(postId, lambda: repo.get_post(postId))
+        if not post:
+            raise HTTPException(status_code=404, detail="Resource not found")
+        if pending_likes:
+            post = post.model_copy(update={"likes_count": post.likes_count + pending_likes})
+        etag = resource_etag("post", post_version(post))
+        cached = response_cache.put(post_group(postId), None, (etag, serialize(post)), ticket)
     
-    likes_count = db.query(models.Like).filter(models.Like.post_id == post.id).count()
-    comments_count = db.query(models.Comment).filter(models.Comment.post_id == post.id).count()
-    return schemas.Post(
-        id=post.id,
-        username=post.username,
-        content=post.content,
-        createdAt=post.created_at,
-        updatedAt=post.updated_at,
-        likesCount=likes_count,
-        commentsCount=comments_count
-    )
+    etag, body = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return json_response(body, headers={"ETag": etag})
 
 
 @router.patch(
@@ -124,6 +205,7 @@ def get_post(postId: str, db: Session = Depends(get_db)):
     summary="Update a post",
     description="Update the content of an existing post",
     operation_id="updatePost",
+    dependencies=[query_budget(1)],
     responses={
         400: {
             "description": "Bad request - invalid input or missing required fields",
@@ -139,31 +221,17 @@ def get_post(postId: str, db: Session = Depends(get_db)):
         }
     }
 )
-def update_post(postId: str, post_data: schemas.UpdatePostRequest, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Resource not found")
-    
+async def update_post(postId: str, post_data: schemas.UpdatePostRequest, repo: Repository = Depends(get_repository)):
     if not post_data.username or not post_data.content:
         raise HTTPException(status_code=400, detail="Missing required field")
     
-    post.content = post_data.content
-    from datetime import datetime
-    post.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(post)
+    post = await repo.update_post(postId, post_data.content)
+    if not post:
+        raise HTTPException(status_code=404, detail="Resource not found")
     
-    likes_count = db.query(models.Like).filter(models.Like.post_id == post.id).count()
-    comments_count = db.query(models.Comment).filter(models.Comment.post_id == post.id).count()
-    return schemas.Post(
-        id=post.id,
-        username=post.username,
-        content=post.content,
-        createdAt=post.created_at,
-        updatedAt=post.updated_at,
-        likesCount=likes_count,
-        commentsCount=comments_count
-    )
+    response_cache.invalidate(post_group(postId))
+    event_broker.publish("post.updated", post, FEED_TOPIC, post_topic(postId))
+    return post
 
 
 @router.delete(
@@ -172,6 +240,7 @@ def update_post(postId: str, post_data: schemas.UpdatePostRequest, db: Session =
     summary="Delete a post",
     description="Remove a post that is no longer wanted",
     operation_id="deletePost",
+    dependencies=[query_budget(3)],
     responses={
         404: {
             "description": "Resource not found",
@@ -183,11 +252,11 @@ def update_post(postId: str, post_data: schemas.UpdatePostRequest, db: Session =
         }
     }
 )
-def delete_post(postId: str, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == postId).first()
-    if not post:
+async def delete_post(postId: str, repo: Repository = Depends(get_repository)):
+    if not await repo.delete_post(postId):
         raise HTTPException(status_code=404, detail="Resource not found")
     
-    db.delete(post)
-    db.commit()
+    like_buffer.forget_post(postId)
+    response_cache.invalidate(post_group(postId), comments_group(postId))
+    event_broker.publish("post.deleted", {"id": postId}, FEED_TOPIC, post_topic(postId))
     return None
@@ -0,0 +1,40 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+import schemas
+from cache import json_response
+from metrics import query_budget
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from repositories import Repository, get_repository
+from search import query_terms
+from serialization import dumps
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get(
+    "",
+    response_model=schemas.SearchPage,
+    summary="Search posts or comments",
+    description="Full-text search over post or comment content, most relevant (bm25) first, one page at a time",
+    operation_id="search",
+    dependencies=[query_budget(1)],
+    responses={
+        400: {
+            "description": "Bad request - invalid input or missing required fields",
+            "model": schemas.Error
+        },
+        500: {
+            "description": "Internal server error",
+            "model": schemas.Error
+        }
+    }
+)
+async def search(
+    q: str = Query(..., min_length=1, description="Words to search for; every word must match"),
+    search_type: str = Query("posts", alias="type", pattern="^(posts|comments)$", description="What to search: posts or comments"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of results to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor by the previous page"),
+    repo: Repository = Depends(get_repository)
+):
+    records, next_cursor = await repo.search(search_type, query_terms(q), limit, cursor)
+    return json_response(dumps({"items": records, "nextCursor": next_cursor}))
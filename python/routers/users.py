@@ -0,0 +1,79 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+import schemas
+from cache import json_response
+from metrics import query_budget
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from repositories import Repository, get_repository
+from serialization import dumps
+
+router = APIRouter(prefix="/users/{username}", tags=["Users"])
+
+ERROR_RESPONSES = {
+    400: {
+        "description": "Bad request - invalid input or missing required fields",
+        "model": schemas.Error
+    },
+    500: {
+        "description": "Internal server error",
+        "model": schemas.Error
+    }
+}
+
+
+def page_response(records: list[dict], next_cursor: Optional[str]):
+    return json_response(dumps({"items": records, "nextCursor": next_cursor}))
+
+
+@router.get(
+    "/posts",
+    response_model=schemas.PostPage,
+    summary="Get a user's posts",
+    description="Retrieve the posts written by a user, newest first, one page at a time",
+    operation_id="listUserPosts",
+    dependencies=[query_budget(1)],
+    responses=ERROR_RESPONSES
+)
+async def list_user_posts(
+    username: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of posts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor by the previous page"),
+    repo: Repository = Depends(get_repository)
+):
+    return page_response(*await repo.list_user_posts(username, limit, cursor))
+
+
+@router.get(
+    "/comments",
+    response_model=schemas.CommentPage,
+    summary="Get a user's comments",
+    description="Retrieve the comments written by a user on any post, newest first, one page at a time",
+    operation_id="listUserComments",
+    dependencies=[query_budget(1)],
+    responses=ERROR_RESPONSES
+)
+async def list_user_comments(
+    username: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of comments to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor by the previous page"),
+    repo: Repository = Depends(get_repository)
+):
+    return page_response(*await repo.list_user_comments(username, limit, cursor))
+
+
+@router.get(
+    "/likes",
+    response_model=schemas.LikePage,
+    summary="Get a user's likes",
+    description="Retrieve the likes a user has given, newest first, one page at a time",
+    operation_id="listUserLikes",
+    dependencies=[query_budget(1)],
+    responses=ERROR_RESPONSES
+)
+async def list_user_likes(
+    username: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Maximum number of likes to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as nextCursor by the previous page"),
+    repo: Repository = Depends(get_repository)
+):
+    return page_response(*await repo.list_user_likes(username, limit, cursor))
@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Optional
 
 
 class CreatePostRequest(BaseModel):
@@ -27,6 +27,40 @@ class Post(BaseModel):
         populate_by_name = True
 
 
+class PostPage(BaseModel):
+    items: list[Post] = Field(..., description="Posts on this page, newest first")
+    next_cursor: Optional[str] = Field(None, alias="nextCursor", description="Cursor for the next page, or null on the last page", json_schema_extra={"example": "WyIyMDI1LTA1LTMwVDEwOjMwOjAwIiwicG9zdC0xMjMiXQ"})
+
+    class Config:
+        populate_by_name = True
+
+
+class BatchCreatePostsRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(..., min_length=1, description="Posts to create, each shaped like CreatePostRequest")
+
+
+class PostBatchResult(BaseModel):
+    status: int = Field(..., description="HTTP status of this item: 201 created, 400 invalid", json_schema_extra={"example": 201})
+    post: Optional[Post] = Field(None, description="The created post")
+    error: Optional[str] = Field(None, description="Why the item was rejected", json_schema_extra={"example": "Invalid field 'content': String should have at least 1 character"})
+
+
+class PostBatchResponse(BaseModel):
+    results: list[PostBatchResult] = Field(..., description="One result per requested item, in request order")
+
+
+class BatchGetPostsRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, description="Identifiers of the posts to fetch", json_schema_extra={"example": ["post-123", "post-456"]})
+
+
+class PostBatchGetResponse(BaseModel):
+    items: list[Post] = Field(..., description="Posts that were found, in request order without duplicates")
+    missing_ids: list[str] = Field(..., alias="missingIds", description="Requested identifiers that matched no post", json_schema_extra={"example": ["post-456"]})
+
+    class Config:
+        populate_by_name = True
+
+
 class CreateCommentRequest(BaseModel):
     username: str = Field(..., min_length=1, description="Username of the comment author", json_schema_extra={"example": "janedoe"})
     content: str = Field(..., min_length=1, description="Content of the comment", json_schema_extra={"example": "Great post! I love outdoor activities too."})
@@ -50,6 +84,28 @@ class Comment(BaseModel):
         populate_by_name = True
 
 
+class CommentPage(BaseModel):
+    items: list[Comment] = Field(..., description="Comments on this page, newest first")
+    next_cursor: Optional[str] = Field(None, alias="nextCursor", description="Cursor for the next page, or null on the last page", json_schema_extra={"example": "WyIyMDI1LTA1LTMwVDEyOjAwOjAwIiwiY29tbWVudC00NTYiXQ"})
+
+    class Config:
+        populate_by_name = True
+
+
+class BatchCreateCommentsRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(..., min_length=1, description="Comments to create, each shaped like CreateCommentRequest")
+
+
+class CommentBatchResult(BaseModel):
+    status: int = Field(..., description="HTTP status of this item: 201 created, 400 invalid", json_schema_extra={"example": 201})
+    comment: Optional[Comment] = Field(None, description="The created comment")
+    error: Optional[str] = Field(None, description="Why the item was rejected", json_schema_extra={"example": "Invalid field 'username': Field required"})
+
+
+class CommentBatchResponse(BaseModel):
+    results: list[CommentBatchResult] = Field(..., description="One result per requested item, in request order")
+
+
 class LikeRequest(BaseModel):
     username: str = Field(..., min_length=1, description="Username of the user who wants to like the post", json_schema_extra={"example": "bobsmith"})
 
@@ -64,6 +120,56 @@ class Like(BaseModel):
         populate_by_name = True
 
 
+class LikePage(BaseModel):
+    items: list[Like] = Field(..., description="Likes on this page, newest first")
+    next_cursor: Optional[str] = Field(None, alias="nextCursor", description="Cursor for the next page, or null on the last page", json_schema_extra={"example": "WyIyMDI1LTA1LTMwVDEzOjAwOjAwIiwicG9zdC0xMjMiXQ"})
+
+    class Config:
+        populate_by_name = True
+
+
+class BatchLikeItem(BaseModel):
+    post_id: str = Field(..., alias="postId", min_length=1, description="Unique identifier of the post to like", json_schema_extra={"example": "post-123"})
+    username: str = Field(..., min_length=1, description="Username of the user who wants to like the post", json_schema_extra={"example": "bobsmith"})
+
+    class Config:
+        populate_by_name = True
+
+
+class BatchLikeRequest(BaseModel):
+    items: list[dict[str, Any]] = Field(..., min_length=1, description="Likes to create, each shaped like BatchLikeItem")
+
+
+class LikeBatchResult(BaseModel):
+    status: int = Field(..., description="HTTP status of this item: 201 liked, 200 already liked, 400 invalid, 404 unknown post", json_schema_extra={"example": 201})
+    like: Optional[Like] = Field(None, description="The new or existing like")
+    error: Optional[str] = Field(None, description="Why the item was rejected", json_schema_extra={"example": "Resource not found"})
+
+
+class LikeBatchResponse(BaseModel):
+    results: list[LikeBatchResult] = Field(..., description="One result per requested item, in request order")
+
+
+class SearchResult(BaseModel):
+    id: str = Field(..., description="Identifier of the matching post or comment", json_schema_extra={"example": "post-123"})
+    post_id: str = Field(alias="postId", description="Post the match belongs to (the post itself for post results)", json_schema_extra={"example": "post-123"})
+    username: str = Field(..., description="Author of the matching post or comment", json_schema_extra={"example": "johndoe"})
+    snippet: str = Field(..., description="HTML-escaped excerpt with matched words wrapped in <mark>", json_schema_extra={"example": "Testing the new <mark>Contoso</mark> tent this weekend…"})
+    score: float = Field(..., description="bm25 relevance, higher is more relevant", json_schema_extra={"example": 3.17})
+    created_at: datetime = Field(alias="createdAt", description="Timestamp when the post or comment was created", json_schema_extra={"example": "2025-05-30T10:30:00Z"})
+
+    class Config:
+        populate_by_name = True
+
+
+class SearchPage(BaseModel):
+    items: list[SearchResult] = Field(..., description="Matches on this page, most relevant first")
+    next_cursor: Optional[str] = Field(None, alias="nextCursor", description="Cursor for the next page, or null on the last page", json_schema_extra={"example": "Wy0zLjE3LCJwb3N0LTEyMyJd"})
+
+    class Config:
+        populate_by_name = True
+
+
 class Error(BaseModel):
     error: str = Field(..., description="Error code or type", json_schema_extra={"example": "BadRequest"})
     message: str = Field(..., description="Human-readable error message", json_schema_extra={"example": "Missing required field 'username'"})
@@ -0,0 +1,46 @@
+"""Full-text search helpers shared by the storage backends
+
+Queries are reduced to their words and every word must match, so user input
+never reaches the FTS5 query syntax. Results are ordered by bm25 rank (lower
+is more relevant) and then id; cursors carry that pair, so pages stay stable
+while the matching documents do not change.
+
+Snippets are built with control-character markers and escaped afterwards,
+so the only markup in a snippet is the <mark> around matched words.
+"""
+
+import html
+import re
+
+from fastapi import HTTPException
+
+SEARCH_TYPES = ("posts", "comments")
+# Words of context a snippet keeps around the matches
+SNIPPET_TOKENS = 12
+MAX_QUERY_TERMS = 16
+
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+ELLIPSIS = "…"
+
+_WORD = re.compile(r"\w+")
+
+
+def query_terms(query: str) -> list[str]:
+    """Lowercased words of a search query, rejecting queries without any"""
+    terms = list(dict.fromkeys(word.lower() for word in _WORD.findall(query)))
+    if not terms:
+        raise HTTPException(status_code=400, detail="Search query must contain at least one word")
+    if len(terms) > MAX_QUERY_TERMS:
+        raise HTTPException(status_code=400, detail=f"Too many search terms (maximum {MAX_QUERY_TERMS})")
+    return terms
+
+
+def match_expression(terms: list[str]) -> str:
+    """FTS5 MATCH expression requiring every term, each quoted as a plain string"""
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def highlight(snippet: str) -> str:
+    """Escape a marked snippet and turn its match markers into <mark> tags"""
+    return html.escape(snippet).replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
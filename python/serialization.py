@@ -0,0 +1,77 @@
+"""Fast JSON path for list responses
+
+List endpoints skip per-row Pydantic models: repositories return plain
+records keyed by the API's camelCase aliases and this module encodes them
+in one pass, with orjson when it is installed. The output is byte-for-byte
+what the schemas module would produce for the same data.
+"""
+
+import json
+from datetime import datetime
+from time import perf_counter
+
+from metrics import record_serialization
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+
+def post_record(post_id, username, content, created_at, updated_at, likes_count, comments_count) -> dict:
+    return {
+        "id": post_id,
+        "username": username,
+        "content": content,
+        "createdAt": created_at,
+        "updatedAt": updated_at,
+        "likesCount": likes_count,
+        "commentsCount": comments_count
+    }
+
+
+def comment_record(comment_id, post_id, username, content, created_at, updated_at) -> dict:
+    return {
+        "id": comment_id,
+        "postId": post_id,
+        "username": username,
+        "content": content,
+        "createdAt": created_at,
+        "updatedAt": updated_at
+    }
+
+
+def like_record(post_id, username, created_at) -> dict:
+    return {
+        "postId": post_id,
+        "username": username,
+        "createdAt": created_at
+    }
+
+
+def search_record(item_id, post_id, username, snippet, score, created_at) -> dict:
+    return {
+        "id": item_id,
+        "postId": post_id,
+        "username": username,
+        "snippet": snippet,
+        "score": score,
+        "createdAt": created_at
+    }
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """Encode records (dicts, lists, datetimes) as compact JSON bytes"""
+    started = perf_counter()
+    if orjson is not None:
+        body = orjson.dumps(value)
+    else:
+        body = json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+    record_serialization(perf_counter() - started)
+    return body
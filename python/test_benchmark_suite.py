@@ -0,0 +1,53 @@
+"""Tests for the benchmark suite in benchmarks/suite"""
+
+import asyncio
+
+import pytest
+
+from benchmarks.suite.datagen import generate
+from benchmarks.suite.runner import percentile, run_workload
+from benchmarks.suite.workload import OPERATIONS, WORKLOADS, contract_operation_ids
+from database import init_db
+from main import app
+
+
+def test_workloads_cover_every_contract_operation():
+    contract = set(contract_operation_ids())
+    assert len(contract) == 12
+    assert contract <= set(OPERATIONS)
+    for weights in WORKLOADS.values():
+        assert set(weights) <= set(OPERATIONS)
+        assert contract <= set(weights)
+
+
+def test_dataset_is_reproducible_and_skewed(client):
+    dataset = generate("tiny", seed=7)
+    assert dataset.counts["posts"] == 1000
+    assert dataset.comments and dataset.counts["likes"] > 0
+
+    # The most liked post has far more likes than the average one
+    top = client.get("/api/posts", params={"sort": "top", "limit": 1}).json()["items"][0]
+    assert top["likesCount"] >= 10 * dataset.counts["likes"] / dataset.counts["posts"]
+
+    init_db(reset=True)
+    again = generate("tiny", seed=7)
+    assert again.post_ids == dataset.post_ids and again.comments == dataset.comments
+
+
+@pytest.mark.usefixtures("write_through")
+def test_run_workload_reports_every_operation_without_errors(client):
+    dataset = generate("tiny", seed=3)
+    result = asyncio.run(run_workload(app, dataset, "extended", concurrency=4, requests=300, seed=3))
+
+    assert result["total"]["requests"] == 300
+    assert result["total"]["errors"] == 0, result["failures"]
+    assert set(result["operations"]) <= set(WORKLOADS["extended"])
+    assert {"p50Ms", "p95Ms", "p99Ms", "rps"} <= set(result["total"])
+    assert result["total"]["p50Ms"] <= result["total"]["p95Ms"] <= result["total"]["p99Ms"]
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([5.0], 95) == 5
@@ -0,0 +1,69 @@
+"""Tests for the response cache"""
+
+from cache import ResponseCache
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    for name in ("a", "b"):
+        cache.put(name, None, name.encode(), cache.begin_fill())
+    cache.get("a")
+    cache.put("c", None, b"c", cache.begin_fill())
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"a"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_entries_expire_after_ttl(monkeypatch):
+    import cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(max_entries=10, ttl=5)
+    cache.put("a", None, b"a", cache.begin_fill())
+    now[0] += 6
+
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_rejects_fill_that_raced_an_invalidation():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    ticket = cache.begin_fill()
+    cache.invalidate("post:1")
+    cache.put("post:1", None, b"stale", ticket)
+
+    assert cache.get("post:1") is None
+
+
+def test_invalidating_a_group_drops_every_variant():
+    cache = ResponseCache(max_entries=10, ttl=60)
+    cache.put("comments:1", (20, None), b"page1", cache.begin_fill())
+    cache.put("comments:1", "all", b"all", cache.begin_fill())
+    cache.put("comments:2", "all", b"other", cache.begin_fill())
+    cache.invalidate("comments:1")
+
+    assert cache.get("comments:1", (20, None)) is None
+    assert cache.get("comments:1", "all") is None
+    assert cache.get("comments:2", "all") == b"other"
+
+
+def test_post_reads_are_served_from_cache_until_a_write(client, statement_counter):
+    post_id = client.post("/api/posts", json={"username": "johndoe", "content": "Hello"}).json()["id"]
+    client.get(f"/api/posts/{post_id}")
+    statement_counter.clear()
+
+    assert client.get(f"/api/posts/{post_id}").json()["likesCount"] == 0
+    assert statement_counter == []
+
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    assert client.get(f"/api/posts/{post_id}").json()["likesCount"] == 1
+
+    client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi"})
+    assert client.get(f"/api/posts/{post_id}").json()["commentsCount"] == 1
+    assert [comment["content"] for comment in client.get(f"/api/posts/{post_id}/comments").json()["items"]] == ["Hi"]
+
+    stats = client.get("/cache/stats").json()
+    assert stats["hits"] >= 1
+    assert stats["invalidations"] >= 1
@@ -0,0 +1,136 @@
+"""Tests for the comments endpoints"""
+
+import pytest
+
+
+def create_post(client):
+    response = client.post("/api/posts", json={"username": "johndoe", "content": "A post to comment on"})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def create_comments(client, post_id, count):
+    comment_ids = []
+    for i in range(count):
+        response = client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": f"Comment {i}"})
+        assert response.status_code == 201
+        comment_ids.append(response.json()["id"])
+    return comment_ids
+
+
+def test_list_comments_pages_through_post_comments(client):
+    post_id = create_post(client)
+    comment_ids = create_comments(client, post_id, 5)
+    create_comments(client, create_post(client), 3)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get(f"/api/posts/{post_id}/comments", params=params).json()
+        seen.extend(comment["id"] for comment in page["items"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(reversed(comment_ids))
+
+
+def test_list_comments_unpaginated_opt_in_returns_plain_list(client):
+    post_id = create_post(client)
+    comment_ids = create_comments(client, post_id, 3)
+    response = client.get(f"/api/posts/{post_id}/comments", params={"paginate": "false"})
+    assert response.status_code == 200
+    assert [comment["id"] for comment in response.json()] == list(reversed(comment_ids))
+
+
+def test_list_comments_for_missing_post_returns_404(client):
+    response = client.get("/api/posts/post-missing/comments")
+    assert response.status_code == 404
+
+
+def test_comment_listing_honours_if_none_match(client):
+    from cache import response_cache
+
+    post_id = create_post(client)
+    comment_id = create_comments(client, post_id, 2)[0]
+    etag = client.get(f"/api/posts/{post_id}/comments").headers["ETag"]
+
+    assert client.get(f"/api/posts/{post_id}/comments", headers={"If-None-Match": etag}).status_code == 304
+    response_cache.clear()
+    assert client.get(f"/api/posts/{post_id}/comments", headers={"If-None-Match": etag}).status_code == 304
+
+    client.patch(f"/api/posts/{post_id}/comments/{comment_id}", json={"username": "janedoe", "content": "Edited"})
+    assert client.get(f"/api/posts/{post_id}/comments", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_revalidating_an_empty_comment_listing_checks_the_post_once(client, statement_counter):
+    post_id = create_post(client)
+    statement_counter.clear()
+
+    response = client.get(f"/api/posts/{post_id}/comments", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json() == {"items": [], "nextCursor": None}
+    assert len(statement_counter) == 3
+
+
+def test_batch_create_comments_updates_counter_once(client):
+    post_id = create_post(client)
+    etag = client.get(f"/api/posts/{post_id}/comments").headers["ETag"]
+    items = [{"username": "janedoe", "content": f"Bulk {i}"} for i in range(20)] + [{"username": "janedoe"}]
+
+    results = client.post(f"/api/posts/{post_id}/comments:batch", json={"items": items}).json()["results"]
+    assert [result["status"] for result in results] == [201] * 20 + [400]
+    assert client.get(f"/api/posts/{post_id}").json()["commentsCount"] == 20
+    assert client.get(f"/api/posts/{post_id}/comments", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_batch_create_comments_for_missing_post_returns_404(client):
+    response = client.post("/api/posts/post-missing/comments:batch", json={"items": [{"username": "janedoe", "content": "Hi"}]})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("method, path, body, expected_status, expected_statements", [
+    ("GET", "/api/posts/{post_id}/comments", None, 200, 1),
+    ("GET", "/api/posts/{empty_post_id}/comments", None, 200, 2),
+    ("GET", "/api/posts/post-missing/comments", None, 404, 2),
+    ("POST", "/api/posts/{post_id}/comments", {"username": "janedoe", "content": "Hi"}, 201, 2),
+    ("POST", "/api/posts/post-missing/comments", {"username": "janedoe", "content": "Hi"}, 404, 1),
+    ("GET", "/api/posts/{post_id}/comments/{comment_id}", None, 200, 1),
+    ("GET", "/api/posts/post-missing/comments/{comment_id}", None, 404, 1),
+    ("PATCH", "/api/posts/{post_id}/comments/{comment_id}", {"username": "janedoe", "content": "Edited"}, 200, 1),
+    ("PATCH", "/api/posts/post-missing/comments/{comment_id}", {"username": "janedoe", "content": "Edited"}, 404, 1),
+    ("DELETE", "/api/posts/{post_id}/comments/{comment_id}", None, 204, 2),
+    ("DELETE", "/api/posts/post-missing/comments/{comment_id}", None, 404, 1),
+])
+def test_comment_endpoint_statement_counts(client, statement_counter, method, path, body, expected_status, expected_statements):
+    from cache import response_cache
+
+    post_id, empty_post_id = create_post(client), create_post(client)
+    comment_id = create_comments(client, post_id, 1)[0]
+    url = path.format(post_id=post_id, empty_post_id=empty_post_id, comment_id=comment_id)
+
+    response_cache.clear()
+    statement_counter.clear()
+    response = client.request(method, url, json=body)
+    assert response.status_code == expected_status
+    assert len(statement_counter) == expected_statements
+
+
+def test_list_comments_projects_fields_and_previews_content(client, statement_counter):
+    from cache import response_cache
+
+    post_id = create_post(client)
+    client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "x" * 500})
+    full = client.get(f"/api/posts/{post_id}/comments").json()["items"]
+
+    response_cache.clear()
+    statement_counter.clear()
+    preview = client.get(f"/api/posts/{post_id}/comments", params={"fields": "username,content", "preview": 10}).json()["items"]
+    assert "substr(comments.content" in statement_counter[0]
+    assert preview == [{"id": full[0]["id"], "username": "janedoe", "content": "x" * 10, "contentTruncated": True}]
+
+    # Projections are cached separately from the full page
+    assert client.get(f"/api/posts/{post_id}/comments").json()["items"] == full
@@ -0,0 +1,57 @@
+"""Tests for the database layer configuration"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database
+from main import app
+
+
+@pytest.fixture
+def async_client(monkeypatch):
+    """Test client whose handlers run their queries on the aiosqlite engine"""
+    monkeypatch.setattr(database, "DATABASE_MODE", "async")
+    monkeypatch.setattr(database, "_async_sessionmaker", None)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.mark.usefixtures("write_through")
+def test_async_mode_serves_full_post_lifecycle(async_client):
+    post = async_client.post("/api/posts", json={"username": "johndoe", "content": "Async hello"}).json()
+    post_id = post["id"]
+
+    assert async_client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"}).status_code == 201
+    comment = async_client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi"}).json()
+    updated = async_client.patch(f"/api/posts/{post_id}", json={"username": "johndoe", "content": "Edited"}).json()
+    assert updated["content"] == "Edited"
+    assert (updated["likesCount"], updated["commentsCount"]) == (1, 1)
+
+    page = async_client.get("/api/posts").json()
+    assert [item["id"] for item in page["items"]] == [post_id]
+    assert async_client.get(f"/api/posts/{post_id}/comments/{comment['id']}").json()["content"] == "Hi"
+
+    assert async_client.delete(f"/api/posts/{post_id}/likes", params={"username": "janedoe"}).status_code == 204
+    assert async_client.delete(f"/api/posts/{post_id}").status_code == 204
+    assert async_client.get(f"/api/posts/{post_id}").status_code == 404
+
+
+def test_connections_are_tuned_with_configured_pragmas(client):
+    from sqlalchemy import text
+
+    with database.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == int(database.SQLITE_PRAGMAS["busy_timeout"])
+
+
+def test_async_engine_applies_the_same_pragmas(async_client):
+    import asyncio
+    from sqlalchemy import text
+
+    async def journal_mode():
+        async with database.get_async_sessionmaker()() as session:
+            return (await session.execute(text("PRAGMA journal_mode"))).scalar()
+
+    assert asyncio.run(journal_mode()) == "wal"
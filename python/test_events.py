@@ -0,0 +1,112 @@
+"""Tests for the event broker and the Server-Sent Events streams"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.responses import StreamingResponse
+
+from events import FEED_TOPIC, KEEPALIVE_MESSAGE, EventBroker, event_broker, event_stream, post_topic
+from like_buffer import like_buffer
+from repositories import open_repository
+from routers import events as events_router
+
+
+def parse(message):
+    lines = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_stream_delivers_published_events_and_releases_subscription():
+    broker = EventBroker()
+
+    async def scenario():
+        stream = event_stream(broker, post_topic("post-1"))
+        assert (await anext(stream)).startswith(b"retry:")
+        keepalives = asyncio.create_task(broker.send_keepalives(0.01))
+        assert await anext(stream) == KEEPALIVE_MESSAGE
+        keepalives.cancel()
+
+        broker.publish("like.created", {"postId": "post-1", "username": "janedoe"}, post_topic("post-1"))
+        broker.publish("like.created", {"postId": "post-2", "username": "janedoe"}, post_topic("post-2"))
+        event = parse(await anext(stream))
+        assert broker.subscriber_count(post_topic("post-1")) == 1
+        await stream.aclose()
+        return event
+
+    assert asyncio.run(scenario()) == ("like.created", {"postId": "post-1", "username": "janedoe"})
+    assert broker.subscriber_count() == 0
+
+
+def test_slow_subscriber_is_disconnected_instead_of_buffering():
+    broker = EventBroker(queue_size=2)
+
+    async def scenario():
+        stream = event_stream(broker, FEED_TOPIC)
+        await anext(stream)
+        for i in range(3):
+            broker.publish("post.created", {"id": f"post-{i}"}, FEED_TOPIC)
+        return [message async for message in stream]
+
+    assert asyncio.run(scenario()) == []
+    assert broker.disconnected == 1
+    assert broker.subscriber_count() == 0
+
+
+def test_handlers_publish_change_events(client):
+    feed = event_broker.subscribe(FEED_TOPIC)
+    try:
+        post_id = client.post("/api/posts", json={"username": "johndoe", "content": "Hello"}).json()["id"]
+        post_events = event_broker.subscribe(post_topic(post_id))
+        try:
+            client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+            client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi"})
+            client.delete(f"/api/posts/{post_id}")
+            received = [parse(post_events.queue.get_nowait()) for _ in range(post_events.queue.qsize())]
+        finally:
+            event_broker.unsubscribe(post_events)
+        feed_events = [parse(feed.queue.get_nowait()) for _ in range(feed.queue.qsize())]
+    finally:
+        event_broker.unsubscribe(feed)
+
+    assert [event for event, _ in received] == ["like.created", "comment.created", "post.deleted"]
+    assert [event for event, _ in feed_events] == ["post.created", "post.deleted"]
+    assert feed_events[0][1]["id"] == post_id
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_repeated_like_publishes_no_event(client, monkeypatch, write_behind):
+    monkeypatch.setattr(like_buffer, "enabled", write_behind)
+    post_id = client.post("/api/posts", json={"username": "johndoe", "content": "Hello"}).json()["id"]
+    post_events = event_broker.subscribe(post_topic(post_id))
+    try:
+        for _ in range(3):
+            assert client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"}).status_code == 201
+        received = [parse(post_events.queue.get_nowait()) for _ in range(post_events.queue.qsize())]
+    finally:
+        event_broker.unsubscribe(post_events)
+
+    assert [event for event, _ in received] == ["like.created"]
+    assert client.get(f"/api/posts/{post_id}").json()["likesCount"] == 1
+
+
+def test_post_event_stream_for_missing_post_returns_404(client):
+    assert client.get("/api/posts/post-missing/events").status_code == 404
+
+
+def test_post_event_stream_releases_its_repository_before_streaming(client, monkeypatch):
+    post_id = client.post("/api/posts", json={"username": "johndoe", "content": "Live"}).json()["id"]
+    repository_events = []
+
+    @asynccontextmanager
+    async def tracked_repository():
+        async with open_repository() as repo:
+            repository_events.append("opened")
+            yield repo
+        repository_events.append("closed")
+
+    monkeypatch.setattr(events_router, "open_repository", tracked_repository)
+    response = asyncio.run(events_router.stream_post_events(post_id))
+    assert isinstance(response, StreamingResponse)
+    assert repository_events == ["opened", "closed"]
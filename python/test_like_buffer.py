@@ -0,0 +1,104 @@
+"""Tests for the write-behind like buffer"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+import database
+import models
+from database import SessionLocal
+from like_buffer import like_buffer
+from main import app
+
+
+@pytest.fixture
+def buffered_client(monkeypatch):
+    """Test client with write-behind likes that only flush when the test asks"""
+    monkeypatch.setattr(like_buffer, "enabled", True)
+    monkeypatch.setattr(like_buffer, "interval", 3600)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def persisted_likes(post_id):
+    with SessionLocal() as db:
+        return db.query(func.count()).select_from(models.Like).filter(models.Like.post_id == post_id).scalar()
+
+
+def create_post(client):
+    return client.post("/api/posts", json={"username": "johndoe", "content": "Viral post"}).json()["id"]
+
+
+def test_buffered_likes_are_read_your_writes_before_flush(buffered_client, statement_counter):
+    post_id = create_post(buffered_client)
+    statement_counter.clear()
+    for username in ("janedoe", "bobsmith", "janedoe"):
+        assert buffered_client.post(f"/api/posts/{post_id}/likes", json={"username": username}).status_code == 201
+    assert not any(statement.lstrip().upper().startswith("INSERT") for statement in statement_counter)
+    assert persisted_likes(post_id) == 0
+    assert buffered_client.get(f"/api/posts/{post_id}").json()["likesCount"] == 2
+
+    buffered_client.portal.call(like_buffer.flush)
+    assert persisted_likes(post_id) == 2
+    assert buffered_client.get(f"/api/posts/{post_id}").json()["likesCount"] == 2
+
+
+def test_buffer_dedupes_like_unlike_per_user(buffered_client):
+    post_id = create_post(buffered_client)
+    buffered_client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    buffered_client.portal.call(like_buffer.flush)
+
+    assert buffered_client.delete(f"/api/posts/{post_id}/likes", params={"username": "janedoe"}).status_code == 204
+    assert buffered_client.delete(f"/api/posts/{post_id}/likes", params={"username": "janedoe"}).status_code == 404
+    buffered_client.post(f"/api/posts/{post_id}/likes", json={"username": "bobsmith"})
+    buffered_client.delete(f"/api/posts/{post_id}/likes", params={"username": "bobsmith"})
+    assert buffered_client.get(f"/api/posts/{post_id}").json()["likesCount"] == 0
+
+    buffered_client.portal.call(like_buffer.flush)
+    assert persisted_likes(post_id) == 0
+    assert buffered_client.get(f"/api/posts/{post_id}").json()["likesCount"] == 0
+    assert buffered_client.post("/api/posts/post-missing/likes", json={"username": "janedoe"}).status_code == 404
+
+
+def test_pending_likes_are_flushed_on_shutdown(monkeypatch):
+    monkeypatch.setattr(like_buffer, "enabled", True)
+    monkeypatch.setattr(like_buffer, "interval", 3600)
+    with TestClient(app) as client:
+        post_id = create_post(client)
+        client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+        assert persisted_likes(post_id) == 0
+
+    assert persisted_likes(post_id) == 1
+
+
+def test_a_second_app_lifespan_takes_over_the_buffer(monkeypatch):
+    monkeypatch.setattr(like_buffer, "enabled", True)
+    monkeypatch.setattr(like_buffer, "interval", 3600)
+    # Each TestClient runs its lifespan on an event loop of its own
+    with TestClient(app) as client:
+        post_id = create_post(client)
+        monkeypatch.setattr(database, "RESET_DATABASE", False)
+        with TestClient(app) as restarted:
+            restarted.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+        assert persisted_likes(post_id) == 1
+
+        client.post(f"/api/posts/{post_id}/likes", json={"username": "bobsmith"})
+    assert persisted_likes(post_id) == 2
+
+
+def test_batch_likes_do_not_double_count_pending_likes(buffered_client):
+    post_id = create_post(buffered_client)
+    buffered_client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+
+    items = [{"postId": post_id, "username": "janedoe"}, {"postId": post_id, "username": "bobsmith"}]
+    response = buffered_client.post("/api/likes:batch", json={"items": items})
+    assert [result["status"] for result in response.json()["results"]] == [200, 201]
+    assert persisted_likes(post_id) == 2
+    assert buffered_client.get(f"/api/posts/{post_id}").json()["likesCount"] == 2
+
+    buffered_client.portal.call(like_buffer.flush)
+    assert buffered_client.get(f"/api/posts/{post_id}").json()["likesCount"] == 2
+    assert buffered_client.post(f"/api/posts/{post_id}/likes", json={"username": "bobsmith"}).status_code == 201
+    assert like_buffer.stats()["pending"] == 1
+    buffered_client.portal.call(like_buffer.flush)
+    assert persisted_likes(post_id) == 2
@@ -0,0 +1,108 @@
+"""Tests for the likes endpoints"""
+
+import pytest
+
+
+def create_post(client):
+    response = client.post("/api/posts", json={"username": "johndoe", "content": "A post to like"})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_batch_like_reports_created_existing_invalid_and_missing(client):
+    post_id, other_id = create_post(client), create_post(client)
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+
+    items = [
+        {"postId": post_id, "username": "janedoe"},
+        {"postId": post_id, "username": "bobsmith"},
+        {"postId": post_id, "username": "bobsmith"},
+        {"postId": other_id, "username": "bobsmith"},
+        {"postId": "post-missing", "username": "bobsmith"},
+        {"postId": other_id}
+    ]
+    response = client.post("/api/likes:batch", json={"items": items})
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["results"]] == [200, 201, 200, 201, 404, 400]
+
+    assert client.get(f"/api/posts/{post_id}").json()["likesCount"] == 2
+    assert client.get(f"/api/posts/{other_id}").json()["likesCount"] == 1
+
+
+def test_batch_like_larger_than_a_lookup_chunk(client, statement_counter):
+    from batch import LOOKUP_CHUNK_SIZE
+
+    post_id = create_post(client)
+    items = [{"postId": post_id, "username": f"fan-{i}"} for i in range(LOOKUP_CHUNK_SIZE + 1)]
+
+    statement_counter.clear()
+    response = client.post("/api/likes:batch", json={"items": items})
+    assert response.status_code == 200
+    # One post lookup, two chunks of existing likes, one insert
+    assert len(statement_counter) == 4
+    assert client.get(f"/api/posts/{post_id}").json()["likesCount"] == LOOKUP_CHUNK_SIZE + 1
+
+
+@pytest.mark.usefixtures("write_through")
+@pytest.mark.parametrize("method, path, body, expected_status, expected_statements", [
+    ("POST", "/api/posts/{post_id}/likes", {"username": "bobsmith"}, 201, 1),
+    ("POST", "/api/posts/{post_id}/likes", {"username": "janedoe"}, 201, 1),
+    ("POST", "/api/posts/post-missing/likes", {"username": "bobsmith"}, 404, 1),
+    ("DELETE", "/api/posts/{post_id}/likes?username=janedoe", None, 204, 1),
+    ("DELETE", "/api/posts/{post_id}/likes?username=bobsmith", None, 404, 1),
+    ("DELETE", "/api/posts/post-missing/likes?username=janedoe", None, 404, 1),
+])
+def test_like_endpoint_statement_counts(client, statement_counter, method, path, body, expected_status, expected_statements):
+    post_id = create_post(client)
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+
+    statement_counter.clear()
+    response = client.request(method, path.format(post_id=post_id), json=body)
+    assert response.status_code == expected_status
+    assert len(statement_counter) == expected_statements
+
+
+def test_liking_twice_keeps_the_original_like(client):
+    post_id = create_post(client)
+    first = client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"}).json()
+    second = client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"}).json()
+    assert second == first
+    assert client.get(f"/api/posts/{post_id}").json()["likesCount"] == 1
+
+
+@pytest.mark.usefixtures("write_through")
+def test_concurrent_likes_and_unlikes_on_a_hot_post(client):
+    import asyncio
+
+    import httpx
+    from sqlalchemy import func
+
+    import models
+    from database import SessionLocal
+    from main import app
+
+    post_id = create_post(client)
+    url = f"/api/posts/{post_id}/likes"
+    users = [f"user-{i}" for i in range(100)]
+
+    async def hammer():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+            double_taps = await asyncio.gather(*(
+                async_client.post(url, json={"username": username}) for username in users for _ in range(3)
+            ))
+            mixed = await asyncio.gather(
+                *(async_client.delete(url, params={"username": username}) for username in users[:40] for _ in range(2)),
+                *(async_client.post(url, json={"username": username}) for username in users[40:])
+            )
+        return double_taps, mixed
+
+    double_taps, mixed = asyncio.run(hammer())
+    assert {response.status_code for response in double_taps} == {201}
+    unlike_statuses = sorted(response.status_code for response in mixed[:80])
+    assert unlike_statuses == [204] * 40 + [404] * 40
+    assert {response.status_code for response in mixed[80:]} == {201}
+
+    assert client.get(f"/api/posts/{post_id}").json()["likesCount"] == 60
+    with SessionLocal() as db:
+        assert db.query(func.count()).select_from(models.Like).filter(models.Like.post_id == post_id).scalar() == 60
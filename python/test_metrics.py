@@ -0,0 +1,171 @@
+"""Tests for the per-route request metrics and GET /metrics"""
+
+import logging
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import database
+import metrics
+from database import open_db_runner
+from routers import comments, likes, posts, search, users
+from metrics import (
+    LATENCY_BUCKETS, MetricsMiddleware, MetricsRegistry, QueryBudgetExceeded, RequestTimings, query_budget
+)
+
+SAMPLE = re.compile(r"^(\w+)(?:\{(.*)\})? (\S+)$")
+
+
+def scrape(client) -> dict:
+    """Samples of /metrics keyed by (name, labels)"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, labels, value = SAMPLE.match(line).groups()
+        samples[(name, labels or "")] = float(value)
+    return samples
+
+
+def labels(method, route, status, **extra):
+    rendered = f'method="{method}",route="{route}",status="{status}"'
+    return rendered + "".join(f',{name}="{value}"' for name, value in extra.items())
+
+
+def test_requests_are_counted_per_route_template_and_status(client):
+    post_id = client.post("/api/posts", json={"username": "alice", "content": "Hello"}).json()["id"]
+    client.get(f"/api/posts/{post_id}")
+    client.get(f"/api/posts/{post_id}")
+    client.get("/api/posts/missing")
+    client.get(f"/api/posts/{post_id}/comments")
+    client.get("/no/such/route")
+
+    samples = scrape(client)
+    assert samples[("http_requests_total", labels("POST", "/api/posts", 201))] == 1
+    assert samples[("http_requests_total", labels("GET", "/api/posts/{postId}", 200))] == 2
+    assert samples[("http_requests_total", labels("GET", "/api/posts/{postId}", 404))] == 1
+    assert samples[("http_requests_total", labels("GET", "/api/posts/{postId}/comments", 200))] == 1
+    assert samples[("http_requests_total", labels("GET", "<unmatched>", 404))] == 1
+    # No series carries a concrete id
+    assert not any(post_id in key[1] for key in samples)
+    # The scrape itself is in flight
+    assert samples[("http_requests_in_flight", "")] == 1
+
+
+def test_latency_histogram_is_cumulative_and_matches_the_count(client):
+    for _ in range(3):
+        client.get("/api/posts")
+
+    samples = scrape(client)
+    series = labels("GET", "/api/posts", 200)
+    buckets = [samples[("http_request_duration_seconds_bucket", labels("GET", "/api/posts", 200, le=bound))]
+               for bound in (*LATENCY_BUCKETS, "+Inf")]
+    assert buckets == sorted(buckets)
+    assert buckets[-1] == samples[("http_request_duration_seconds_count", series)] == 3
+    assert samples[("http_request_duration_seconds_sum", series)] > 0
+
+
+def test_response_size_and_time_breakdown_are_recorded(client):
+    client.post("/api/posts", json={"username": "alice", "content": "Hello"})
+    response = client.get("/api/posts")
+    client.get("/no/such/route")
+
+    samples = scrape(client)
+    series = labels("GET", "/api/posts", 200)
+    assert samples[("http_response_size_bytes_sum", series)] == len(response.content)
+    assert samples[("http_response_size_bytes_count", series)] == 1
+    total = samples[("http_request_duration_seconds_sum", series)]
+    db = samples[("http_request_db_seconds_total", series)]
+    serialization = samples[("http_request_serialization_seconds_total", series)]
+    assert 0 < db < total
+    assert 0 < serialization < total
+    # Requests that never reach the database record no database time
+    assert samples[("http_request_db_seconds_total", labels("GET", "<unmatched>", 404))] == 0
+
+
+def test_registry_renders_label_values_escaped():
+    registry = MetricsRegistry()
+    registry.observe("GET", '/odd"path', 200, 0.003, 10, RequestTimings())
+    rendered = registry.render()
+    assert 'route="/odd\\"path"' in rendered
+    assert 'le="0.0025"} 0' in rendered and 'le="0.005"} 1' in rendered
+
+
+def server_timing(response) -> dict:
+    entries = {}
+    for entry in response.headers["server-timing"].split(", "):
+        name, *params = entry.split(";")
+        entries[name] = dict(param.split("=", 1) for param in params)
+    return entries
+
+
+def test_server_timing_reports_statements_and_durations(client):
+    post_id = client.post("/api/posts", json={"username": "alice", "content": "Hello"}).json()["id"]
+    client.post(f"/api/posts/{post_id}/comments", json={"username": "bob", "content": "Hi"})
+
+    timing = server_timing(client.get(f"/api/posts/{post_id}/comments"))
+    assert timing["sql"]["desc"] == '"1 SQL"'
+    assert 0 < float(timing["sql"]["dur"]) <= float(timing["db"]["dur"])
+    assert float(timing["serialize"]["dur"]) > 0
+
+    samples = scrape(client)
+    assert samples[("http_request_db_statements_total", labels("GET", "/api/posts/{postId}/comments", 200))] == 1
+
+
+def test_every_database_route_declares_a_query_budget():
+    routes = [
+        route for router in (posts.router, comments.router, likes.router, likes.batch_router, search.router, users.router)
+        for route in router.routes
+    ]
+    unbudgeted = [
+        route.operation_id for route in routes
+        if not any(dependency.call.__name__ == "declare_budget" for dependency in route.dependant.dependencies)
+    ]
+    assert len(routes) == 20
+    assert unbudgeted == []
+
+
+@pytest.mark.parametrize("path", ["/api/posts:batchGet", "/api/likes:batch"])
+@pytest.mark.parametrize("content", [b"", b"not json"])
+def test_batch_budgets_leave_bad_bodies_to_validation(client, path, content):
+    response = client.post(path, content=content, headers={"Content-Type": "application/json"})
+    assert response.status_code == 422
+
+
+def test_strict_mode_fails_requests_over_budget(monkeypatch):
+    monkeypatch.setattr(metrics, "QUERY_BUDGET_STRICT", True)
+    budget_app = FastAPI()
+    budget_app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+
+    @budget_app.get("/two", dependencies=[query_budget(1)])
+    async def two_statements():
+        async with open_db_runner() as run_db:
+            await run_db(lambda db: [db.execute(text("SELECT 1")) for _ in range(2)] and None)
+        return {}
+
+    with TestClient(budget_app) as budget_client, pytest.raises(QueryBudgetExceeded, match="ran 2 SQL statements"):
+        budget_client.get("/two")
+
+    monkeypatch.setattr(metrics, "QUERY_BUDGET_STRICT", False)
+    with TestClient(budget_app) as budget_client:
+        assert budget_client.get("/two").status_code == 200
+
+
+def test_slow_statements_are_logged_with_their_query_plan(client, monkeypatch, caplog):
+    post_id = client.post("/api/posts", json={"username": "alice", "content": "Hello"}).json()["id"]
+    monkeypatch.setattr(database, "SLOW_QUERY_MS", 1e-9)
+
+    with caplog.at_level(logging.WARNING, logger="database"):
+        client.get(f"/api/posts/{post_id}/comments")
+
+    messages = [record.getMessage() for record in caplog.records if record.name == "database"]
+    assert any(
+        "FROM comments" in message and "SEARCH comments USING INDEX ix_comments_post_id_created_at_id" in message
+        for message in messages
+    )
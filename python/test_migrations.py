@@ -0,0 +1,152 @@
+"""Tests for the versioned schema migrations"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import database
+from database import CONNECT_ARGS, Base, configure_engine, engine_options
+from main import app
+from migrations import LATEST_VERSION, MIGRATIONS, migrate, schema_version
+
+# The schema of databases created before migrations existed
+LEGACY_SCHEMA = (
+    "CREATE TABLE posts (id VARCHAR NOT NULL, username VARCHAR NOT NULL, content VARCHAR NOT NULL, "
+    "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, PRIMARY KEY (id))",
+    "CREATE INDEX ix_posts_id ON posts (id)",
+    "CREATE TABLE comments (id VARCHAR NOT NULL, post_id VARCHAR NOT NULL, username VARCHAR NOT NULL, "
+    "content VARCHAR NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, PRIMARY KEY (id), "
+    "FOREIGN KEY(post_id) REFERENCES posts (id))",
+    "CREATE INDEX ix_comments_id ON comments (id)",
+    "CREATE TABLE likes (post_id VARCHAR NOT NULL, username VARCHAR NOT NULL, created_at DATETIME NOT NULL, "
+    "PRIMARY KEY (post_id, username), FOREIGN KEY(post_id) REFERENCES posts (id))",
+)
+
+
+def make_engine(path):
+    url = f"sqlite:///{path}"
+    return configure_engine(create_engine(url, connect_args=CONNECT_ARGS, **engine_options(url)))
+
+
+def schema_objects(engine):
+    """Every table, index and trigger, with the columns of tables and indexes"""
+    with engine.connect() as connection:
+        objects = connection.exec_driver_sql(
+            "SELECT type, name, tbl_name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"
+        ).all()
+        described = set()
+        for kind, name, table in objects:
+            columns = ()
+            if kind == "table":
+                columns = tuple(row[1] for row in connection.exec_driver_sql(f"PRAGMA table_xinfo({name})"))
+            elif kind == "index":
+                columns = tuple(row[2] for row in connection.exec_driver_sql(f"PRAGMA index_xinfo({name})") if row[5])
+            described.add((kind, name, table, columns))
+        return described
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    engine = make_engine(tmp_path / "legacy.db")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO posts VALUES ('post-1', 'johndoe', 'Summit at sunrise', '2025-03-01 08:00:00', "
+            "'2025-03-01 08:00:00'), ('post-2', 'janedoe', 'Rainy trail', '2025-03-02 08:00:00', '2025-03-02 08:00:00')"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO comments VALUES ('comment-1', 'post-1', 'janedoe', 'What a view', '2025-03-01 09:00:00', "
+            "'2025-03-01 09:00:00'), ('comment-2', 'post-1', 'bobsmith', 'Which summit?', '2025-03-01 10:00:00', "
+            "'2025-03-01 10:00:00')"
+        )
+        connection.exec_driver_sql("INSERT INTO likes VALUES ('post-1', 'janedoe', '2025-03-01 09:00:00')")
+    yield engine
+    engine.dispose()
+
+
+def test_fresh_database_gets_the_schema_of_the_models(tmp_path):
+    engine = make_engine(tmp_path / "fresh.db")
+    expected = make_engine(tmp_path / "expected.db")
+    Base.metadata.create_all(expected)
+
+    assert migrate(engine) == [migration.version for migration in MIGRATIONS]
+    assert schema_objects(engine) == schema_objects(expected)
+    with engine.connect() as connection:
+        assert schema_version(connection) == LATEST_VERSION
+    # Already current: nothing to do
+    assert migrate(engine) == []
+
+
+def test_legacy_database_is_upgraded_in_place(legacy_engine):
+    migrate(legacy_engine)
+
+    with legacy_engine.begin() as connection:
+        assert schema_version(connection) == LATEST_VERSION
+        counters = dict(
+            connection.exec_driver_sql("SELECT id, likes_count || '/' || comments_count FROM posts").all()
+        )
+        assert counters == {"post-1": "1/2", "post-2": "0/0"}
+
+        # Rows written before the migration are searchable, new ones are indexed by the triggers
+        connection.exec_driver_sql(
+            "INSERT INTO posts (id, username, content, created_at, updated_at) "
+            "VALUES ('post-3', 'johndoe', 'Another summit', '2025-03-03 08:00:00', '2025-03-03 08:00:00')"
+        )
+        matches = connection.exec_driver_sql(
+            "SELECT posts.id FROM posts_fts JOIN posts ON posts.rowid = posts_fts.rowid "
+            "WHERE posts_fts MATCH 'summit' ORDER BY posts.id"
+        ).scalars().all()
+        assert matches == ["post-1", "post-3"]
+
+        # likes_count follows likes, and the trending score follows likes_count
+        before = connection.exec_driver_sql("SELECT trending_score FROM posts WHERE id = 'post-2'").scalar()
+        connection.exec_driver_sql("INSERT INTO likes VALUES ('post-2', 'johndoe', '2025-03-02 09:00:00')")
+        likes_count, after = connection.exec_driver_sql(
+            "SELECT likes_count, trending_score FROM posts WHERE id = 'post-2'"
+        ).first()
+        assert likes_count == 1 and after > before
+
+        plan = connection.exec_driver_sql(
+            "EXPLAIN QUERY PLAN SELECT id FROM posts ORDER BY trending_score DESC, id DESC LIMIT 10"
+        ).all()
+        assert any("ix_posts_trending_score_id" in row[-1] for row in plan)
+
+
+def test_legacy_database_ends_up_with_the_schema_of_a_fresh_install(legacy_engine, tmp_path):
+    fresh = make_engine(tmp_path / "fresh.db")
+    migrate(fresh)
+
+    assert migrate(legacy_engine) == [migration.version for migration in MIGRATIONS]
+    assert schema_objects(legacy_engine) == schema_objects(fresh)
+
+
+def test_workers_booting_together_migrate_once(tmp_path):
+    path = tmp_path / "shared.db"
+    engines = [make_engine(path) for _ in range(4)]
+    ready = threading.Barrier(len(engines))
+    applied = []
+
+    def boot(engine):
+        ready.wait()
+        applied.append(migrate(engine))
+
+    workers = [threading.Thread(target=boot, args=(engine,)) for engine in engines]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(applied) == [[], [], [], [migration.version for migration in MIGRATIONS]]
+    for engine in engines:
+        engine.dispose()
+
+
+def test_restart_keeps_the_data(client, monkeypatch):
+    post = client.post("/api/posts", json={"username": "johndoe", "content": "Still here"}).json()
+
+    monkeypatch.setattr(database, "RESET_DATABASE", False)
+    with TestClient(app) as restarted:
+        assert restarted.get(f"/api/posts/{post['id']}").json()["content"] == "Still here"
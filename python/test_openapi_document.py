@@ -0,0 +1,65 @@
+"""Tests for serving the OpenAPI document as prebuilt bytes"""
+
+import gzip
+
+import orjson
+import pytest
+
+import openapi_document
+import main
+from main import app
+from openapi_document import OpenApiDocument, accepts_gzip
+
+
+@pytest.fixture(autouse=True)
+def fresh_document(monkeypatch):
+    monkeypatch.setattr(openapi_document, "_document", None)
+
+
+def test_document_is_served_gzipped_with_an_etag(client):
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json() == app.openapi()
+
+    assert client.get("/openapi.json", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    plain = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.content == response.content
+
+
+def test_prebuilt_document_is_served_without_generating_one(client, tmp_path, monkeypatch):
+    path = str(tmp_path / "openapi.json")
+    OpenApiDocument.from_schema(app.openapi()).write(path)
+    assert orjson.loads(gzip.decompress((tmp_path / "openapi.json.gz").read_bytes())) == app.openapi()
+
+    def generate():
+        raise AssertionError("the prebuilt document should be served")
+
+    monkeypatch.setattr(openapi_document, "OPENAPI_PREBUILT", path)
+    monkeypatch.setattr(app, "openapi", generate)
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == (tmp_path / "openapi.json").read_bytes()
+    assert client.get("/docs").status_code == 200
+
+
+def test_only_the_prebuilt_document_route_serves_the_openapi_url():
+    routes = [route for route in app.router.routes if getattr(route, "path", None) == app.openapi_url]
+    assert [route.endpoint for route in routes] == [main.openapi_json]
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("*", True),
+    ("gzip;q=0", False),
+    ("identity", False),
+    (None, False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
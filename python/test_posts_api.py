@@ -0,0 +1,311 @@
+"""Tests for the posts endpoints"""
+
+import pytest
+
+
+def create_posts(client, count, username="johndoe"):
+    post_ids = []
+    for i in range(count):
+        response = client.post("/api/posts", json={"username": username, "content": f"Post number {i}"})
+        assert response.status_code == 201
+        post_ids.append(response.json()["id"])
+    return post_ids
+
+
+@pytest.mark.usefixtures("write_through")
+def test_list_posts_includes_counts(client):
+    post_id, other_id = create_posts(client, 2)
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "bobsmith"})
+    client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Nice!"})
+
+    response = client.get("/api/posts")
+    assert response.status_code == 200
+    posts = {post["id"]: post for post in response.json()["items"]}
+    assert posts[post_id]["likesCount"] == 2
+    assert posts[post_id]["commentsCount"] == 1
+    assert posts[other_id]["likesCount"] == 0
+    assert posts[other_id]["commentsCount"] == 0
+
+
+def test_list_posts_statement_count_is_constant(client, statement_counter):
+    create_posts(client, 3)
+    statement_counter.clear()
+    client.get("/api/posts")
+    small_feed_statements = len(statement_counter)
+
+    create_posts(client, 30)
+    statement_counter.clear()
+    client.get("/api/posts")
+    assert len(statement_counter) == small_feed_statements
+
+
+def test_list_posts_pages_through_feed_with_cursor(client):
+    post_ids = create_posts(client, 7)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/posts", params=params).json()
+        assert len(page["items"]) <= 3
+        seen.extend(post["id"] for post in page["items"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(reversed(post_ids))
+
+
+def test_list_posts_rejects_invalid_cursor(client):
+    response = client.get("/api/posts", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_list_posts_unpaginated_opt_in_returns_plain_list(client):
+    post_ids = create_posts(client, 25)
+    response = client.get("/api/posts", params={"paginate": "false"})
+    assert response.status_code == 200
+    assert [post["id"] for post in response.json()] == list(reversed(post_ids))
+
+
+def test_counters_follow_likes_and_comments(client):
+    post_id = create_posts(client, 1)[0]
+    created = client.get(f"/api/posts/{post_id}").json()
+
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "bobsmith"})
+    comment_id = client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi"}).json()["id"]
+    client.post(f"/api/posts/{post_id}/comments", json={"username": "bobsmith", "content": "Hello"})
+    post = client.get(f"/api/posts/{post_id}").json()
+    assert (post["likesCount"], post["commentsCount"]) == (2, 2)
+    assert post["updatedAt"] == created["updatedAt"]
+
+    client.delete(f"/api/posts/{post_id}/likes", params={"username": "janedoe"})
+    client.delete(f"/api/posts/{post_id}/comments/{comment_id}")
+    post = client.get(f"/api/posts/{post_id}").json()
+    assert (post["likesCount"], post["commentsCount"]) == (1, 1)
+
+
+def test_get_post_is_a_single_lookup(client, statement_counter):
+    post_id = create_posts(client, 1)[0]
+    statement_counter.clear()
+    client.get(f"/api/posts/{post_id}")
+    assert len(statement_counter) == 1
+
+
+def test_reconcile_counters_rebuilds_from_base_tables(client):
+    from sqlalchemy import update
+
+    import models
+    from counters import reconcile_counters
+    from database import SessionLocal
+
+    post_id = create_posts(client, 1)[0]
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi"})
+
+    with SessionLocal() as db:
+        db.execute(update(models.Post).values(likes_count=99, comments_count=42))
+        db.commit()
+        reconcile_counters(db)
+
+    post = client.get(f"/api/posts/{post_id}").json()
+    assert (post["likesCount"], post["commentsCount"]) == (1, 1)
+
+
+def test_get_post_honours_if_none_match(client):
+    post_id = create_posts(client, 1)[0]
+    response = client.get(f"/api/posts/{post_id}")
+    etag = response.headers["ETag"]
+
+    assert client.get(f"/api/posts/{post_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    response = client.get(f"/api/posts/{post_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_unchanged_feed_returns_304_without_loading_content(client, statement_counter):
+    post_ids = create_posts(client, 3)
+    etag = client.get("/api/posts").headers["ETag"]
+
+    statement_counter.clear()
+    response = client.get("/api/posts", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not any("posts.content" in statement for statement in statement_counter)
+
+    client.post(f"/api/posts/{post_ids[0]}/comments", json={"username": "janedoe", "content": "Hi"})
+    assert client.get("/api/posts", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_batch_create_posts_reports_each_item(client, statement_counter):
+    items = [{"username": "importer", "content": f"Imported {i}"} for i in range(50)]
+    items.insert(3, {"username": "importer", "content": ""})
+    items.insert(7, {"content": "No author"})
+
+    statement_counter.clear()
+    response = client.post("/api/posts:batch", json={"items": items})
+    assert response.status_code == 200
+    assert len([s for s in statement_counter if s.lstrip().upper().startswith("INSERT")]) == 1
+
+    results = response.json()["results"]
+    assert [result["status"] for result in results].count(201) == 50
+    assert results[3]["status"] == 400 and "content" in results[3]["error"]
+    assert results[7]["status"] == 400 and "username" in results[7]["error"]
+
+    created_ids = [result["post"]["id"] for result in results if result["status"] == 201]
+    feed = client.get("/api/posts", params={"paginate": "false"}).json()
+    assert [post["id"] for post in feed] == list(reversed(created_ids))
+
+
+def test_batch_create_posts_rejects_oversized_batch(client, monkeypatch):
+    import batch
+
+    monkeypatch.setattr(batch, "MAX_BATCH_SIZE", 2)
+    items = [{"username": "importer", "content": "Hi"}] * 3
+    assert client.post("/api/posts:batch", json={"items": items}).status_code == 400
+
+
+@pytest.mark.usefixtures("write_through")
+def test_batch_get_posts_uses_one_query_and_reports_missing(client, statement_counter):
+    post_ids = create_posts(client, 30)
+    client.post(f"/api/posts/{post_ids[5]}/likes", json={"username": "janedoe"})
+    requested = [post_ids[5], "post-missing", post_ids[0], post_ids[5]] + post_ids[10:30]
+
+    statement_counter.clear()
+    response = client.post("/api/posts:batchGet", json={"ids": requested})
+    assert response.status_code == 200
+    assert len(statement_counter) == 1
+
+    body = response.json()
+    assert [post["id"] for post in body["items"]] == [post_ids[5], post_ids[0]] + post_ids[10:30]
+    assert body["items"][0]["likesCount"] == 1
+    assert body["missingIds"] == ["post-missing"]
+
+
+def test_batch_get_posts_looks_up_ids_a_chunk_at_a_time(client, statement_counter):
+    from batch import LOOKUP_CHUNK_SIZE
+
+    post_id = create_posts(client, 1)[0]
+    requested = [f"post-missing-{i}" for i in range(LOOKUP_CHUNK_SIZE)] + [post_id]
+
+    statement_counter.clear()
+    response = client.post("/api/posts:batchGet", json={"ids": requested})
+    assert response.status_code == 200
+    assert len(statement_counter) == 2
+    assert [post["id"] for post in response.json()["items"]] == [post_id]
+
+
+def engage(client, likes_by_post, comments_by_post):
+    for post_id, likes in likes_by_post.items():
+        for i in range(likes):
+            client.post(f"/api/posts/{post_id}/likes", json={"username": f"fan-{i}"})
+    for post_id, comments in comments_by_post.items():
+        for i in range(comments):
+            client.post(f"/api/posts/{post_id}/comments", json={"username": f"fan-{i}", "content": "Nice"})
+
+
+def feed_ids(client, sort, limit=1):
+    ids = []
+    cursor = None
+    while True:
+        params = {"sort": sort, "limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/posts", params=params).json()
+        ids.extend(post["id"] for post in page["items"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return ids
+
+
+@pytest.mark.usefixtures("write_through")
+def test_list_posts_sorted_by_top_and_trending(client):
+    liked, less_liked, discussed = create_posts(client, 3)
+    engage(client, {liked: 2, less_liked: 1}, {discussed: 2})
+
+    assert feed_ids(client, "top") == [liked, less_liked, discussed]
+    assert feed_ids(client, "trending") == [discussed, liked, less_liked]
+    assert feed_ids(client, "new") == [discussed, less_liked, liked]
+
+    client.delete(f"/api/posts/{liked}/likes", params={"username": "fan-0"})
+    client.delete(f"/api/posts/{liked}/likes", params={"username": "fan-1"})
+    assert feed_ids(client, "trending", limit=2) == [discussed, less_liked, liked]
+
+
+def test_trending_prefers_recent_posts_at_equal_engagement(client):
+    from datetime import datetime, timedelta
+
+    import models
+    from database import engine
+
+    old, recent = create_posts(client, 2)
+    two_days_ago = datetime.utcnow() - timedelta(days=2)
+    with engine.begin() as connection:
+        connection.execute(models.Post.__table__.update().where(models.Post.id == old).values(created_at=two_days_ago))
+    engage(client, {old: 3}, {})
+    assert feed_ids(client, "trending") == [recent, old]
+
+
+def test_ranked_feed_reads_top_k_from_its_index(client, executed_queries):
+    from database import engine
+
+    create_posts(client, 5)
+    executed_queries.clear()
+    client.get("/api/posts", params={"sort": "trending", "limit": 2})
+
+    statement, parameters = executed_queries[-1]
+    with engine.connect() as connection:
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "ix_posts_trending_score_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_ranked_feed_rejects_time_cursor(client):
+    create_posts(client, 3)
+    cursor = client.get("/api/posts", params={"limit": 1}).json()["nextCursor"]
+    assert client.get("/api/posts", params={"sort": "top", "cursor": cursor}).status_code == 400
+
+
+def test_list_posts_projects_fields_and_previews_content(client, statement_counter):
+    long_content = "Long trip report. " * 200
+    post_id = client.post("/api/posts", json={"username": "johndoe", "content": long_content}).json()["id"]
+    short_id = client.post("/api/posts", json={"username": "johndoe", "content": "Short"}).json()["id"]
+
+    statement_counter.clear()
+    items = client.get("/api/posts", params={"fields": "content,likesCount", "preview": 40}).json()["items"]
+    assert "substr(posts.content" in statement_counter[-1]
+    assert "posts.username" not in statement_counter[-1]
+    assert items == [
+        {"id": short_id, "content": "Short", "likesCount": 0, "contentTruncated": False},
+        {"id": post_id, "content": long_content[:40], "likesCount": 0, "contentTruncated": True},
+    ]
+
+    items = client.get("/api/posts", params={"fields": "username"}).json()["items"]
+    assert items[0] == {"id": short_id, "username": "johndoe"}
+    assert set(client.get("/api/posts", params={"preview": 5}).json()["items"][1]) == {
+        "id", "username", "content", "createdAt", "updatedAt", "likesCount", "commentsCount", "contentTruncated"
+    }
+
+
+@pytest.mark.usefixtures("write_through")
+def test_projected_feed_etag_tracks_hidden_fields(client):
+    post_id = create_posts(client, 1)[0]
+    params = {"fields": "content"}
+    etag = client.get("/api/posts", params=params).headers["ETag"]
+    assert etag != client.get("/api/posts").headers["ETag"]
+    assert client.get("/api/posts", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    assert client.get("/api/posts", params=params, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_list_posts_rejects_unknown_fields(client):
+    response = client.get("/api/posts", params={"fields": "id,password"})
+    assert response.status_code == 400
@@ -0,0 +1,113 @@
+"""Tests for the in-memory storage backend"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import repositories
+from main import app
+from repositories import MemoryRepository
+
+
+@pytest.fixture
+def memory_client(monkeypatch):
+    """Test client served entirely from a fresh in-memory repository"""
+    monkeypatch.setattr(repositories, "STORAGE_BACKEND", "memory")
+    monkeypatch.setattr(repositories, "memory_repository", MemoryRepository())
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_memory_backend_serves_requests_without_sql(memory_client, statement_counter):
+    post_id = memory_client.post("/api/posts", json={"username": "johndoe", "content": "Hello"}).json()["id"]
+    memory_client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    memory_client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    comment_id = memory_client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi"}).json()["id"]
+
+    post = memory_client.get(f"/api/posts/{post_id}").json()
+    assert (post["likesCount"], post["commentsCount"]) == (1, 1)
+    assert memory_client.get(f"/api/posts/{post_id}/comments/{comment_id}").json()["content"] == "Hi"
+    assert memory_client.patch(f"/api/posts/{post_id}", json={"username": "johndoe", "content": "Edited"}).json()["content"] == "Edited"
+
+    assert memory_client.delete(f"/api/posts/{post_id}/likes", params={"username": "janedoe"}).status_code == 204
+    assert memory_client.delete(f"/api/posts/{post_id}/likes", params={"username": "janedoe"}).status_code == 404
+    assert memory_client.delete(f"/api/posts/{post_id}/comments/{comment_id}").status_code == 204
+    assert memory_client.get(f"/api/posts/{post_id}").json()["commentsCount"] == 0
+    assert memory_client.delete(f"/api/posts/{post_id}").status_code == 204
+    assert memory_client.get(f"/api/posts/{post_id}/comments").status_code == 404
+    assert statement_counter == []
+
+
+def test_memory_backend_paginates_feed_and_comments(memory_client):
+    post_ids = [
+        memory_client.post("/api/posts", json={"username": "johndoe", "content": f"Post {i}"}).json()["id"]
+        for i in range(5)
+    ]
+    comment_ids = [
+        memory_client.post(f"/api/posts/{post_ids[0]}/comments", json={"username": "janedoe", "content": f"C{i}"}).json()["id"]
+        for i in range(3)
+    ]
+
+    first = memory_client.get("/api/posts", params={"limit": 3}).json()
+    second = memory_client.get("/api/posts", params={"limit": 3, "cursor": first["nextCursor"]}).json()
+    assert [post["id"] for post in first["items"] + second["items"]] == list(reversed(post_ids))
+    assert second["nextCursor"] is None
+
+    comments = memory_client.get(f"/api/posts/{post_ids[0]}/comments", params={"paginate": "false"}).json()
+    assert [comment["id"] for comment in comments] == list(reversed(comment_ids))
+
+
+def test_memory_backend_batch_writes(memory_client):
+    posts = memory_client.post("/api/posts:batch", json={"items": [{"username": "importer", "content": f"P{i}"} for i in range(3)]}).json()
+    post_id = posts["results"][0]["post"]["id"]
+
+    comments = memory_client.post(f"/api/posts/{post_id}/comments:batch", json={"items": [{"username": "janedoe", "content": "Hi"}] * 2}).json()
+    likes = memory_client.post("/api/likes:batch", json={"items": [{"postId": post_id, "username": "janedoe"}] * 2}).json()
+    assert [result["status"] for result in comments["results"]] == [201, 201]
+    assert [result["status"] for result in likes["results"]] == [201, 200]
+
+    post = memory_client.get(f"/api/posts/{post_id}").json()
+    assert (post["likesCount"], post["commentsCount"]) == (1, 2)
+    feed = memory_client.get("/api/posts", params={"paginate": "false"}).json()
+    assert [item["id"] for item in feed] == [result["post"]["id"] for result in reversed(posts["results"])]
+
+
+def test_memory_backend_batch_get(memory_client):
+    post_id = memory_client.post("/api/posts", json={"username": "johndoe", "content": "Hello"}).json()["id"]
+    body = memory_client.post("/api/posts:batchGet", json={"ids": ["post-missing", post_id]}).json()
+    assert [post["id"] for post in body["items"]] == [post_id]
+    assert body["missingIds"] == ["post-missing"]
+
+
+@pytest.mark.usefixtures("write_through")
+def test_memory_backend_ranks_feed(memory_client):
+    liked, less_liked, discussed = [
+        memory_client.post("/api/posts", json={"username": "johndoe", "content": f"Post {i}"}).json()["id"]
+        for i in range(3)
+    ]
+    for username in ("janedoe", "bobsmith"):
+        memory_client.post(f"/api/posts/{liked}/likes", json={"username": username})
+        memory_client.post(f"/api/posts/{discussed}/comments", json={"username": username, "content": "Hi"})
+    memory_client.post(f"/api/posts/{less_liked}/likes", json={"username": "janedoe"})
+
+    def feed(sort):
+        first = memory_client.get("/api/posts", params={"sort": sort, "limit": 2}).json()
+        rest = memory_client.get("/api/posts", params={"sort": sort, "limit": 2, "cursor": first["nextCursor"]}).json()
+        return [post["id"] for post in first["items"] + rest["items"]]
+
+    assert feed("top") == [liked, less_liked, discussed]
+    assert feed("trending") == [discussed, liked, less_liked]
+
+    memory_client.delete(f"/api/posts/{discussed}")
+    memory_client.delete(f"/api/posts/{liked}/likes", params={"username": "janedoe"})
+    memory_client.delete(f"/api/posts/{liked}/likes", params={"username": "bobsmith"})
+    assert [post["id"] for post in memory_client.get("/api/posts", params={"sort": "top"}).json()["items"]] == [less_liked, liked]
+
+
+def test_memory_backend_projects_lists(memory_client):
+    post_id = memory_client.post("/api/posts", json={"username": "johndoe", "content": "Hello outdoors"}).json()["id"]
+    memory_client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi there"})
+
+    posts = memory_client.get("/api/posts", params={"fields": "content", "preview": 5}).json()["items"]
+    assert posts == [{"id": post_id, "content": "Hello", "contentTruncated": True}]
+    comments = memory_client.get(f"/api/posts/{post_id}/comments", params={"fields": "postId"}).json()["items"]
+    assert [set(comment) for comment in comments] == [{"id", "postId"}]
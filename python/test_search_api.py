@@ -0,0 +1,101 @@
+"""Tests for the full-text search endpoint"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import repositories
+from main import app
+from repositories import MemoryRepository
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def search_client(request, monkeypatch):
+    """Test client on a fresh database or in-memory repository"""
+    if request.param == "memory":
+        monkeypatch.setattr(repositories, "STORAGE_BACKEND", "memory")
+        monkeypatch.setattr(repositories, "memory_repository", MemoryRepository())
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def create_post(client, content, username="johndoe"):
+    response = client.post("/api/posts", json={"username": username, "content": content})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def search(client, q, **params):
+    response = client.get("/api/search", params={"q": q, **params})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_ranks_posts_by_relevance(search_client):
+    create_post(search_client, "A long day of hiking with friends and a Contoso backpack among many other things")
+    best = create_post(search_client, "Contoso tent review: the Contoso tent kept us dry")
+    create_post(search_client, "Nothing to see here")
+
+    items = search(search_client, "contoso")["items"]
+    assert len(items) == 2
+    assert items[0]["id"] == best
+    assert items[0]["postId"] == best
+    assert items[0]["score"] >= items[1]["score"]
+    assert "<mark>Contoso</mark>" in items[0]["snippet"]
+
+
+def test_search_requires_every_word_and_escapes_snippets(search_client):
+    create_post(search_client, "<b>Contoso</b> stove & kettle")
+    create_post(search_client, "Contoso stove only")
+
+    items = search(search_client, "kettle stove")["items"]
+    assert len(items) == 1
+    assert items[0]["snippet"] == "&lt;b&gt;Contoso&lt;/b&gt; <mark>stove</mark> &amp; <mark>kettle</mark>"
+
+
+def test_search_pages_through_matches(search_client):
+    post_ids = {create_post(search_client, f"Trail report {i} " + "trail " * (i % 3)) for i in range(7)}
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = search(search_client, "trail", **params)
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+
+    assert sorted(seen) == sorted(post_ids)
+    assert len(seen) == len(post_ids)
+
+
+def test_search_follows_updates_and_deletes(search_client):
+    post_id = create_post(search_client, "Paddling the river")
+    search_client.patch(f"/api/posts/{post_id}", json={"username": "johndoe", "content": "Climbing the crag"})
+    assert search(search_client, "river")["items"] == []
+    assert [item["id"] for item in search(search_client, "crag")["items"]] == [post_id]
+
+    comment = search_client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Nice crag"}).json()
+    assert [(item["id"], item["postId"]) for item in search(search_client, "crag", type="comments")["items"]] == [
+        (comment["id"], post_id)
+    ]
+
+    search_client.delete(f"/api/posts/{post_id}")
+    assert search(search_client, "crag")["items"] == []
+    assert search(search_client, "crag", type="comments")["items"] == []
+
+
+def test_search_ignores_query_syntax(search_client):
+    create_post(search_client, "Camping NEAR the lake")
+    assert len(search(search_client, 'lake" NEAR(')["items"]) == 1
+
+
+@pytest.mark.parametrize("params, expected_status", [
+    ({"q": "!!!"}, 400),
+    ({"q": "lake", "cursor": "not-a-cursor"}, 400),
+    ({"q": "lake", "type": "likes"}, 422),
+])
+def test_search_rejects_bad_input(search_client, params, expected_status):
+    assert search_client.get("/api/search", params=params).status_code == expected_status
@@ -0,0 +1,51 @@
+"""Conformance of the fast list serialization path with the schemas models"""
+
+from datetime import datetime
+
+import pytest
+
+import schemas
+import serialization
+from serialization import comment_record, dumps, post_record
+
+POST_RECORDS = [
+    post_record("post-1", "johndoe", "Hiking 🥾 at dawn", datetime(2025, 5, 30, 10, 30), datetime(2025, 5, 30, 11, 45, 0, 123456), 42, 5),
+    post_record("post-2", "janedoe", 'Quotes "and" \\ escapes\n', datetime(2025, 5, 29, 9, 0, 1, 5), datetime(2025, 5, 29, 9, 0, 1, 5), 0, 0),
+]
+COMMENT_RECORDS = [
+    comment_record("comment-1", "post-1", "bobsmith", "Great post! 한국어", datetime(2025, 5, 30, 12), datetime(2025, 5, 30, 12, 30, 0, 999999)),
+]
+
+
+@pytest.fixture(params=["orjson", "json"], autouse=True)
+def encoder(request, monkeypatch):
+    """Run every conformance check with orjson and with the stdlib fallback"""
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+def test_post_page_matches_pydantic_serialization():
+    expected = schemas.PostPage(
+        items=[schemas.Post(**record) for record in POST_RECORDS],
+        nextCursor="abc"
+    ).model_dump_json(by_alias=True).encode()
+
+    assert dumps({"items": POST_RECORDS, "nextCursor": "abc"}) == expected
+
+
+def test_comment_list_matches_pydantic_serialization():
+    page = schemas.CommentPage(items=[schemas.Comment(**record) for record in COMMENT_RECORDS], nextCursor=None)
+
+    assert dumps({"items": COMMENT_RECORDS, "nextCursor": None}) == page.model_dump_json(by_alias=True).encode()
+
+
+def test_list_endpoints_conform_to_response_schemas(client):
+    post_id = client.post("/api/posts", json={"username": "johndoe", "content": "Hello"}).json()["id"]
+    client.post(f"/api/posts/{post_id}/comments", json={"username": "janedoe", "content": "Hi"})
+
+    page = schemas.PostPage.model_validate_json(client.get("/api/posts").content)
+    assert page.items[0].comments_count == 1
+    schemas.CommentPage.model_validate_json(client.get(f"/api/posts/{post_id}/comments").content)
+    for post in client.get("/api/posts", params={"paginate": "false"}).json():
+        schemas.Post.model_validate(post)
@@ -0,0 +1,95 @@
+"""Tests for the per-user timeline endpoints"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import repositories
+from database import engine
+from main import app
+from repositories import MemoryRepository
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def timeline_client(request, monkeypatch):
+    """Test client on a fresh database or in-memory repository"""
+    if request.param == "memory":
+        monkeypatch.setattr(repositories, "STORAGE_BACKEND", "memory")
+        monkeypatch.setattr(repositories, "memory_repository", MemoryRepository())
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def create_post(client, username, content="A post"):
+    response = client.post("/api/posts", json={"username": username, "content": content})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def read_all(client, path, limit=2):
+    items = []
+    cursor = None
+    while True:
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        items.extend(response.json()["items"])
+        cursor = response.json()["nextCursor"]
+        if cursor is None:
+            return items
+
+
+def test_user_posts_page_through_only_that_users_posts(timeline_client):
+    mine = [create_post(timeline_client, "johndoe", f"Mine {i}") for i in range(5)]
+    create_post(timeline_client, "janedoe")
+
+    assert [post["id"] for post in read_all(timeline_client, "/api/users/johndoe/posts")] == list(reversed(mine))
+    assert read_all(timeline_client, "/api/users/nobody/posts") == []
+
+
+def test_user_comments_span_posts(timeline_client):
+    post_ids = [create_post(timeline_client, "johndoe") for _ in range(3)]
+    comment_ids = []
+    for post_id in post_ids:
+        for username in ("janedoe", "bobsmith"):
+            comment = timeline_client.post(f"/api/posts/{post_id}/comments", json={"username": username, "content": "Hi"}).json()
+            if username == "janedoe":
+                comment_ids.append(comment["id"])
+
+    comments = read_all(timeline_client, "/api/users/janedoe/comments")
+    assert [comment["id"] for comment in comments] == list(reversed(comment_ids))
+
+    timeline_client.delete(f"/api/posts/{post_ids[0]}")
+    assert len(read_all(timeline_client, "/api/users/janedoe/comments")) == 2
+
+
+@pytest.mark.usefixtures("write_through")
+def test_user_likes_follow_likes_and_unlikes(timeline_client):
+    post_ids = [create_post(timeline_client, "johndoe") for _ in range(4)]
+    for post_id in post_ids:
+        timeline_client.post(f"/api/posts/{post_id}/likes", json={"username": "janedoe"})
+    timeline_client.post(f"/api/posts/{post_ids[0]}/likes", json={"username": "bobsmith"})
+
+    likes = read_all(timeline_client, "/api/users/janedoe/likes", limit=3)
+    assert [like["postId"] for like in likes] == list(reversed(post_ids))
+    assert {like["username"] for like in likes} == {"janedoe"}
+
+    timeline_client.delete(f"/api/posts/{post_ids[1]}/likes", params={"username": "janedoe"})
+    timeline_client.delete(f"/api/posts/{post_ids[2]}")
+    assert [like["postId"] for like in read_all(timeline_client, "/api/users/janedoe/likes")] == [post_ids[3], post_ids[0]]
+
+
+@pytest.mark.parametrize("path, index", [
+    ("posts", "ix_posts_username_created_at_id"),
+    ("comments", "ix_comments_username_created_at_id"),
+    ("likes", "ix_likes_username_created_at_post_id"),
+])
+def test_user_timelines_are_served_by_their_index(client, executed_queries, path, index):
+    client.get(f"/api/users/johndoe/{path}", params={"cursor": "WyIyMDI1LTA1LTMwVDEwOjMwOjAwIiwicG9zdC0xMjMiXQ"})
+
+    statement, parameters = executed_queries[-1]
+    with engine.connect() as connection:
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan